@@ -0,0 +1,143 @@
+"""
+I compare the calendar's day payload with the per-row format it replaced.
+
+The old path loaded a ``Transaction`` and its category for every row,
+reversed a detail URL and formatted the amount per row, and repeated the
+type and category labels in every entry. I rebuild that here next to the
+compact ``values_list`` path and report CPU time and response bytes for
+one busy day::
+
+    DJANGO_SETTINGS_MODULE=ledgerly.settings \\
+        python benchmarks/calendar_payload.py --rows 2000
+
+I run against a throwaway test database, so no real data is touched.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import django  # noqa: E402
+
+django.setup()
+
+from asgiref.sync import async_to_sync  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.http import JsonResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    get_runner,
+    setup_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+
+from expenses import views  # noqa: E402
+from expenses.currencies import cents_to_display  # noqa: E402
+from expenses.models import Category, Transaction  # noqa: E402
+
+DAY = date(2025, 9, 1)
+
+
+def legacy_day_payload(user, day, currency_code):
+    """Serialise a day the way the calendar did before the compact path."""
+
+    type_labels = dict(Transaction.TYPE_CHOICES)
+    entries = []
+    for txn in (
+        Transaction.objects
+        .filter(user=user, occurred_on=day)
+        .select_related('category')
+        .order_by('name', 'pk')
+    ):
+        amount = cents_to_display(txn.amount_in_cents, currency_code)
+        entries.append({
+            'id': txn.pk,
+            'name': txn.name,
+            'type': txn.type,
+            'type_display': type_labels.get(txn.type, txn.type.title()),
+            'category': (
+                txn.category.name if txn.category else 'Uncategorized'
+            ),
+            'note': txn.note or '',
+            'amount_display': (
+                f'-{amount}' if txn.type == Transaction.OUTGO
+                else f'+{amount}'
+            ),
+            'detail_url': reverse('transaction_detail', args=[txn.pk]),
+            'occurred_on': txn.occurred_on.isoformat(),
+        })
+    return JsonResponse({'date': day.isoformat(), 'transactions': entries})
+
+
+def measure(build, repeats):
+    """Return the best CPU time of ``repeats`` runs and the body size."""
+
+    best = None
+    for _ in range(repeats):
+        started = time.process_time()
+        response = build()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = get_runner(settings)(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        user = User.objects.create_user(username='benchmark')
+        categories = [
+            Category.objects.create(name=f'Benchmark {index}')
+            for index in range(8)
+        ]
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                name=f'Entry {index % 150}',
+                type=Transaction.OUTGO if index % 5 else Transaction.INCOME,
+                category=(
+                    categories[index % len(categories)] if index % 5
+                    else None
+                ),
+                amount_in_cents=100 + index * 37,
+                note='' if index % 3 else 'Split with a friend',
+                occurred_on=DAY,
+            )
+            for index in range(args.rows)
+        ])
+
+        request = RequestFactory().get('/', {'date': DAY.isoformat()})
+        request.user = user
+        compact_day = async_to_sync(views._calendar_day_data)
+        results = {
+            'per-row models': measure(
+                lambda: legacy_day_payload(user, DAY, 'GBP'), args.repeats
+            ),
+            'compact values_list': measure(
+                lambda: compact_day(request, DAY.isoformat(), 'GBP'),
+                args.repeats,
+            ),
+        }
+    finally:
+        runner.teardown_databases(old_config)
+
+    for label, (cpu, size) in results.items():
+        print(f'{label:>20}: {cpu * 1000:7.1f}ms CPU, {size:>9,} bytes')
+    (old_cpu, old_size), (new_cpu, new_size) = results.values()
+    print(f'{old_cpu / new_cpu:.1f}x less CPU, '
+          f'{old_size / new_size:.1f}x fewer bytes for {args.rows} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+I compare the integer money codec with the Decimal functions it replaced.
+
+Before timing anything I check that both give identical results over a
+fuzzed range of amounts up to ``MAX_CENTS``, including negatives, the
+rounding edges and every currency, then I report how long each takes::
+
+    python benchmarks/money_codec.py --amounts 200000
+
+I don't need a database or Django settings.
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from expenses.currencies import (  # noqa: E402
+    CURRENCY_SYMBOLS,
+    DEFAULT_CURRENCY,
+    MAX_CENTS,
+    cents_to_display,
+    format_many,
+    parse_display_amount_to_cents,
+)
+
+
+def legacy_display(amount_in_cents, currency_code):
+    """Format cents the way ``cents_to_display`` did with Decimal."""
+
+    symbol = CURRENCY_SYMBOLS.get(
+        currency_code, CURRENCY_SYMBOLS[DEFAULT_CURRENCY]
+    )
+    try:
+        cents = int(amount_in_cents)
+    except (TypeError, ValueError):
+        cents = 0
+    units = (Decimal(cents) / Decimal(100)).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+    return f"{symbol}{units:,.2f}"
+
+
+def legacy_parse(amount_str):
+    """Parse an amount the way ``parse_display_amount_to_cents`` did."""
+
+    quantized = Decimal(amount_str).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+    cents = quantized * Decimal(100)
+    return int(cents.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def fuzzed_amounts(count, seed):
+    """Return ``count`` cent amounts spread over every order of magnitude."""
+
+    rng = random.Random(seed)
+    amounts = [0, 1, -1, 99, 100, -100, 99_999, MAX_CENTS, -MAX_CENTS]
+    while len(amounts) < count:
+        amount = rng.randint(0, 10 ** rng.randint(1, len(str(MAX_CENTS))))
+        amounts.append(min(amount, MAX_CENTS) * rng.choice((1, -1)))
+    return amounts
+
+
+def fuzzed_strings(amounts, seed):
+    """Return the text people type for amounts, with extra decimals."""
+
+    rng = random.Random(seed)
+    strings = ["0", ".5", "5.", "-0.005", "+1.005", "1.0049", " 7 ", "1e3"]
+    for amount in amounts:
+        units, remainder = divmod(abs(amount), 100)
+        sign = "-" if amount < 0 else rng.choice(("", "", "+"))
+        digits = f"{remainder:02d}" + str(rng.randint(0, 999))
+        strings.append(f"{sign}{units}.{digits[:rng.randint(0, 5)]}")
+    return strings
+
+
+def _outcome(function, *args):
+    try:
+        return function(*args)
+    except (InvalidOperation, ValueError) as error:
+        return type(error)
+
+
+def check(amounts, strings):
+    """Fail loudly if the codec disagrees with Decimal anywhere."""
+
+    for code in CURRENCY_SYMBOLS:
+        expected = [legacy_display(amount, code) for amount in amounts]
+        if format_many(amounts, code) != expected:
+            raise SystemExit(f"format_many disagrees with Decimal ({code}).")
+        for amount, display in zip(amounts[:1000], expected):
+            if cents_to_display(amount, code) != display:
+                raise SystemExit(f"cents_to_display({amount}) disagrees.")
+    for text in strings:
+        if _outcome(parse_display_amount_to_cents, text) != _outcome(
+            legacy_parse, text
+        ):
+            raise SystemExit(f"Parsing {text!r} disagrees with Decimal.")
+
+
+def best_of(repeats, function):
+    """Return the best CPU time of ``repeats`` runs of ``function``."""
+
+    best = None
+    for _ in range(repeats):
+        started = time.process_time()
+        function()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--amounts", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    amounts = fuzzed_amounts(args.amounts, args.seed)
+    strings = fuzzed_strings(amounts, args.seed)
+    check(amounts, strings)
+    print(f"{len(amounts):,} amounts and {len(strings):,} strings "
+          f"match the Decimal functions.")
+
+    pairs = {
+        "format": (
+            lambda: [legacy_display(amount, "GBP") for amount in amounts],
+            lambda: [cents_to_display(amount, "GBP") for amount in amounts],
+        ),
+        "format_many": (
+            lambda: [legacy_display(amount, "GBP") for amount in amounts],
+            lambda: format_many(amounts, "GBP"),
+        ),
+        "parse": (
+            lambda: [legacy_parse(text) for text in strings[8:]],
+            lambda: [parse_display_amount_to_cents(text)
+                     for text in strings[8:]],
+        ),
+    }
+    for label, (old, new) in pairs.items():
+        old_cpu = best_of(args.repeats, old)
+        new_cpu = best_of(args.repeats, new)
+        print(f"{label:>12}: Decimal {old_cpu * 1000:8.1f}ms, "
+              f"integer {new_cpu * 1000:8.1f}ms "
+              f"({old_cpu / new_cpu:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+I replay search-as-you-type traffic against a running Ledgerly server.
+
+Each simulated user logs in once, then "types" words one letter at a time,
+requesting search results and name suggestions for every prefix the way
+the dashboard does. I report throughput and latency so a WSGI deployment
+can be compared with an ASGI one started against the same database::
+
+    gunicorn ledgerly.wsgi --bind 127.0.0.1:8001
+    gunicorn ledgerly.asgi:application --bind 127.0.0.1:8002 \\
+        --worker-class uvicorn_worker.UvicornWorker
+
+    python benchmarks/search_as_you_type.py http://127.0.0.1:8001 \\
+        --username demo --password secret --users 32
+    python benchmarks/search_as_you_type.py http://127.0.0.1:8002 \\
+        --username demo --password secret --users 32
+
+I only use the standard library, so I run from any checkout.
+"""
+
+import argparse
+import http.client
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_WORDS = (
+    'groceries', 'coffee', 'rent', 'salary', 'train', 'dinner', 'books',
+    'electricity', 'gym', 'pharmacy', 'taxi', 'lunch',
+)
+ENDPOINTS = (
+    '/transactions/search-results/',
+    '/transactions/suggestions/',
+)
+_CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def _connect(base_url):
+    parts = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection
+        if parts.scheme == 'https'
+        else http.client.HTTPConnection
+    )
+    return connection_class(parts.hostname, parts.port, timeout=30)
+
+
+def _read(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def log_in(base_url, username, password):
+    """Return the cookie header of a fresh logged-in session."""
+
+    connection = _connect(base_url)
+    response, page = _read(connection, 'GET', '/accounts/login/')
+    cookies = SimpleCookie()
+    cookies.load(response.getheader('Set-Cookie') or '')
+    token = _CSRF_RE.search(page.decode('utf-8'))
+    if 'csrftoken' not in cookies or token is None:
+        raise SystemExit('The login page did not return a CSRF token.')
+
+    response, _ = _read(
+        connection,
+        'POST',
+        '/accounts/login/',
+        body=urlencode({
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': token.group(1),
+        }),
+        headers={
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': f"csrftoken={cookies['csrftoken'].value}",
+            'Referer': base_url + '/accounts/login/',
+        },
+    )
+    cookies.load(response.getheader('Set-Cookie') or '')
+    if response.status != 302 or 'sessionid' not in cookies:
+        raise SystemExit(f'Could not log in as {username!r}.')
+    connection.close()
+    return '; '.join(
+        f'{name}={morsel.value}' for name, morsel in cookies.items()
+    )
+
+
+def type_words(base_url, cookie, words, latencies, lock):
+    """Type every word letter by letter and time each request."""
+
+    connection = _connect(base_url)
+    headers = {'Cookie': cookie, 'X-Requested-With': 'XMLHttpRequest'}
+    errors = 0
+    for word in words:
+        for length in range(1, len(word) + 1):
+            query = urlencode({'q': word[:length]})
+            for endpoint in ENDPOINTS:
+                started = time.perf_counter()
+                try:
+                    response, _ = _read(
+                        connection, 'GET', f'{endpoint}?{query}',
+                        headers=headers,
+                    )
+                    failed = response.status != 200
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = _connect(base_url)
+                    failed = True
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                errors += failed
+    connection.close()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('base_url', help='e.g. http://127.0.0.1:8000')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument(
+        '--users', type=int, default=32,
+        help='How many people type at the same time.',
+    )
+    parser.add_argument(
+        '--rounds', type=int, default=2,
+        help='How many times each person types the word list.',
+    )
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    cookie = log_in(base_url, args.username, args.password)
+    words = list(DEFAULT_WORDS) * args.rounds
+    latencies = []
+    lock = threading.Lock()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        errors = sum(pool.map(
+            lambda offset: type_words(
+                base_url,
+                cookie,
+                words[offset % len(DEFAULT_WORDS):]
+                + words[:offset % len(DEFAULT_WORDS)],
+                latencies,
+                lock,
+            ),
+            range(args.users),
+        ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f'{len(latencies)} requests from {args.users} users '
+          f'in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s), '
+          f'{errors} failed')
+    print(f'latency p50 {statistics.median(latencies) * 1000:.1f}ms, '
+          f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f}ms, '
+          f'max {latencies[-1] * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,42 @@
 """I wire up the Ledgerly admin so it feels cohesive inside Django admin."""
 
+from decimal import Decimal
+
 from django.contrib import admin
 from django.contrib.admin import AdminSite
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.contrib.auth.models import User
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import F, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.forms.models import BaseInlineFormSet
+from django.http import JsonResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.html import format_html
+from django.utils.http import urlencode
 from django import forms
 
-from .models import Category, Transaction, UserSettings
-from .currencies import CURRENCY_CHOICES
+from . import search
+from .models import Category, CycleSummary, Transaction, UserSettings
+from .currencies import CURRENCY_CHOICES, DEFAULT_CURRENCY, cents_to_display
+
+# The user page shows one page of transactions at a time, picked and
+# filtered with these query parameters.
+TRANSACTION_INLINE_PAGE_SIZE = 20
+TRANSACTION_PAGE_PARAM = 'txn_page'
+TRANSACTION_SEARCH_PARAM = 'txn_q'
+TRANSACTION_TYPE_PARAM = 'txn_type'
+
+# The transaction changelist counts matches exactly up to this many rows
+# and estimates beyond it, so a count never reads the whole table.
+EXACT_COUNT_LIMIT = 10_000
+# Autocomplete filters suggest at most this many values per keystroke.
+LOOKUP_LIMIT = 20
 
 
 class LedgerlyAdminSite(AdminSite):
@@ -85,6 +113,26 @@ class LedgerlyAdminSite(AdminSite):
 ledgerly_admin_site = LedgerlyAdminSite(name="ledgerly_admin")
 
 
+def _user_currency(user) -> str:
+    """I return a user's currency from already-loaded settings, or USD."""
+
+    settings = getattr(user, 'settings', None)
+    return (settings.currency_code if settings else None) or DEFAULT_CURRENCY
+
+
+def _amount_html(obj):
+    """I render a transaction's amount, red for outgoings, green for income."""
+
+    if not obj or obj.amount_in_cents is None:
+        return "No amount"
+    color = "#dc3545" if obj.type == Transaction.OUTGO else "#28a745"
+    return format_html(
+        '<span style="color: {}; font-weight: bold;">{}</span>',
+        color,
+        cents_to_display(obj.amount_in_cents, _user_currency(obj.user)),
+    )
+
+
 class AccountUser(User):
     """I expose a proxy model to customise how Users appear in admin."""
 
@@ -138,9 +186,11 @@ class TransactionInlineForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Convert cents to decimal for display
+        # Convert cents to decimal for display; a Decimal (unlike a float)
+        # compares equal to the posted value, so untouched rows are seen
+        # as unchanged.
         if self.instance and self.instance.amount_in_cents is not None:
-            amount_decimal = self.instance.amount_in_cents / 100
+            amount_decimal = Decimal(self.instance.amount_in_cents).scaleb(-2)
             self.fields['formatted_amount'].initial = amount_decimal
 
     def save(self, commit=True):
@@ -151,51 +201,119 @@ class TransactionInlineForm(forms.ModelForm):
         return super().save(commit)
 
 
+class TransactionInlineFormSet(BaseInlineFormSet):
+    """
+    I edit one page of a user's transactions instead of all of them.
+
+    The page and filters come from the change page's query string. A save
+    edits exactly the rows the form posted back, looked up by their ids
+    among this user's transactions, so rows added or removed since the
+    page was rendered cannot shift the page under it. Rows that come back
+    unchanged are neither validated nor saved.
+    """
+
+    def __init__(self, *args, page_number=None, search='', txn_type='',
+                 **kwargs):
+        self.page_number = page_number
+        self.search = (search or '').strip()
+        self.txn_type = (
+            txn_type if txn_type in dict(Transaction.TYPE_CHOICES) else ''
+        )
+        self.page = None
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        if self.page is None:
+            queryset = super().get_queryset()
+            if self.search:
+                queryset = queryset.filter(name__icontains=self.search)
+            if self.txn_type:
+                queryset = queryset.filter(type=self.txn_type)
+            self.page = Paginator(
+                queryset, TRANSACTION_INLINE_PAGE_SIZE
+            ).get_page(self.page_number)
+            if self.is_bound:
+                self._queryset = super().get_queryset().filter(
+                    pk__in=self.posted_ids()
+                )
+            else:
+                self._queryset = self.page.object_list
+        return self._queryset
+
+    def posted_ids(self) -> list:
+        """Return the ids of the existing rows the form posted back."""
+
+        pk_name = self.model._meta.pk.name
+        ids = []
+        for index in range(self.initial_form_count()):
+            value = self.data.get(f'{self.add_prefix(index)}-{pk_name}')
+            if value and str(value).isdigit():
+                ids.append(int(value))
+        return ids
+
+    def _construct_form(self, i, **kwargs):
+        if i < self.initial_form_count():
+            # Unchanged rows skip validation, and with it the per-row
+            # lookup of their primary key.
+            kwargs['empty_permitted'] = True
+        return super()._construct_form(i, **kwargs)
+
+    def page_query(self, number) -> str:
+        """Return the query string that shows page ``number``."""
+
+        params = {TRANSACTION_PAGE_PARAM: number}
+        if self.search:
+            params[TRANSACTION_SEARCH_PARAM] = self.search
+        if self.txn_type:
+            params[TRANSACTION_TYPE_PARAM] = self.txn_type
+        return f'?{urlencode(params)}'
+
+    @property
+    def previous_page_query(self) -> str:
+        self.get_queryset()
+        if not self.page.has_previous():
+            return ''
+        return self.page_query(self.page.previous_page_number())
+
+    @property
+    def next_page_query(self) -> str:
+        self.get_queryset()
+        if not self.page.has_next():
+            return ''
+        return self.page_query(self.page.next_page_number())
+
+    @property
+    def type_choices(self):
+        return Transaction.TYPE_CHOICES
+
+
 class TransactionInline(admin.TabularInline):
     """Inline admin for viewing/editing user transactions."""
 
     model = Transaction
     form = TransactionInlineForm
+    formset = TransactionInlineFormSet
+    template = 'admin/expenses/transaction_inline.html'
     extra = 0
-    max_num = 20  # Limit to most recent 20 for performance
     fields = (
         'name', 'type', 'formatted_amount', 'formatted_amount_display',
         'category', 'occurred_on'
     )
     readonly_fields = ('formatted_amount_display',)
-    ordering = ('-occurred_on', '-created_at')
+    # Newest first along txn_user_date_idx, with the id as a tie-break so
+    # pages never overlap.
+    ordering = ('-occurred_on', '-id')
+
+    def get_queryset(self, request):
+        """I join the user settings so amounts format without queries."""
+        return super().get_queryset(request).select_related(
+            'user__settings'
+        )
 
     @admin.display(description='Formatted Amount')
     def formatted_amount_display(self, obj):
         """Show formatted amount in inline."""
-        if not obj or obj.amount_in_cents is None:
-            return "No amount"
-
-        try:
-            amount = obj.amount_in_cents / 100
-            currency_code = 'USD'  # Default currency
-
-            # Try to get user currency preference
-            if obj.user:
-                try:
-                    # Get or create user settings
-                    from .models import UserSettings
-                    settings, created = UserSettings.objects.get_or_create(
-                        user=obj.user
-                    )
-                    currency_code = settings.currency_code or 'USD'
-                except Exception:
-                    currency_code = 'USD'
-
-            symbol = "£" if currency_code == 'GBP' else "$"
-            color = "#dc3545" if obj.type == 'OUTGO' else "#28a745"
-            formatted_amount = f"{symbol}{amount:.2f}"
-            return format_html(
-                '<span style="color: {}; font-weight: bold;">{}</span>',
-                color, formatted_amount
-            )
-        except Exception as e:
-            return f"Error: {str(e)[:20]}"
+        return _amount_html(obj)
 
 
 class AccountUserAdmin(DjangoUserAdmin):
@@ -206,7 +324,8 @@ class AccountUserAdmin(DjangoUserAdmin):
     # Enhanced list view showing key user metrics
     list_display = (
         'username', 'email', 'is_active', 'date_joined',
-        'cycle_start_date', 'currency_display', 'transaction_count'
+        'cycle_start_date', 'currency_display', 'transaction_count',
+        'last_transaction_on', 'cycle_balance'
     )
 
     list_filter = (
@@ -243,11 +362,61 @@ class AccountUserAdmin(DjangoUserAdmin):
     list_editable = ('is_active',)
     ordering = ('-date_joined',)
 
+    def get_formset_kwargs(self, request, obj, inline, prefix):
+        """I pass the transaction page and filters to the inline."""
+        kwargs = super().get_formset_kwargs(request, obj, inline, prefix)
+        if isinstance(inline, TransactionInline):
+            kwargs.update(
+                page_number=request.GET.get(TRANSACTION_PAGE_PARAM),
+                search=request.GET.get(TRANSACTION_SEARCH_PARAM, ''),
+                txn_type=request.GET.get(TRANSACTION_TYPE_PARAM, ''),
+            )
+        return kwargs
+
     def get_queryset(self, request):
-        """Optimize queries for user data container."""
+        """
+        I annotate each user's metrics so a page costs one query.
+
+        Counts and the current balance come from the user's cycle rows,
+        which are already totalled, and the last date from the newest
+        transaction on the user/date index, so sorting by any of them
+        never reads the whole transactions table.
+        """
+
         queryset = super().get_queryset(request)
-        return queryset.select_related('settings').prefetch_related(
-            'transactions'
+        summaries = CycleSummary.objects.filter(
+            user=OuterRef('pk')
+        ).order_by()
+        today = timezone.localdate()
+        return queryset.select_related('settings').annotate(
+            txn_count=Coalesce(
+                Subquery(
+                    summaries
+                    .values('user')
+                    .annotate(
+                        total=Sum(F('income_count') + F('outgo_count'))
+                    )
+                    .values('total')
+                ),
+                0,
+            ),
+            last_txn_on=Subquery(
+                Transaction.objects
+                .filter(user=OuterRef('pk'))
+                .order_by('-occurred_on')
+                .values('occurred_on')[:1]
+            ),
+            cycle_balance_cents=Coalesce(
+                Subquery(
+                    summaries
+                    .filter(cycle_start__lte=today, cycle_end__gt=today)
+                    .annotate(
+                        balance=F('income_cents') - F('outgo_cents')
+                    )
+                    .values('balance')[:1]
+                ),
+                0,
+            ),
         )
 
     @admin.display(description='Cycle Start')
@@ -266,19 +435,39 @@ class AccountUserAdmin(DjangoUserAdmin):
             return currency_dict.get(code, code)
         return "USD"
 
-    @admin.display(description='Total Transactions')
+    @admin.display(description='Total Transactions', ordering='txn_count')
     def transaction_count(self, obj):
         """Show total transactions for this user."""
-        count = Transaction.objects.filter(user=obj).count()
+        count = obj.txn_count
         if count == 0:
             return "No transactions"
         return f"{count} transactions"
 
+    @admin.display(description='Last Transaction', ordering='last_txn_on')
+    def last_transaction_on(self, obj):
+        """Show the date of the user's most recent transaction."""
+        if obj.last_txn_on is None:
+            return "Never"
+        return obj.last_txn_on.strftime('%Y-%m-%d')
+
+    @admin.display(
+        description='Cycle Balance',
+        ordering='cycle_balance_cents',
+    )
+    def cycle_balance(self, obj):
+        """Show income minus outgoings for the user's current cycle."""
+        return cents_to_display(
+            obj.cycle_balance_cents, _user_currency(obj)
+        )
+
 
 class CategoryAdmin(admin.ModelAdmin):
     """I manage expense categories with enhanced add/edit capabilities."""
 
-    list_display = ('name', 'is_active', 'transaction_count', 'created_info')
+    list_display = (
+        'name', 'is_active', 'spending_entries', 'first_spent_info',
+        'last_spent_info'
+    )
     list_filter = ('is_active',)
     search_fields = ('name',)
     ordering = ('name',)
@@ -304,20 +493,151 @@ class CategoryAdmin(admin.ModelAdmin):
         }),
     )
 
-    @admin.display(description='Transaction Count')
-    def transaction_count(self, obj):
-        """Show how many transactions use this category."""
-        count = obj.transaction_set.count()
-        return f"{count} transaction{'s' if count != 1 else ''}"
+    def get_queryset(self, request):
+        """
+        I annotate spending from the daily rollups in the same query.
+
+        The rollups already hold a count per user, day and category, so
+        the totals and first and last days cost one grouped join over a
+        table far smaller than the transactions, whatever the page size.
+        They file income under no category, so the columns describe
+        outgoings only, by the day they occurred.
+        """
+        return super().get_queryset(request).annotate(
+            spending_count=Coalesce(Sum('dailyrollup__count'), 0),
+            first_spent_on=Min('dailyrollup__day'),
+            last_spent_on=Max('dailyrollup__day'),
+        )
 
-    @admin.display(description='Usage Info')
-    def created_info(self, obj):
-        """Show when category was first used."""
-        first_transaction = obj.transaction_set.order_by('created_at').first()
-        if first_transaction:
-            date_str = first_transaction.created_at.strftime('%Y-%m-%d')
-            return f"First used: {date_str}"
-        return "Never used"
+    @admin.display(description='Spending Entries', ordering='spending_count')
+    def spending_entries(self, obj):
+        """Show how many outgoings use this category."""
+        count = obj.spending_count
+        return f"{count} entr{'ies' if count != 1 else 'y'}"
+
+    @admin.display(description='First Spent', ordering='first_spent_on')
+    def first_spent_info(self, obj):
+        """Show the day of the first outgoing in this category."""
+        if obj.first_spent_on:
+            return obj.first_spent_on.strftime('%Y-%m-%d')
+        return "Never spent"
+
+    @admin.display(description='Last Spent', ordering='last_spent_on')
+    def last_spent_info(self, obj):
+        """Show the day of the latest outgoing in this category."""
+        if obj.last_spent_on:
+            return obj.last_spent_on.strftime('%Y-%m-%d')
+        return "Never spent"
+
+
+def _estimated_rows(model) -> int:
+    """I return the planner's row estimate for a table, or 0 if unknown."""
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [table],
+            )
+        else:
+            # Rowid tables hand out ids in order, so the largest id is a
+            # cheap upper bound on the row count.
+            cursor.execute(
+                f'SELECT MAX({connection.ops.quote_name("id")}) '
+                f'FROM {connection.ops.quote_name(table)}'
+            )
+        row = cursor.fetchone()
+    return max(int(row[0] or 0), 0) if row else 0
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    I count a changelist exactly up to ``EXACT_COUNT_LIMIT`` rows.
+
+    The count runs over a ``LIMIT``-ed subquery, so it stops early on
+    big tables. Past the limit an unfiltered list takes the table's
+    estimated size and a filtered one reports the limit itself.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        exact = queryset.order_by()[:EXACT_COUNT_LIMIT + 1].count()
+        if exact <= EXACT_COUNT_LIMIT:
+            return exact
+        if not queryset.query.where:
+            return max(_estimated_rows(queryset.model), EXACT_COUNT_LIMIT)
+        return EXACT_COUNT_LIMIT
+
+
+class AutocompleteListFilter(admin.SimpleListFilter):
+    """
+    I filter by one typed value instead of listing every possible choice.
+
+    The sidebar holds a text box that suggests values from the model
+    admin's lookup view as people type, so rendering the changelist never
+    loads a whole table of users or categories.
+    """
+
+    template = 'admin/expenses/autocomplete_filter.html'
+    lookup_kind = None
+
+    def lookups(self, request, model_admin):
+        self.lookup_url = reverse(
+            f'{model_admin.admin_site.name}:expenses_transaction_lookup',
+            args=[self.lookup_kind],
+        )
+        value = self.value()
+        return [(value, value)] if value else []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'lookup_url': self.lookup_url,
+            'clear_query_string': changelist.get_query_string(
+                remove=[self.parameter_name, PAGE_VAR]
+            ),
+            'hidden': [
+                (name, value)
+                for name, value in changelist.params.items()
+                if name not in (self.parameter_name, PAGE_VAR)
+            ],
+        }
+
+
+class UserAutocompleteFilter(AutocompleteListFilter):
+    """I narrow transactions to one user, picked by exact username."""
+
+    title = 'user'
+    parameter_name = 'username'
+    lookup_kind = 'user'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__in=User.objects.filter(
+                username=self.value()
+            ).values('pk'))
+        return queryset
+
+
+class CategoryAutocompleteFilter(AutocompleteListFilter):
+    """I narrow transactions to the categories with one exact name."""
+
+    title = 'category'
+    parameter_name = 'category_name'
+    lookup_kind = 'category'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category__in=Category.objects.filter(
+                name=self.value()
+            ).values('pk'))
+        return queryset
 
 
 class TransactionAdminForm(forms.ModelForm):
@@ -360,13 +680,24 @@ class TransactionAdmin(admin.ModelAdmin):
         'category', 'occurred_on', 'created_at'
     )
     list_filter = (
-        'type', 'category', 'occurred_on', 'created_at',
-        'user', 'user__settings__currency_code'
+        'type', UserAutocompleteFilter, CategoryAutocompleteFilter,
+        'occurred_on', 'created_at', 'user__settings__currency_code'
     )
-    search_fields = ('name', 'note', 'user__username', 'user__email')
-    date_hierarchy = 'occurred_on'
-    ordering = ('-occurred_on', '-created_at')
+    # These only show the search box; get_search_results runs prefix-only
+    # word searches on the full-text index, or finds one person by their
+    # unique (indexed) username. An exact email address has no index and
+    # scans the users table, which is far smaller than the transactions
+    # and is only read when a search is submitted.
+    search_fields = ('name', 'category__name', 'note', 'type')
+    search_help_text = (
+        'Words match the start of words in the name, category, note or '
+        'type. Use user:<username> or email:<address> for one person.'
+    )
+    # I leave out date_hierarchy: its date links scan every row.
+    ordering = ('-occurred_on', '-id')
     readonly_fields = ('created_at', 'updated_at')
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     # Enhanced fieldsets with user container focus
     fieldsets = (
@@ -400,35 +731,7 @@ class TransactionAdmin(admin.ModelAdmin):
     @admin.display(description='Amount')
     def formatted_amount(self, obj):
         """Display amount in user's preferred currency format."""
-        if not obj or obj.amount_in_cents is None:
-            return "No amount"
-
-        try:
-            amount = obj.amount_in_cents / 100
-            currency_code = 'USD'  # Default currency
-
-            # Try to get user currency preference
-            if obj.user:
-                try:
-                    # Get or create user settings
-                    from .models import UserSettings
-                    settings, created = UserSettings.objects.get_or_create(
-                        user=obj.user
-                    )
-                    currency_code = settings.currency_code or 'USD'
-                except Exception:
-                    currency_code = 'USD'
-
-            symbol = "£" if currency_code == 'GBP' else "$"
-            # Red for expenses, green for income
-            color = "#dc3545" if obj.type == 'OUTGO' else "#28a745"
-            amount_str = f"{symbol}{amount:.2f}"
-            return format_html(
-                '<span style="color: {}; font-weight: bold;">{}</span>',
-                color, amount_str
-            )
-        except Exception as e:
-            return f"Error: {str(e)[:20]}"
+        return _amount_html(obj)
 
     def get_queryset(self, request):
         """Optimize queries for user data display."""
@@ -436,6 +739,59 @@ class TransactionAdmin(admin.ModelAdmin):
             'user', 'user__settings', 'category'
         )
 
+    def get_search_results(self, request, queryset, search_term):
+        """I run one of the indexed search modes instead of ``icontains``."""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        mode, _, value = term.partition(':')
+        if mode in ('user', 'email') and value.strip():
+            field = 'username' if mode == 'user' else 'email'
+            users = User.objects.filter(**{field: value.strip()})
+            return queryset.filter(user__in=users.values('pk')), False
+        terms = search.search_terms(term)
+        if not terms:
+            return queryset.none(), False
+        return search.get_backend().filter_matching(queryset, terms), False
+
+    def get_urls(self):
+        return [
+            path(
+                'lookup/<str:kind>/',
+                self.admin_site.admin_view(self.lookup_view),
+                name='expenses_transaction_lookup',
+            ),
+        ] + super().get_urls()
+
+    def lookup_view(self, request, kind):
+        """
+        Suggest usernames or category names starting with ``term``.
+
+        The match is case-sensitive so Postgres can answer it from the
+        ``varchar_pattern_ops`` indexes Django adds for the unique username
+        and the model adds for category names, on every keystroke.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        sources = {
+            'user': (User.objects, 'username'),
+            'category': (Category.objects, 'name'),
+        }
+        if kind not in sources:
+            return JsonResponse({'error': 'Unknown lookup.'}, status=404)
+        manager, field = sources[kind]
+        term = request.GET.get('term', '').strip()
+        results = []
+        if term:
+            results = list(
+                manager
+                .filter(**{f'{field}__startswith': term})
+                .order_by(field)
+                .values_list(field, flat=True)
+                .distinct()[:LOOKUP_LIMIT]
+            )
+        return JsonResponse({'results': results})
+
 
 ledgerly_admin_site.register(AccountUser, AccountUserAdmin)
 ledgerly_admin_site.register(Category, CategoryAdmin)
@@ -8,3 +8,8 @@ class ExpensesConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'expenses'
+
+    def ready(self):
+        """I hook up signal handlers, job kinds and system checks."""
+
+        from . import checks, purges, signals  # noqa: F401
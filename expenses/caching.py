@@ -0,0 +1,173 @@
+"""I keep the per-user dashboard cache and its invalidation helpers here."""
+
+import hashlib
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db.models import F
+from django.utils.cache import quote_etag
+
+from .models import Category, UserSettings
+
+CATEGORIES_CACHE_KEY = 'ledgerly:active-categories'
+STATS_KEYS = {
+    'hits': 'ledgerly:dashboard-cache:hits',
+    'misses': 'ledgerly:dashboard-cache:misses',
+}
+# Backends whose ``incr`` is one atomic step. The database cache reads and
+# rewrites the row instead, which costs more queries than a hit saves and
+# loses counts between concurrent workers, so I keep no counters there.
+ATOMIC_COUNTER_BACKENDS = (RedisCache, LocMemCache)
+
+
+def _timeout() -> int:
+    """Return how long I keep cached dashboards around, in seconds."""
+
+    return getattr(settings, 'LEDGERLY_DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def dashboard_cache_key(settings_obj: UserSettings, today: date) -> str:
+    """
+    Build the cache key for a user's dashboard context.
+
+    The key carries the user's data version plus the settings and date the
+    context depends on, so any change simply points at a fresh key.
+    """
+
+    return ':'.join((
+        'ledgerly:dashboard',
+        str(settings_obj.user_id),
+        str(settings_obj.data_version),
+        settings_obj.cycle_start_date.isoformat()
+        if settings_obj.cycle_start_date else '-',
+        settings_obj.currency_code or '-',
+        today.isoformat(),
+    ))
+
+
+def load_dashboard(
+    settings_obj: UserSettings,
+    today: date,
+) -> Tuple[Optional[dict], Optional[list]]:
+    """Fetch the cached context and category list in one round trip."""
+
+    key = dashboard_cache_key(settings_obj, today)
+    found = cache.get_many([key, CATEGORIES_CACHE_KEY])
+    context = found.get(key)
+    _count('hits' if context is not None else 'misses')
+    return context, found.get(CATEGORIES_CACHE_KEY)
+
+
+def store_dashboard(
+    settings_obj: UserSettings,
+    today: date,
+    context: Optional[dict] = None,
+    categories: Optional[list] = None,
+) -> None:
+    """Cache whichever of the context and category list I had to compute."""
+
+    entries = {}
+    if context is not None:
+        entries[dashboard_cache_key(settings_obj, today)] = context
+    if categories is not None:
+        entries[CATEGORIES_CACHE_KEY] = categories
+    if entries:
+        cache.set_many(entries, _timeout())
+
+
+def bump_data_version(*user_ids: int) -> None:
+    """Mark the given users' cached data as stale."""
+
+    ids = {user_id for user_id in user_ids if user_id is not None}
+    if ids:
+        UserSettings.objects.filter(user_id__in=ids).update(
+            data_version=F('data_version') + 1
+        )
+
+
+def bump_all_data_versions() -> None:
+    """
+    Mark every user's cached data as stale.
+
+    Cached dashboards and response tags show category names, so a category
+    edit has to reach all of them, whichever worker cached them.
+    """
+
+    UserSettings.objects.update(data_version=F('data_version') + 1)
+
+
+def active_categories() -> list:
+    """Return the active categories from the shared cache when I can."""
+
+    categories = cache.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = list(Category.objects.filter(is_active=True))
+        cache.set(CATEGORIES_CACHE_KEY, categories, _timeout())
+    return categories
+
+
+def invalidate_categories() -> None:
+    """Forget the shared cached category list after an admin edit."""
+
+    cache.delete(CATEGORIES_CACHE_KEY)
+
+
+def response_etag(settings_obj: UserSettings, *parts) -> str:
+    """
+    Build the ETag of a JSON response computed from a user's data.
+
+    Every write to the user's history and every category edit bumps their
+    data version in the database, so the tag moves whenever the body could,
+    on every worker. ``parts`` carry what the request asked for.
+    """
+
+    raw = '|'.join(str(part) for part in (
+        settings_obj.user_id,
+        settings_obj.data_version,
+        settings_obj.currency_code or '-',
+        *parts,
+    ))
+    return quote_etag(
+        hashlib.blake2b(raw.encode('utf-8'), digest_size=12).hexdigest()
+    )
+
+
+def counts_lookups() -> bool:
+    """Return whether the configured cache keeps hit and miss counters."""
+
+    return isinstance(caches['default'], ATOMIC_COUNTER_BACKENDS)
+
+
+def _count(outcome: str) -> None:
+    """Increment a shared hit or miss counter where that is atomic."""
+
+    if not counts_lookups():
+        return
+    key = STATS_KEYS[outcome]
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def dashboard_cache_stats() -> Dict[str, float]:
+    """Return the dashboard cache hit and miss counters for monitoring."""
+
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {
+        name: int(values.get(key) or 0) for name, key in STATS_KEYS.items()
+    }
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0
+    return stats
+
+
+def reset_dashboard_cache_stats() -> None:
+    """Zero the hit and miss counters."""
+
+    cache.delete_many(list(STATS_KEYS.values()))
@@ -0,0 +1,30 @@
+"""I hold the system checks for settings the expenses app depends on."""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries live in one process only.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when the default cache is not shared between processes."""
+
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [
+        Warning(
+            'The default cache is private to each process.',
+            hint=(
+                'Cached dashboards and their invalidation need a cache '
+                'every worker shares: set REDIS_URL or use DatabaseCache.'
+            ),
+            obj=backend,
+            id='expenses.W001',
+        )
+    ]
@@ -1,7 +1,7 @@
 """I keep currency helpers and metadata for Ledgerly here."""
 
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 CURRENCY_CHOICES: Iterable[Tuple[str, str]] = (
     ("USD", "US Dollar ($)"),
@@ -19,6 +19,16 @@ CURRENCY_SYMBOLS: Dict[str, str] = {
 
 MAX_CENTS = 9_000_000_000_000_00  # I cap amounts at nine trillion cents/pence.
 
+# The text I put before positive and negative amounts in each currency, so
+# formatting never has to look up or concatenate a symbol per amount.
+DISPLAY_PREFIXES: Dict[str, Tuple[str, str]] = {
+    code: (symbol, f"{symbol}-") for code, symbol in CURRENCY_SYMBOLS.items()
+}
+
+# Plain decimals longer than this go through Decimal, which knows when
+# they are too long to hold.
+_PLAIN_AMOUNT_DIGITS = 20
+
 
 def get_currency_symbol(code: str) -> str:
     """I return the symbol for the supplied ISO currency code."""
@@ -33,21 +43,94 @@ def quantize_amount(value: Decimal) -> Decimal:
 
 
 def cents_to_display(amount_in_cents: int, currency_code: str) -> str:
-    """I format an integer amount of cents in the user's currency."""
-
-    symbol = get_currency_symbol(currency_code)
-    try:
-        cents = int(amount_in_cents)
-    except (TypeError, ValueError):
-        cents = 0
-
-    units = Decimal(cents) / Decimal(100)
-    formatted = f"{quantize_amount(units):,.2f}"
-    return f"{symbol}{formatted}"
+    """
+    I format an integer amount of cents in the user's currency.
+
+    I only use integer division, which gives the same text the Decimal
+    arithmetic I used to do gave, without its cost.
+    """
+
+    positive, negative = DISPLAY_PREFIXES.get(
+        currency_code, DISPLAY_PREFIXES[DEFAULT_CURRENCY]
+    )
+    if type(amount_in_cents) is not int:
+        try:
+            amount_in_cents = int(amount_in_cents)
+        except (TypeError, ValueError):
+            amount_in_cents = 0
+    if amount_in_cents < 0:
+        units, remainder = divmod(-amount_in_cents, 100)
+        return f"{negative}{units:,}.{remainder:02d}"
+    units, remainder = divmod(amount_in_cents, 100)
+    return f"{positive}{units:,}.{remainder:02d}"
+
+
+def format_many(amounts: Iterable, currency_code: str) -> List[str]:
+    """
+    I format many cent amounts in one currency, e.g. "£1,234.50".
+
+    I give exactly what ``cents_to_display`` gives for each amount
+    (including "$-0.05" for negatives and "$0.00" for values that are not
+    numbers), but look the currency up once for the whole batch.
+    """
+
+    positive, negative = DISPLAY_PREFIXES.get(
+        currency_code, DISPLAY_PREFIXES[DEFAULT_CURRENCY]
+    )
+    formatted = []
+    append = formatted.append
+    for amount in amounts:
+        if type(amount) is not int:
+            try:
+                amount = int(amount)
+            except (TypeError, ValueError):
+                amount = 0
+        if amount < 0:
+            units, remainder = divmod(-amount, 100)
+            append(f"{negative}{units:,}.{remainder:02d}")
+        else:
+            units, remainder = divmod(amount, 100)
+            append(f"{positive}{units:,}.{remainder:02d}")
+    return formatted
+
+
+def cents_to_plain(amount_in_cents: int) -> str:
+    """I format cents as a bare decimal (e.g. "1234.50") for data exports."""
+
+    cents = int(amount_in_cents)
+    sign = "-" if cents < 0 else ""
+    units, remainder = divmod(abs(cents), 100)
+    return f"{sign}{units}.{remainder:02d}"
 
 
 def parse_display_amount_to_cents(amount_str: str) -> int:
-    """I convert a string amount (e.g. "19.99") into integer cents."""
+    """
+    I convert a string amount (e.g. "19.99") into integer cents.
+
+    Half a cent or more rounds away from zero. Plain decimals are parsed
+    with integer arithmetic; other input (exponents, spaces, NaN and so
+    on) takes the Decimal path, which also raises the same errors.
+    """
+
+    if type(amount_str) is not str or not amount_str.isascii():
+        return _parse_with_decimal(amount_str)
+    sign = amount_str[:1]
+    digits = amount_str[1:] if sign in ("-", "+") else amount_str
+    whole, _, fraction = digits.partition(".")
+    if (
+        not (whole.isdigit() or (not whole and fraction))
+        or not (fraction.isdigit() or not fraction)
+        or len(whole) > _PLAIN_AMOUNT_DIGITS
+    ):
+        return _parse_with_decimal(amount_str)
+    cents = int(whole or "0") * 100 + int(fraction[:2].ljust(2, "0"))
+    if fraction[2:3] >= "5":
+        cents += 1
+    return -cents if sign == "-" else cents
+
+
+def _parse_with_decimal(amount_str) -> int:
+    """I parse an amount through Decimal, for anything out of the ordinary."""
 
     value = Decimal(amount_str)
     quantized = quantize_amount(value)
@@ -0,0 +1,199 @@
+"""I keep the billing-cycle maths and aggregation helpers for Ledgerly."""
+
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import List, NamedTuple
+
+from django.db import models
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+from .models import CycleSummary, Transaction
+
+
+class CycleReport(NamedTuple):
+    """I bundle the cycle totals the dashboard needs in one object."""
+
+    cycle_starts: List[date]
+    income_data: List[int]
+    expense_data: List[int]
+    current_start: date
+    current_end: date
+    income: int
+    outgo: int
+    top_expenses: List[Transaction]
+
+
+def cycle_month_shift(reference: date, months: int, cycle_day: int) -> date:
+    """Shift a reference date by whole months while keeping my cycle day."""
+
+    year = reference.year + (reference.month - 1 + months) // 12
+    month = (reference.month - 1 + months) % 12 + 1
+    day = min(cycle_day, monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def cycle_day_for(settings_obj) -> int:
+    """Return the anchor day I use for the user's cycles."""
+
+    if settings_obj is not None and settings_obj.cycle_start_date:
+        return settings_obj.cycle_start_date.day
+    return 1
+
+
+def cycle_start_for(day: date, cycle_day: int) -> date:
+    """Return the start of the cycle that contains ``day``."""
+
+    candidate = cycle_month_shift(day, 0, cycle_day)
+    if candidate > day:
+        return cycle_month_shift(day, -1, cycle_day)
+    return candidate
+
+
+def recent_cycle_starts(
+    current_start: date,
+    cycle_day: int,
+    cycles: int = 12,
+) -> List[date]:
+    """List the last ``cycles`` cycle starts, oldest first."""
+
+    return [
+        cycle_month_shift(current_start, -offset, cycle_day)
+        for offset in range(cycles - 1, -1, -1)
+    ]
+
+
+def _top_outgoings(
+    queryset: models.QuerySet,
+    start: date,
+    end: date,
+    top_n: int,
+) -> List[Transaction]:
+    """Return the largest outgoings between ``start`` and ``end``."""
+
+    if not top_n:
+        return []
+    return list(
+        queryset
+        .filter(
+            type=Transaction.OUTGO,
+            occurred_on__gte=start,
+            occurred_on__lt=end,
+        )
+        .select_related('category')
+        .order_by('-amount_in_cents')[:top_n]
+    )
+
+
+def build_cycle_report(
+    queryset: models.QuerySet,
+    today: date,
+    cycle_day: int,
+    cycles: int = 12,
+    top_n: int = 3,
+) -> CycleReport:
+    """
+    Bucket the user's transactions into their last ``cycles`` cycles.
+
+    I label every row with its cycle index through a ``CASE`` expression
+    and group by that index and the transaction type, so all of the chart
+    series and the current-cycle totals come back from one grouped query.
+    The top outgoings for the current cycle are a single ``LIMIT`` query.
+    """
+
+    current_start = cycle_start_for(today, cycle_day)
+    next_start = cycle_month_shift(current_start, 1, cycle_day)
+    cycle_starts = recent_cycle_starts(current_start, cycle_day, cycles)
+    boundaries = cycle_starts + [next_start]
+
+    bucket = Case(
+        *[
+            When(
+                occurred_on__gte=boundaries[index],
+                occurred_on__lt=boundaries[index + 1],
+                then=Value(index),
+            )
+            for index in range(cycles)
+        ],
+        output_field=IntegerField(),
+    )
+    grouped = (
+        queryset
+        .filter(occurred_on__gte=boundaries[0], occurred_on__lt=next_start)
+        .annotate(cycle_bucket=bucket)
+        .order_by()
+        .values('cycle_bucket', 'type')
+        .annotate(total=Sum('amount_in_cents'))
+    )
+
+    income_data = [0] * cycles
+    expense_data = [0] * cycles
+    for row in grouped:
+        index = row['cycle_bucket']
+        if index is None:
+            continue
+        if row['type'] == Transaction.INCOME:
+            income_data[index] = row['total'] or 0
+        elif row['type'] == Transaction.OUTGO:
+            expense_data[index] = row['total'] or 0
+
+    return CycleReport(
+        cycle_starts=cycle_starts,
+        income_data=income_data,
+        expense_data=expense_data,
+        current_start=current_start,
+        current_end=next_start - timedelta(days=1),
+        income=income_data[-1],
+        outgo=expense_data[-1],
+        top_expenses=_top_outgoings(
+            queryset, current_start, next_start, top_n
+        ),
+    )
+
+
+def build_cycle_report_from_summaries(
+    user,
+    queryset: models.QuerySet,
+    today: date,
+    cycle_day: int,
+    cycles: int = 12,
+    top_n: int = 3,
+) -> CycleReport:
+    """
+    Build the same report as :func:`build_cycle_report` from rollups.
+
+    The totals come from at most ``cycles`` :class:`CycleSummary` rows, so
+    the cost no longer depends on how much history the user has; only the
+    top outgoings still touch ``queryset``.
+    """
+
+    current_start = cycle_start_for(today, cycle_day)
+    next_start = cycle_month_shift(current_start, 1, cycle_day)
+    cycle_starts = recent_cycle_starts(current_start, cycle_day, cycles)
+
+    summaries = {
+        summary.cycle_start: summary
+        for summary in CycleSummary.objects.filter(
+            user=user,
+            cycle_start__gte=cycle_starts[0],
+            cycle_start__lte=current_start,
+        )
+    }
+    income_data = []
+    expense_data = []
+    for start in cycle_starts:
+        summary = summaries.get(start)
+        income_data.append(summary.income_cents if summary else 0)
+        expense_data.append(summary.outgo_cents if summary else 0)
+
+    return CycleReport(
+        cycle_starts=cycle_starts,
+        income_data=income_data,
+        expense_data=expense_data,
+        current_start=current_start,
+        current_end=next_start - timedelta(days=1),
+        income=income_data[-1],
+        outgo=expense_data[-1],
+        top_expenses=_top_outgoings(
+            queryset, current_start, next_start, top_n
+        ),
+    )
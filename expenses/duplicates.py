@@ -0,0 +1,188 @@
+"""I spot transactions that repeat one the user has already recorded."""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import PendingDeletion, Transaction, UserSettings
+
+SKIP = 'skip'
+MERGE = 'merge'
+FLAG = 'flag'
+POLICY_CHOICES = [
+    (FLAG, 'Save it and flag it as a possible duplicate'),
+    (SKIP, 'Skip it'),
+    (MERGE, 'Merge its note and category into the existing entry'),
+]
+
+CREATED = 'created'
+SKIPPED = 'skipped'
+MERGED = 'merged'
+FLAGGED = 'flagged'
+
+# I look fingerprints up in slices that stay under SQLite's variable limit.
+LOOKUP_CHUNK = 500
+
+
+def default_policy() -> str:
+    """Return the policy for entries typed in by hand."""
+
+    return getattr(settings, 'LEDGERLY_DUPLICATE_POLICY', FLAG)
+
+
+def fingerprint_of(user_id: int, fields: dict) -> str:
+    """Return the fingerprint of cleaned, not yet saved, field values."""
+
+    return Transaction.fingerprint_for(
+        user_id,
+        fields['occurred_on'],
+        fields['amount_in_cents'],
+        fields['type'],
+        fields['name'],
+    )
+
+
+def find_duplicate(
+    user_id: int,
+    fingerprint: str,
+    exclude_pk: Optional[int] = None,
+) -> Optional[Transaction]:
+    """Return the oldest transaction sharing ``fingerprint``, if any."""
+
+    matches = PendingDeletion.hide_from(
+        Transaction.objects.filter(fingerprint=fingerprint, user_id=user_id),
+        user_id,
+    )
+    if exclude_pk is not None:
+        matches = matches.exclude(pk=exclude_pk)
+    return matches.order_by('pk').first()
+
+
+def merge_into(
+    existing: Transaction,
+    note: str = '',
+    category_id: Optional[int] = None,
+) -> bool:
+    """Fill gaps in ``existing`` from a repeat of it; report any change."""
+
+    changed = []
+    note = (note or '').strip()
+    if note and note not in existing.note:
+        existing.note = f'{existing.note}\n{note}' if existing.note else note
+        changed.append('note')
+    if (
+        category_id
+        and existing.category_id is None
+        and existing.type == Transaction.OUTGO
+    ):
+        existing.category_id = category_id
+        changed.append('category')
+    if changed:
+        existing.save(update_fields=[*changed, 'updated_at'])
+    return bool(changed)
+
+
+def _lock_history(user) -> None:
+    """
+    Hold off the user's other entries until the current transaction ends.
+
+    A no-op UPDATE of their settings row takes its row lock on Postgres
+    and the write lock on SQLite, which has no ``SELECT ... FOR UPDATE``,
+    so a second quick submit waits here and then sees the first one's row.
+    """
+
+    settings_rows = UserSettings.objects.filter(user=user)
+    if not settings_rows.update(data_version=F('data_version')):
+        UserSettings.objects.get_or_create(user=user)
+        settings_rows.update(data_version=F('data_version'))
+
+
+def add_transaction(
+    user,
+    fields: dict,
+    policy: Optional[str] = None,
+) -> Tuple[Transaction, str]:
+    """
+    Save a new transaction unless the policy says its repeat wins.
+
+    I return the transaction the caller should show and what happened:
+    ``created``, ``skipped`` (the existing entry is returned), ``merged``
+    (the existing entry absorbed the new note and category) or
+    ``flagged`` (saved, pointing at the entry it repeats). The check and
+    the write run under a per-user lock, so a double submit cannot slip
+    two copies past the check.
+    """
+
+    policy = policy or default_policy()
+    with transaction.atomic():
+        _lock_history(user)
+        existing = find_duplicate(user.pk, fingerprint_of(user.pk, fields))
+        if existing is None:
+            return Transaction.objects.create(user=user, **fields), CREATED
+        if policy == SKIP:
+            return existing, SKIPPED
+        if policy == MERGE:
+            merge_into(
+                existing, fields.get('note'), fields.get('category_id')
+            )
+            return existing, MERGED
+        return (
+            Transaction.objects.create(
+                user=user, duplicate_of=existing, **fields
+            ),
+            FLAGGED,
+        )
+
+
+class HistoryMatcher:
+    """
+    I match a stream of new rows against the history as it was before.
+
+    Repeats are counted, not just detected: if the history holds two
+    identical coffees and a re-imported statement lists three, only the
+    third is new. I fetch fingerprints lazily, one indexed ``IN`` lookup
+    per batch, before that batch is written.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self._existing: Dict[str, List[int]] = {}
+        self._seen: Dict[str, int] = defaultdict(int)
+
+    def prepare(self, fingerprints: Iterable[str]) -> None:
+        unknown = list({
+            fingerprint
+            for fingerprint in fingerprints
+            if fingerprint not in self._existing
+        })
+        for fingerprint in unknown:
+            self._existing[fingerprint] = []
+        for start in range(0, len(unknown), LOOKUP_CHUNK):
+            rows = (
+                PendingDeletion.hide_from(
+                    Transaction.objects.filter(
+                        user_id=self.user_id,
+                        fingerprint__in=unknown[start:start + LOOKUP_CHUNK],
+                    ),
+                    self.user_id,
+                )
+                # Ordering here would tempt the planner onto the plain
+                # user index, so I sort the few matches myself.
+                .order_by()
+                .values_list('fingerprint', 'pk')
+            )
+            for fingerprint, pk in rows:
+                self._existing[fingerprint].append(pk)
+        for fingerprint in unknown:
+            self._existing[fingerprint].sort()
+
+    def match(self, fingerprint: str) -> Optional[int]:
+        """Return the id of the stored entry this occurrence repeats."""
+
+        index = self._seen[fingerprint]
+        self._seen[fingerprint] += 1
+        matches = self._existing.get(fingerprint, ())
+        return matches[index] if index < len(matches) else None
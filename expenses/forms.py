@@ -5,6 +5,7 @@ from typing import cast
 
 from django import forms
 
+from . import duplicates
 from .currencies import (
     CURRENCY_CHOICES,
     DEFAULT_CURRENCY,
@@ -109,8 +110,37 @@ class TransactionForm(forms.ModelForm):
         if isinstance(name, str):
             cleaned_data['name'] = name.strip().title()
 
+        self._check_duplicate(cleaned_data)
         return cleaned_data
 
+    def _check_duplicate(self, cleaned_data):
+        """
+        Refuse or flag an edit that turns this entry into a repeat.
+
+        Merging needs two entries to fold together, so on an edit the
+        ``merge`` policy behaves like ``flag``.
+        """
+
+        user_id = self.instance.user_id
+        keys = ('occurred_on', 'amount_in_cents', 'type', 'name')
+        if self.errors or user_id is None or not all(
+            cleaned_data.get(key) for key in keys
+        ):
+            return
+        existing = duplicates.find_duplicate(
+            user_id,
+            duplicates.fingerprint_of(user_id, cleaned_data),
+            exclude_pk=self.instance.pk,
+        )
+        if existing is not None and (
+            duplicates.default_policy() == duplicates.SKIP
+        ):
+            raise forms.ValidationError(
+                'You already have this transaction on '
+                f'{existing.occurred_on:%d %b %Y}.'
+            )
+        self.instance.duplicate_of = existing
+
 
 class CurrencySettingsForm(forms.ModelForm):
     """I let users pick their preferred currency."""
@@ -126,3 +156,50 @@ class CurrencySettingsForm(forms.ModelForm):
         self.fields['currency_code'].widget.attrs.update({
             'class': 'form-select'
         })
+
+
+class TransactionExportForm(forms.Form):
+    """I validate the format and filters for a transaction export."""
+
+    FORMAT_CHOICES = [('csv', 'CSV'), ('ndjson', 'NDJSON')]
+
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    type = forms.ChoiceField(
+        choices=Transaction.TYPE_CHOICES,
+        required=False,
+    )
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(),
+        required=False,
+    )
+
+    def clean_format(self):
+        return self.cleaned_data.get('format') or 'csv'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start')
+        end = cleaned_data.get('end')
+        if start and end and start > end:
+            self.add_error('end', 'The end date must not be before the start.')
+        return cleaned_data
+
+
+class TransactionImportForm(forms.Form):
+    """I accept the CSV file a user wants to load into their history."""
+
+    file = forms.FileField(
+        label='CSV file',
+        help_text=(
+            'Use the columns of a Ledgerly export: date, name, type, '
+            'amount, and optionally currency, category and note.'
+        ),
+    )
+    duplicate_policy = forms.ChoiceField(
+        label='Rows already in your history',
+        choices=duplicates.POLICY_CHOICES,
+        initial=duplicates.SKIP,
+        required=False,
+    )
@@ -0,0 +1,212 @@
+"""I load CSV transaction histories in batches instead of row by row."""
+
+import csv
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import caching, duplicates, rollups
+from .currencies import DEFAULT_CURRENCY
+from .models import Category, Transaction, UserSettings
+from .validation import clean_new_transaction
+
+DEFAULT_BATCH_SIZE = 5000
+# I keep at most this many row errors so a bad file cannot eat memory.
+MAX_REPORTED_ERRORS = 1000
+REQUIRED_COLUMNS = ('date', 'name', 'type', 'amount')
+
+
+class RowError(NamedTuple):
+    """I point at one CSV line that could not be imported."""
+
+    line: int
+    message: str
+
+
+class ImportResult(NamedTuple):
+    """I summarise what an import did."""
+
+    created: int
+    failed: int
+    errors: List[RowError]
+    # Rows that repeated stored entries and were skipped, merged or flagged.
+    duplicates: int = 0
+
+
+class ImportFileError(ValueError):
+    """I signal a file that cannot be imported at all."""
+
+
+def _category_ids() -> Dict[str, int]:
+    """Map lower-cased category names to ids, preferring active ones."""
+
+    # Active categories come last so they win over retired namesakes.
+    return {
+        name.strip().lower(): pk
+        for pk, name in (
+            Category.objects
+            .order_by('is_active', 'pk')
+            .values_list('pk', 'name')
+        )
+    }
+
+
+def import_transactions(
+    user,
+    lines: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    duplicate_policy: str = duplicates.SKIP,
+) -> ImportResult:
+    """
+    Validate and insert the transactions in a CSV stream for ``user``.
+
+    I read the columns :mod:`expenses.exports` writes (``date``, ``name``,
+    ``type``, ``amount``, optional ``currency``, ``category`` and ``note``)
+    and check every row with the dashboard's rules. Good rows go in with
+    ``bulk_create``, one database transaction per batch, without any
+    per-row rollup upkeep; the user's rollups are rebuilt once at the end.
+    Bad rows are skipped and reported by line number.
+
+    Rows that repeat entries already in the history (by fingerprint, and
+    counting repeats) follow ``duplicate_policy``, so re-importing the
+    same statement does not double it.
+    """
+
+    reader = csv.DictReader(lines)
+    columns = [
+        (column or '').strip().lower() for column in reader.fieldnames or ()
+    ]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ImportFileError(
+            'The file is missing the column(s): ' + ', '.join(missing) + '.'
+        )
+    reader.fieldnames = columns
+
+    currency_code = (
+        UserSettings.objects
+        .filter(user=user)
+        .values_list('currency_code', flat=True)
+        .first()
+    ) or DEFAULT_CURRENCY
+    categories = _category_ids()
+    errors: List[RowError] = []
+    failed = 0
+    created = 0
+    repeated = 0
+    batch: List[dict] = []
+    matcher = duplicates.HistoryMatcher(user.pk)
+
+    def flush() -> None:
+        nonlocal created, repeated
+        matcher.prepare(fields['fingerprint'] for fields in batch)
+        inserts = []
+        merges = []
+        for fields in batch:
+            match = matcher.match(fields['fingerprint'])
+            if match is None:
+                inserts.append(fields)
+                continue
+            repeated += 1
+            if duplicate_policy == duplicates.MERGE:
+                merges.append((match, fields))
+            elif duplicate_policy == duplicates.FLAG:
+                inserts.append({**fields, 'duplicate_of_id': match})
+        if not dry_run:
+            with transaction.atomic():
+                _insert_batch(user.pk, inserts, batch_size)
+                _merge_batch(merges)
+        created += len(inserts)
+        batch.clear()
+
+    try:
+        for row in reader:
+            try:
+                fields = _clean_row(row, categories, currency_code)
+            except ValidationError as error:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(RowError(reader.line_num, error.message))
+                continue
+            fields['fingerprint'] = duplicates.fingerprint_of(user.pk, fields)
+            batch.append(fields)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if (created or repeated) and not dry_run:
+            rollups.rebuild_user_rollups(user.pk)
+            caching.bump_data_version(user.pk)
+
+    return ImportResult(created, failed, errors, repeated)
+
+
+def _merge_batch(merges: List[tuple]) -> None:
+    """Fold repeated rows into the entries they repeat."""
+
+    if not merges:
+        return
+    existing = Transaction.objects.in_bulk([pk for pk, _ in merges])
+    with rollups.suspended():
+        for pk, fields in merges:
+            duplicates.merge_into(
+                existing[pk],
+                fields['note'],
+                fields['category_id'],
+            )
+
+
+def _insert_batch(user_id: int, batch: List[dict], batch_size: int) -> None:
+    """
+    Insert already validated rows with ``bulk_create``.
+
+    Django sizes each statement under the backend's parameter limit and
+    fills field defaults such as ``created_at`` itself. ``bulk_create``
+    sends no signals, and I suspend the rollups besides; the caller
+    rebuilds them once the import ends.
+    """
+
+    if not batch:
+        return
+    with rollups.suspended():
+        Transaction.objects.bulk_create(
+            [Transaction(user_id=user_id, **fields) for fields in batch],
+            batch_size=batch_size,
+        )
+
+
+def _clean_row(
+    row: Dict[str, Optional[str]],
+    categories: Dict[str, int],
+    currency_code: str,
+) -> dict:
+    """Validate one CSV row and return the transaction's field values."""
+
+    currency = (row.get('currency') or '').strip().upper()
+    if currency and currency != currency_code:
+        raise ValidationError(
+            f'Amounts in {currency} cannot be imported into an account '
+            f'kept in {currency_code}.'
+        )
+
+    category_name = (row.get('category') or '').strip()
+    category_id = None
+    if category_name:
+        category_id = categories.get(category_name.lower())
+        is_income = (
+            (row.get('type') or '').strip().upper() == Transaction.INCOME
+        )
+        if category_id is None and not is_income:
+            raise ValidationError(f'Unknown category "{category_name}".')
+
+    return clean_new_transaction(
+        transaction_type=row.get('type'),
+        category_id=category_id,
+        name=row.get('name'),
+        occurred_on=row.get('date'),
+        amount=row.get('amount'),
+        note=row.get('note'),
+    )
@@ -0,0 +1,249 @@
+"""
+I run heavy per-user work on background worker processes.
+
+A view calls :func:`enqueue` and returns at once; ``manage.py run_workers``
+claims queued :class:`Job` rows and calls the handler registered for their
+kind. Postgres hands each job to one worker with ``SELECT ... FOR UPDATE
+SKIP LOCKED``. SQLite has no row locks, so there a worker claims a job
+with a guarded ``UPDATE`` that only one of several racing workers wins.
+
+A failed job is retried with exponential backoff until it runs out of
+attempts, so handlers must be safe to run again after a partial run.
+"""
+
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# The first retry waits this long and every later one twice as long.
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 60 * 60
+# A running job whose worker has been silent this long is handed out again.
+LEASE_SECONDS = 15 * 60
+# On SQLite I try this many due jobs before deciding the queue is drained.
+CLAIM_CANDIDATES = 5
+
+_HANDLERS: Dict[str, Callable[[Job], object]] = {}
+
+
+def register(kind: str):
+    """
+    Register the decorated function as the handler for ``kind`` jobs.
+
+    The handler receives the claimed :class:`Job` and may return anything
+    JSON-serialisable, which is stored as the job's result.
+    """
+
+    def decorator(handler):
+        _HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+def enqueue(
+    kind: str,
+    user=None,
+    payload: Optional[dict] = None,
+    *,
+    max_attempts: int = 5,
+    delay: float = 0,
+) -> Job:
+    """Queue a ``kind`` job, due after ``delay`` seconds."""
+
+    if kind not in _HANDLERS:
+        raise ValueError(f'No job handler is registered for {kind!r}.')
+    return Job.objects.create(
+        user=user,
+        kind=kind,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Return how long to wait before the attempt after ``attempts``."""
+
+    seconds = RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, RETRY_MAX_SECONDS))
+
+
+def default_worker_id() -> str:
+    """Name this process the way it shows up in ``Job.locked_by``."""
+
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _due_jobs():
+    return (
+        Job.objects
+        .filter(status=Job.QUEUED, run_after__lte=timezone.now())
+        .order_by('run_after', 'pk')
+    )
+
+
+def _claim_skip_locked(worker_id: str) -> Optional[Job]:
+    with transaction.atomic():
+        job = _due_jobs().select_for_update(skip_locked=True).first()
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = timezone.now()
+        job.save(update_fields=[
+            'status', 'attempts', 'locked_by', 'locked_at',
+        ])
+    return job
+
+
+def _claim_by_update(worker_id: str) -> Optional[Job]:
+    candidates = _due_jobs().values_list('pk', flat=True)[:CLAIM_CANDIDATES]
+    for pk in candidates:
+        # Only one racing worker's UPDATE still sees the job as queued.
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            attempts=F('attempts') + 1,
+            locked_by=worker_id,
+            locked_at=timezone.now(),
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def claim(worker_id: str) -> Optional[Job]:
+    """Mark the oldest due job as running for ``worker_id`` and return it."""
+
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(worker_id)
+    return _claim_by_update(worker_id)
+
+
+def heartbeat(job: Job) -> None:
+    """Renew a long-running job's lease so no other worker takes it over."""
+
+    job.locked_at = timezone.now()
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_at=job.locked_at
+    )
+
+
+def requeue_stale() -> int:
+    """
+    Hand back jobs whose worker died mid-run.
+
+    I count the lost run as an attempt, so a job that keeps killing its
+    worker ends up failed rather than looping forever.
+    """
+
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=LEASE_SECONDS),
+    )
+    message = 'The worker running this job stopped responding.'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        locked_at=None,
+        finished_at=now,
+        last_error=message,
+    )
+    requeued = stale.update(
+        status=Job.QUEUED,
+        run_after=now,
+        locked_by='',
+        locked_at=None,
+        last_error=message,
+    )
+    return failed + requeued
+
+
+def run(job: Job) -> bool:
+    """Run a claimed job and record how it went; ``True`` on success."""
+
+    handler = _HANDLERS.get(job.kind)
+    mine = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    try:
+        if handler is None:
+            raise LookupError(
+                f'No job handler is registered for {job.kind!r}.'
+            )
+        result = handler(job)
+    except Exception as error:
+        logger.exception(
+            'Job %s (%s) failed on attempt %s of %s',
+            job.pk, job.kind, job.attempts, job.max_attempts,
+        )
+        job.last_error = f'{type(error).__name__}: {error}'
+        job.locked_at = None
+        if handler is None or job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        mine.update(
+            status=job.status,
+            last_error=job.last_error,
+            locked_at=None,
+            run_after=job.run_after,
+            finished_at=job.finished_at,
+        )
+        return False
+
+    job.status = Job.SUCCEEDED
+    job.result = result
+    job.locked_at = None
+    job.finished_at = timezone.now()
+    mine.update(
+        status=job.status,
+        result=result,
+        locked_at=None,
+        finished_at=job.finished_at,
+    )
+    return True
+
+
+def work(
+    worker_id: Optional[str] = None,
+    *,
+    poll: Optional[float] = 1.0,
+    max_jobs: Optional[int] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> int:
+    """
+    Claim and run jobs until told to stop, returning how many I ran.
+
+    With ``poll=None`` I return as soon as nothing is due instead of
+    sleeping, which suits tests and one-off drains.
+    """
+
+    worker_id = worker_id or default_worker_id()
+    done = 0
+    while not should_stop() and (max_jobs is None or done < max_jobs):
+        # Like a request boundary: drop connections that went bad or old.
+        close_old_connections()
+        job = claim(worker_id)
+        if job is None:
+            if requeue_stale():
+                continue
+            if poll is None:
+                break
+            time.sleep(poll)
+            continue
+        run(job)
+        done += 1
+    return done
@@ -0,0 +1,69 @@
+"""I fill in duplicate-detection fingerprints for older transactions."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.models import Transaction
+
+
+class Command(BaseCommand):
+    """I fingerprint transactions saved before fingerprints existed."""
+
+    help = 'Compute the duplicate-detection fingerprint of transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Transactions to update per statement batch.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every fingerprint, not just missing ones.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        pending = Transaction.objects.order_by('pk')
+        if not options['all']:
+            pending = pending.filter(fingerprint__isnull=True)
+
+        # I walk the table by primary key so each batch is a cheap range
+        # scan and rows I have just filled in are never read twice.
+        updated = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                pending
+                .filter(pk__gt=last_pk)
+                .values_list(
+                    'pk',
+                    'user_id',
+                    'occurred_on',
+                    'amount_in_cents',
+                    'type',
+                    'name',
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            Transaction.objects.bulk_update(
+                [
+                    Transaction(
+                        pk=pk,
+                        fingerprint=Transaction.fingerprint_for(*values),
+                    )
+                    for pk, *values in rows
+                ],
+                ['fingerprint'],
+            )
+            updated += len(rows)
+            last_pk = rows[-1][0]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Fingerprinted {updated} transaction(s).')
+        )
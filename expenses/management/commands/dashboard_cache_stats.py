@@ -0,0 +1,37 @@
+"""I print the dashboard cache hit and miss counters."""
+
+from django.core.management.base import BaseCommand
+
+from expenses.caching import (
+    counts_lookups,
+    dashboard_cache_stats,
+    reset_dashboard_cache_stats,
+)
+
+
+class Command(BaseCommand):
+    """I report how well the per-user dashboard cache is doing."""
+
+    help = 'Show (and optionally reset) the dashboard cache counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zero the counters after printing them.',
+        )
+
+    def handle(self, *args, **options):
+        if not counts_lookups():
+            self.stderr.write(
+                'The configured cache keeps no counters; they need Redis '
+                '(set REDIS_URL).'
+            )
+            return
+        stats = dashboard_cache_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_rate={stats['hit_rate']:.2%}"
+        )
+        if options['reset']:
+            reset_dashboard_cache_stats()
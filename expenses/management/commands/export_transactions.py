@@ -0,0 +1,70 @@
+"""I stream one user's transactions to a CSV or NDJSON file."""
+
+import gzip
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.currencies import DEFAULT_CURRENCY
+from expenses.exports import export_blocks
+from expenses.forms import TransactionExportForm
+from expenses.models import UserSettings
+
+
+class Command(BaseCommand):
+    """I export a user's history without loading it all into memory."""
+
+    help = 'Export a user\'s transactions as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Whose transactions to export.')
+        parser.add_argument(
+            '--format',
+            choices=[
+                choice for choice, _ in TransactionExportForm.FORMAT_CHOICES
+            ],
+            default='csv',
+        )
+        parser.add_argument('--start', help='First day to include (ISO).')
+        parser.add_argument('--end', help='Last day to include (ISO).')
+        parser.add_argument('--type', help='Only INCOME or OUTGO rows.')
+        parser.add_argument('--category', help='Only this category id.')
+        parser.add_argument(
+            '--output',
+            help='File to write; a ".gz" name is gzipped. Defaults to stdout.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user called {options['username']!r}.")
+
+        form = TransactionExportForm({
+            name: options[name]
+            for name in ('format', 'start', 'end', 'type', 'category')
+            if options[name]
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        currency_code = (
+            UserSettings.objects
+            .filter(user=user)
+            .values_list('currency_code', flat=True)
+            .first()
+        ) or DEFAULT_CURRENCY
+        blocks = export_blocks(user, currency_code, form.cleaned_data)
+
+        output = options['output']
+        if not output:
+            # Blocks always end on a line break, so each decodes cleanly.
+            for block in blocks:
+                self.stdout.write(block.decode('utf-8'), ending='')
+            return
+
+        opener = gzip.open if output.endswith('.gz') else open
+        with opener(output, 'wb') as handle:
+            for block in blocks:
+                handle.write(block)
+        self.stderr.write(self.style.SUCCESS(f'Exported to {output}.'))
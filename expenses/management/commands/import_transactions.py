@@ -0,0 +1,91 @@
+"""I load a CSV of transactions into one user's history."""
+
+import gzip
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses import duplicates
+from expenses.imports import (
+    DEFAULT_BATCH_SIZE,
+    ImportFileError,
+    import_transactions,
+)
+
+
+class Command(BaseCommand):
+    """I bulk-import transactions instead of posting them one by one."""
+
+    help = 'Import transactions for a user from a CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Who the transactions belong to.')
+        parser.add_argument(
+            'path',
+            help='CSV file to read; "-" reads stdin and ".gz" is unzipped.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Rows to insert per database transaction.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without saving anything.',
+        )
+        parser.add_argument(
+            '--duplicates',
+            choices=[choice for choice, _ in duplicates.POLICY_CHOICES],
+            default=duplicates.SKIP,
+            help='What to do with rows already in the history.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user called {options['username']!r}.")
+
+        path = options['path']
+        if path == '-':
+            handle = sys.stdin
+        else:
+            opener = gzip.open if path.endswith('.gz') else open
+            try:
+                handle = opener(
+                    path, 'rt', encoding='utf-8-sig', newline=''
+                )
+            except OSError as error:
+                raise CommandError(str(error))
+
+        try:
+            result = import_transactions(
+                user,
+                handle,
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+                duplicate_policy=options['duplicates'],
+            )
+        except (ImportFileError, UnicodeDecodeError) as error:
+            raise CommandError(str(error))
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        for row_error in result.errors:
+            self.stderr.write(f'line {row_error.line}: {row_error.message}')
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        summary = f'{verb} {result.created} transaction(s); '
+        if result.duplicates:
+            summary += (
+                f'{result.duplicates} repeated existing entries '
+                f'({options["duplicates"]}); '
+            )
+        summary += f'{result.failed} row(s) failed.'
+        style = self.style.WARNING if result.failed else self.style.SUCCESS
+        self.stdout.write(style(summary))
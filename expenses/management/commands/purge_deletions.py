@@ -0,0 +1,41 @@
+"""I erase cleared histories and deleted accounts in small batches."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses import purges
+
+
+class Command(BaseCommand):
+    """I drain the queue of pending deletions, once or continuously."""
+
+    help = 'Purge cleared histories and deleted accounts in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=purges.BATCH_SIZE,
+            help='Transactions to delete per database transaction.',
+        )
+        parser.add_argument(
+            '--watch',
+            type=float,
+            metavar='SECONDS',
+            help='Keep running, checking for new work this often.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        while True:
+            purged = purges.run_pending(batch_size=options['batch_size'])
+            if purged or not options['watch']:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Purged {purged} transaction(s).')
+                )
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
@@ -0,0 +1,33 @@
+"""I rebuild Ledgerly's rollup tables from the raw transactions."""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses import rollups
+
+
+class Command(BaseCommand):
+    """I recompute rollups for one user or for everybody."""
+
+    help = 'Rebuild the per-user rollup tables from raw transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Only rebuild rollups for this username.',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"No user called {options['user']!r}.")
+
+        rebuilt = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            rollups.rebuild_user_rollups(user_id)
+            rebuilt += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt rollups for {rebuilt} user(s).')
+        )
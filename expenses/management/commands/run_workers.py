@@ -0,0 +1,90 @@
+"""I run background job workers, optionally as several processes."""
+
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from expenses import jobs
+
+
+def _work(poll, burst):
+    """Run one worker until signalled, finishing the job in hand first."""
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    return jobs.work(
+        poll=None if burst else poll,
+        should_stop=stop.is_set,
+    )
+
+
+class Command(BaseCommand):
+    """I claim queued jobs and run their handlers until told to stop."""
+
+    help = 'Run background job workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='How many worker processes to run side by side.',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=1.0,
+            metavar='SECONDS',
+            help='How long an idle worker waits before checking again.',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job is due instead of waiting for more.',
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError('--processes must be at least 1.')
+        if options['poll'] <= 0:
+            raise CommandError('--poll must be greater than 0.')
+
+        if processes == 1:
+            done = _work(options['poll'], options['burst'])
+            self.stdout.write(self.style.SUCCESS(f'Ran {done} job(s).'))
+            return
+
+        # Forked children must open their own database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(
+                target=_work,
+                args=(options['poll'], options['burst']),
+                name=f'ledgerly-worker-{number}',
+            )
+            for number in range(1, processes + 1)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'Started {processes} workers.')
+
+        def _stop(signum, frame):
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+
+        signal.signal(signal.SIGTERM, _stop)
+        # Ctrl-C reaches the children too; I only wait for them.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for worker in workers:
+            worker.join()
+        failed = [worker.name for worker in workers if worker.exitcode]
+        if failed:
+            raise CommandError(f'Workers exited abnormally: {failed}')
+        self.stdout.write(self.style.SUCCESS('All workers stopped.'))
@@ -0,0 +1,119 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from calendar import monthrange
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def _shift(reference, months, cycle_day):
+    year = reference.year + (reference.month - 1 + months) // 12
+    month = (reference.month - 1 + months) % 12 + 1
+    return date(year, month, min(cycle_day, monthrange(year, month)[1]))
+
+
+def backfill_cycle_summaries(apps, schema_editor):
+    """Build cycle rollups for the history that already exists."""
+
+    Transaction = apps.get_model('expenses', 'Transaction')
+    UserSettings = apps.get_model('expenses', 'UserSettings')
+    CycleSummary = apps.get_model('expenses', 'CycleSummary')
+
+    cycle_days = {
+        user_id: cycle_start.day
+        for user_id, cycle_start in UserSettings.objects.values_list(
+            'user_id', 'cycle_start_date'
+        )
+        if cycle_start
+    }
+    daily_totals = (
+        Transaction.objects
+        .order_by()
+        .values('user_id', 'occurred_on', 'type')
+        .annotate(
+            total=models.Sum('amount_in_cents'),
+            count=models.Count('id'),
+        )
+    )
+
+    summaries = {}
+    for row in daily_totals.iterator():
+        cycle_day = cycle_days.get(row['user_id'], 1)
+        start = _shift(row['occurred_on'], 0, cycle_day)
+        if start > row['occurred_on']:
+            start = _shift(row['occurred_on'], -1, cycle_day)
+        key = (row['user_id'], start)
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = CycleSummary(
+                user_id=row['user_id'],
+                cycle_start=start,
+                cycle_end=_shift(start, 1, cycle_day),
+            )
+        if row['type'] == 'INCOME':
+            summary.income_cents += row['total']
+            summary.income_count += row['count']
+        else:
+            summary.outgo_cents += row['total']
+            summary.outgo_count += row['count']
+
+    CycleSummary.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0007_alter_transaction_amount_in_cents'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name_plural': 'Catergories'},
+        ),
+        migrations.CreateModel(
+            name='CycleSummary',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('cycle_start', models.DateField()),
+                ('cycle_end', models.DateField()),
+                ('income_cents', models.BigIntegerField(default=0)),
+                ('outgo_cents', models.BigIntegerField(default=0)),
+                ('income_count', models.PositiveIntegerField(default=0)),
+                ('outgo_count', models.PositiveIntegerField(default=0)),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='cycle_summaries',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name_plural': 'Cycle summaries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='cyclesummary',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'cycle_start'),
+                name='unique_cycle_summary_per_user',
+            ),
+        ),
+        migrations.RunPython(
+            backfill_cycle_summaries,
+            migrations.RunPython.noop,
+        ),
+    ]
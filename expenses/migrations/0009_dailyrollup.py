@@ -0,0 +1,110 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    """Build daily rollups for the history that already exists."""
+
+    Transaction = apps.get_model('expenses', 'Transaction')
+    DailyRollup = apps.get_model('expenses', 'DailyRollup')
+
+    grouped = (
+        Transaction.objects
+        .order_by()
+        .values('user_id', 'occurred_on', 'type', 'category_id')
+        .annotate(
+            total=models.Sum('amount_in_cents'),
+            count=models.Count('id'),
+        )
+    )
+    merged = {}
+    for row in grouped.iterator():
+        category_id = None if row['type'] == 'INCOME' else row['category_id']
+        key = (row['user_id'], row['occurred_on'], row['type'], category_id)
+        rollup = merged.get(key)
+        if rollup is None:
+            rollup = merged[key] = DailyRollup(
+                user_id=row['user_id'],
+                day=row['occurred_on'],
+                type=row['type'],
+                category_id=category_id,
+            )
+        rollup.total_cents += row['total']
+        rollup.count += row['count']
+
+    DailyRollup.objects.bulk_create(merged.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0008_cyclesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('day', models.DateField()),
+                (
+                    'type',
+                    models.CharField(
+                        choices=[('INCOME', 'Income'), ('OUTGO', 'Outgoing')],
+                        max_length=6,
+                    ),
+                ),
+                ('total_cents', models.BigIntegerField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                (
+                    'category',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='expenses.category',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='daily_rollups',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('category__isnull', False)),
+                fields=('user', 'day', 'type', 'category'),
+                name='unique_daily_rollup_per_category',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('category__isnull', True)),
+                fields=('user', 'day', 'type'),
+                name='unique_daily_rollup_uncategorized',
+            ),
+        ),
+        migrations.RunPython(
+            backfill_daily_rollups,
+            migrations.RunPython.noop,
+        ),
+    ]
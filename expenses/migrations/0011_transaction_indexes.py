@@ -0,0 +1,34 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0010_usersettings_data_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyrollup',
+            index=models.Index(
+                fields=['user', 'day'],
+                name='rollup_user_day_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(
+                fields=['user', 'occurred_on', 'id'],
+                name='txn_user_date_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(
+                fields=['user', 'type', 'occurred_on'],
+                name='txn_user_type_date_idx',
+            ),
+        ),
+    ]
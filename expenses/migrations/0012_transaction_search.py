@@ -0,0 +1,192 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.db import migrations
+
+# SQLite keeps a standalone FTS5 table whose rowid is the transaction id.
+# The ``owner`` column holds a "u<user id>" token so matches stay scoped to
+# one user through the full-text index itself.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE expenses_transaction_fts USING fts5(
+        owner, name, category, note, type,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER expenses_transaction_fts_insert
+    AFTER INSERT ON expenses_transaction BEGIN
+        INSERT INTO expenses_transaction_fts
+            (rowid, owner, name, category, note, type)
+        VALUES (
+            new.id,
+            'u' || new.user_id,
+            new.name,
+            COALESCE(
+                (SELECT name FROM expenses_category
+                 WHERE id = new.category_id),
+                ''
+            ),
+            new.note,
+            new.type
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER expenses_transaction_fts_update
+    AFTER UPDATE OF user_id, name, category_id, note, type
+    ON expenses_transaction BEGIN
+        DELETE FROM expenses_transaction_fts WHERE rowid = old.id;
+        INSERT INTO expenses_transaction_fts
+            (rowid, owner, name, category, note, type)
+        VALUES (
+            new.id,
+            'u' || new.user_id,
+            new.name,
+            COALESCE(
+                (SELECT name FROM expenses_category
+                 WHERE id = new.category_id),
+                ''
+            ),
+            new.note,
+            new.type
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER expenses_transaction_fts_delete
+    AFTER DELETE ON expenses_transaction BEGIN
+        DELETE FROM expenses_transaction_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER expenses_category_fts_rename
+    AFTER UPDATE OF name ON expenses_category BEGIN
+        UPDATE expenses_transaction_fts SET category = new.name
+        WHERE rowid IN (
+            SELECT id FROM expenses_transaction
+            WHERE category_id = new.id
+        );
+    END
+    """,
+    """
+    INSERT INTO expenses_transaction_fts
+        (rowid, owner, name, category, note, type)
+    SELECT
+        txn.id,
+        'u' || txn.user_id,
+        txn.name,
+        COALESCE(category.name, ''),
+        txn.note,
+        txn.type
+    FROM expenses_transaction AS txn
+    LEFT JOIN expenses_category AS category
+        ON category.id = txn.category_id
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS expenses_category_fts_rename',
+    'DROP TRIGGER IF EXISTS expenses_transaction_fts_delete',
+    'DROP TRIGGER IF EXISTS expenses_transaction_fts_update',
+    'DROP TRIGGER IF EXISTS expenses_transaction_fts_insert',
+    'DROP TABLE IF EXISTS expenses_transaction_fts',
+]
+
+# Postgres keeps a weighted tsvector on the row itself, maintained by a
+# trigger and served by a GIN index. Renaming a category touches its
+# transactions so their documents pick up the new name.
+POSTGRES_FORWARD = [
+    'ALTER TABLE expenses_transaction ADD COLUMN search_document tsvector',
+    """
+    CREATE FUNCTION expenses_transaction_search_document()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_document :=
+            setweight(to_tsvector('simple', COALESCE(NEW.name, '')), 'A')
+            || setweight(to_tsvector('simple', COALESCE(
+                (SELECT name FROM expenses_category
+                 WHERE id = NEW.category_id),
+                ''
+            )), 'B')
+            || setweight(to_tsvector('simple', COALESCE(NEW.note, '')), 'C')
+            || setweight(to_tsvector('simple', NEW.type), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER expenses_transaction_search_document
+    BEFORE INSERT OR UPDATE OF user_id, name, category_id, note, type
+    ON expenses_transaction
+    FOR EACH ROW EXECUTE FUNCTION expenses_transaction_search_document()
+    """,
+    """
+    CREATE FUNCTION expenses_category_search_rename()
+    RETURNS trigger AS $$
+    BEGIN
+        UPDATE expenses_transaction SET category_id = category_id
+        WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER expenses_category_search_rename
+    AFTER UPDATE OF name ON expenses_category
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION expenses_category_search_rename()
+    """,
+    'UPDATE expenses_transaction SET name = name',
+    """
+    CREATE INDEX txn_search_document_idx
+    ON expenses_transaction USING GIN (search_document)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS txn_search_document_idx',
+    'DROP TRIGGER IF EXISTS expenses_category_search_rename'
+    ' ON expenses_category',
+    'DROP FUNCTION IF EXISTS expenses_category_search_rename()',
+    'DROP TRIGGER IF EXISTS expenses_transaction_search_document'
+    ' ON expenses_transaction',
+    'DROP FUNCTION IF EXISTS expenses_transaction_search_document()',
+    'ALTER TABLE expenses_transaction DROP COLUMN IF EXISTS search_document',
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_FORWARD, SQLITE_REVERSE),
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_REVERSE),
+}
+
+
+def _run(schema_editor, index):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        # Other databases fall back to the plain ``icontains`` search.
+        return
+    for statement in statements[index]:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill the full-text index for the current database."""
+
+    _run(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    """Remove the full-text index again."""
+
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0011_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_transaction_names(apps, schema_editor):
+    """Count the names in the history that already exists."""
+
+    Transaction = apps.get_model('expenses', 'Transaction')
+    TransactionName = apps.get_model('expenses', 'TransactionName')
+
+    grouped = (
+        Transaction.objects
+        .order_by()
+        .values('user_id', 'name')
+        .annotate(
+            count=models.Count('id'),
+            latest=models.Max('occurred_on'),
+        )
+    )
+    merged = {}
+    for row in grouped.iterator():
+        name = row['name'].strip()
+        normalized = name.lower()
+        if not normalized:
+            continue
+        key = (row['user_id'], normalized)
+        entry = merged.get(key)
+        if entry is None:
+            entry = merged[key] = TransactionName(
+                user_id=row['user_id'],
+                name=name,
+                normalized=normalized,
+                last_used_on=row['latest'],
+            )
+        elif row['latest'] > entry.last_used_on:
+            entry.name = name
+            entry.last_used_on = row['latest']
+        entry.use_count += row['count']
+
+    TransactionName.objects.bulk_create(merged.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0012_transaction_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionName',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('name', models.CharField(max_length=120)),
+                ('normalized', models.CharField(max_length=120)),
+                ('use_count', models.PositiveIntegerField(default=0)),
+                ('last_used_on', models.DateField()),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='transaction_names',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='transactionname',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'normalized'),
+                name='unique_transaction_name_per_user',
+                opclasses=['int4_ops', 'varchar_pattern_ops'],
+            ),
+        ),
+        migrations.RunPython(
+            backfill_transaction_names,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprint the history that already exists."""
+
+    Transaction = apps.get_model('expenses', 'Transaction')
+
+    pending = (
+        Transaction.objects
+        .filter(fingerprint__isnull=True)
+        .order_by('pk')
+        .values_list(
+            'pk', 'user_id', 'occurred_on', 'amount_in_cents', 'type', 'name'
+        )
+    )
+    last_pk = 0
+    while True:
+        rows = list(pending.filter(pk__gt=last_pk)[:2000])
+        if not rows:
+            break
+        updates = []
+        for pk, user_id, occurred_on, amount, txn_type, name in rows:
+            key = '|'.join((
+                str(user_id),
+                str(occurred_on),
+                str(amount),
+                txn_type,
+                name.strip().lower(),
+            ))
+            updates.append(Transaction(
+                pk=pk,
+                fingerprint=hashlib.blake2b(
+                    key.encode('utf-8'), digest_size=16
+                ).hexdigest(),
+            ))
+        Transaction.objects.bulk_update(updates, ['fingerprint'])
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0013_transactionname'),
+    ]
+
+    operations = [
+        # Both columns are nullable without defaults so SQLite can add them
+        # in place; rebuilding the table would drop the search triggers.
+        migrations.AddField(
+            model_name='transaction',
+            name='duplicate_of',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='possible_duplicates',
+                to='expenses.transaction',
+            ),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='fingerprint',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(
+                fields=['user', 'fingerprint'],
+                name='txn_user_fingerprint_idx',
+            ),
+        ),
+        migrations.RunPython(
+            backfill_fingerprints,
+            migrations.RunPython.noop,
+        ),
+    ]
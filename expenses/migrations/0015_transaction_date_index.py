@@ -0,0 +1,20 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0014_transaction_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(
+                fields=['occurred_on', 'id'],
+                name='txn_date_idx',
+            ),
+        ),
+    ]
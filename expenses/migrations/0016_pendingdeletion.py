@@ -0,0 +1,59 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expenses', '0015_transaction_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingDeletion',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('HISTORY', 'Transaction history'),
+                            ('ACCOUNT', 'Account'),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                (
+                    'through_id',
+                    models.BigIntegerField(blank=True, null=True),
+                ),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('purged', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                (
+                    'finished_at',
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='pending_deletions',
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
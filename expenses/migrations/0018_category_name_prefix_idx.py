@@ -0,0 +1,21 @@
+# Generated by Django 4.2.24 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0017_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(
+                fields=['name'],
+                name='category_name_prefix_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ),
+    ]
@@ -1,9 +1,12 @@
 """I define the database models for the Ledgerly expenses app."""
 
+import hashlib
 from datetime import date
 
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 from .currencies import CURRENCY_CHOICES, DEFAULT_CURRENCY
 
@@ -25,8 +28,25 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """I remember the stored values so saves know what changed."""
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     class Meta:
         verbose_name_plural = 'Catergories'
+        indexes = [
+            # I serve the admin's prefix lookups; Postgres needs pattern
+            # ops for ``LIKE 'prefix%'`` to use it.
+            models.Index(
+                fields=['name'],
+                name='category_name_prefix_idx',
+                opclasses=['varchar_pattern_ops'],
+            ),
+        ]
 
 
 class Transaction(models.Model):
@@ -65,6 +85,57 @@ class Transaction(models.Model):
     # I let Django manage auditing timestamps automatically.
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # I hash what makes two entries "the same" so duplicates are one
+    # indexed lookup away; see ``compute_fingerprint``.
+    fingerprint = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    # I point at the earlier entry this one probably repeats.
+    duplicate_of = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name='possible_duplicates',
+    )
+
+    FINGERPRINT_FIELDS = frozenset({
+        'user',
+        'user_id',
+        'occurred_on',
+        'amount_in_cents',
+        'type',
+        'name',
+    })
+
+    class Meta:
+        indexes = [
+            # I match the "this user's history, newest first" access path
+            # (dashboard, list, calendar days, keyset pages) without a sort.
+            models.Index(
+                fields=['user', 'occurred_on', 'id'],
+                name='txn_user_date_idx',
+            ),
+            # I serve per-type windows such as the cycle's top outgoings.
+            models.Index(
+                fields=['user', 'type', 'occurred_on'],
+                name='txn_user_type_date_idx',
+            ),
+            models.Index(
+                fields=['user', 'fingerprint'],
+                name='txn_user_fingerprint_idx',
+            ),
+            # I let the admin list everyone's transactions newest first
+            # a page at a time instead of sorting the whole table.
+            models.Index(
+                fields=['occurred_on', 'id'],
+                name='txn_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -72,6 +143,52 @@ class Transaction(models.Model):
             f" ({self.occurred_on})"
         )
 
+    @staticmethod
+    def fingerprint_for(user_id, occurred_on, amount_in_cents, txn_type,
+                        name) -> str:
+        """Hash the values that identify a repeated entry."""
+
+        key = '|'.join((
+            str(user_id),
+            str(occurred_on),
+            str(amount_in_cents),
+            txn_type,
+            TransactionName.normalize(name),
+        ))
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def compute_fingerprint(self) -> str:
+        """Return the fingerprint for my current values."""
+
+        return self.fingerprint_for(
+            self.user_id,
+            self.occurred_on,
+            self.amount_in_cents,
+            self.type,
+            self.name,
+        )
+
+    def save(self, *args, **kwargs):
+        """I refresh my fingerprint whenever the values behind it change."""
+
+        self.fingerprint = self.compute_fingerprint()
+        update_fields = kwargs.get('update_fields')
+        if (
+            update_fields is not None
+            and 'fingerprint' not in update_fields
+            and self.FINGERPRINT_FIELDS.intersection(update_fields)
+        ):
+            kwargs['update_fields'] = [*update_fields, 'fingerprint']
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """I remember the stored values so rollups can apply exact deltas."""
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class UserSettings(models.Model):
     """I store per-user configuration like the preferred cycle start date."""
@@ -87,6 +204,273 @@ class UserSettings(models.Model):
         choices=CURRENCY_CHOICES,
         default=DEFAULT_CURRENCY,
     )
+    # I bump this whenever the user's transactions change so cached views
+    # keyed on it go stale without having to find and delete entries.
+    data_version = models.PositiveBigIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"Settings for {self.user.username}"
+
+    def save(self, *args, **kwargs):
+        """I never write back a possibly stale ``data_version``."""
+
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'data_version'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """I remember the stored values so I can spot cycle changes."""
+
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class CycleSummary(models.Model):
+    """I hold a user's income and outgo totals for one billing cycle."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cycle_summaries',
+    )
+    # I key each row by the cycle's first day and keep the exclusive end
+    # so "the cycle containing today" is a simple range lookup.
+    cycle_start = models.DateField()
+    cycle_end = models.DateField()
+    income_cents = models.BigIntegerField(default=0)
+    outgo_cents = models.BigIntegerField(default=0)
+    income_count = models.PositiveIntegerField(default=0)
+    outgo_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'Cycle summaries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'cycle_start'],
+                name='unique_cycle_summary_per_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} cycle from {self.cycle_start}"
+
+    @property
+    def balance_cents(self) -> int:
+        """Return what is left over in the cycle after outgoings."""
+
+        return self.income_cents - self.outgo_cents
+
+
+class DailyRollup(models.Model):
+    """I hold one user's totals for a single day, type and category."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups',
+    )
+    day = models.DateField()
+    type = models.CharField(max_length=6, choices=Transaction.TYPE_CHOICES)
+    # The signal handlers move a category's rows under "no category" before
+    # it is deleted, like its transactions; the cascade finds none left.
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
+    total_cents = models.BigIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'day'], name='rollup_user_day_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'type', 'category'],
+                condition=models.Q(category__isnull=False),
+                name='unique_daily_rollup_per_category',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'day', 'type'],
+                condition=models.Q(category__isnull=True),
+                name='unique_daily_rollup_uncategorized',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.type} on {self.day}"
+
+
+class TransactionName(models.Model):
+    """I count how often a user has used each distinct transaction name."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='transaction_names',
+    )
+    # I show the most recently used spelling but match on the folded key.
+    name = models.CharField(max_length=120)
+    normalized = models.CharField(max_length=120)
+    use_count = models.PositiveIntegerField(default=0)
+    last_used_on = models.DateField()
+
+    class Meta:
+        constraints = [
+            # I double as the prefix index for suggestions; Postgres needs
+            # pattern ops for ``LIKE 'prefix%'`` to use it.
+            models.UniqueConstraint(
+                fields=['user', 'normalized'],
+                name='unique_transaction_name_per_user',
+                opclasses=['int4_ops', 'varchar_pattern_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ×{self.use_count}"
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Fold a transaction name into the key I store and match on."""
+
+        return name.strip().lower()
+
+
+class PendingDeletion(models.Model):
+    """I track a history or account wipe that is purged in the background."""
+
+    HISTORY = 'HISTORY'
+    ACCOUNT = 'ACCOUNT'
+    KIND_CHOICES = [
+        (HISTORY, 'Transaction history'),
+        (ACCOUNT, 'Account'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='pending_deletions',
+    )
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    # I purge the user's transactions up to this id, which also hides them
+    # until they are gone; later entries survive. Null means all of them.
+    through_id = models.BigIntegerField(null=True, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    purged = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} {self.kind} deletion from {self.created_at}"
+
+    @classmethod
+    def hide_from(cls, queryset, user_id):
+        """
+        Drop the rows of ``queryset`` that a history purge will delete.
+
+        ``queryset`` must already be scoped to the user. The check is a
+        subquery in the same statement, so hiding costs no extra round
+        trip whether or not a purge is running.
+        """
+
+        # I phrase it as NOT (id <= cutoff) so SQLite keeps its date-ordered
+        # index scans instead of treating the cutoff as a rowid range.
+        return queryset.exclude(
+            id__lte=Coalesce(models.Subquery(cls._cutoff(user_id)), 0)
+        )
+
+    @classmethod
+    def hidden_through_sql(cls, user_id):
+        """
+        Return SQL and params for the last id a history purge will delete.
+
+        Raw queries compare ids against it, as :meth:`hide_from` does, to
+        skip the doomed rows inside the statement; it is 0 with no purge.
+        """
+
+        sql, params = cls._cutoff(user_id).query.sql_with_params()
+        return f'COALESCE(({sql}), 0)', list(params)
+
+    @classmethod
+    def _cutoff(cls, user_id):
+        return cls.objects.filter(
+            user_id=user_id,
+            kind=cls.HISTORY,
+            finished_at__isnull=True,
+        ).values('through_id')[:1]
+
+    @property
+    def percent_done(self) -> int:
+        """Return how much of the purge is done, as a whole percentage."""
+
+        if not self.total:
+            return 100 if self.finished_at else 0
+        return min(100, self.purged * 100 // self.total)
+
+
+class Job(models.Model):
+    """I queue a piece of heavy work for the ``run_workers`` processes."""
+
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    SUCCEEDED = 'SUCCEEDED'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    # System work (such as a sweep of every pending purge) has no user.
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+    )
+    # The name the handler was registered under in ``expenses.jobs``.
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=9,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # A queued job is not claimed before this; retries push it back.
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest due job of a status.
+            models.Index(
+                fields=['status', 'run_after'],
+                name='job_status_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        """Return ``True`` once the job succeeded or ran out of attempts."""
+
+        return self.status in (self.SUCCEEDED, self.FAILED)
@@ -0,0 +1,64 @@
+"""I page through transaction histories with keyset cursors."""
+
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from django.db import models
+from django.db.models import Q
+
+from .models import Transaction
+
+PAGE_SIZE = 50
+
+
+class Page(NamedTuple):
+    """I hold one page of transactions and the cursor for the next one."""
+
+    transactions: List[Transaction]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(txn: Transaction) -> str:
+    """Return the cursor that resumes the listing after ``txn``."""
+
+    return f'{txn.occurred_on.isoformat()}.{txn.pk}'
+
+
+def decode_cursor(cursor: str):
+    """
+    Split a cursor back into its date and id.
+
+    I raise ``ValueError`` for anything I did not produce myself.
+    """
+
+    day, _, pk = cursor.partition('.')
+    return date.fromisoformat(day), int(pk)
+
+
+def keyset_page(
+    queryset: models.QuerySet,
+    cursor: Optional[str] = None,
+    size: int = PAGE_SIZE,
+) -> Page:
+    """
+    Return the page of ``queryset`` that follows ``cursor``, newest first.
+
+    Instead of an ``OFFSET`` I seek past the last row already shown, so
+    the ``(user, occurred_on, id)`` index hands back every page in the same
+    time however deep the reader has scrolled. I read one extra row to
+    tell whether another page exists.
+    """
+
+    queryset = queryset.select_related('category').order_by(
+        '-occurred_on', '-id'
+    )
+    if cursor:
+        day, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(occurred_on__lt=day) | Q(pk__lt=pk),
+            occurred_on__lte=day,
+        )
+    rows = list(queryset[:size + 1])
+    if len(rows) > size:
+        return Page(rows[:size], encode_cursor(rows[size - 1]))
+    return Page(rows, None)
@@ -0,0 +1,187 @@
+"""
+I wipe transaction histories and whole accounts in small batches.
+
+Deleting a heavy user's history in one statement makes Django collect
+every row, holds SQLite's write lock for the whole cascade and can time
+the request out. Instead the request only records a
+:class:`PendingDeletion`, hides the rows at once and queues a ``purge``
+job; a background worker then removes them ``batch_size`` at a time,
+each batch in its own short transaction. :func:`run_pending` (driven by
+``manage.py purge_deletions``) sweeps up any purge whose job gave up.
+"""
+
+import logging
+from typing import Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import caching, jobs, rollups
+from .models import PendingDeletion, Transaction
+
+logger = logging.getLogger(__name__)
+
+# I delete at most this many transactions per transaction/lock.
+BATCH_SIZE = 1000
+PURGE_JOB = 'purge'
+
+
+def _open_purges(user_id, kind=PendingDeletion.HISTORY):
+    return PendingDeletion.objects.filter(
+        user_id=user_id,
+        kind=kind,
+        finished_at__isnull=True,
+    )
+
+
+def open_purge(user_id, kind=PendingDeletion.HISTORY):
+    """Return the user's unfinished purge of ``kind``, if there is one."""
+
+    return _open_purges(user_id, kind).first()
+
+
+def request_history_purge(user) -> PendingDeletion:
+    """
+    Hide everything the user has recorded so far and queue its removal.
+
+    The rollups are reset straight away, so totals, the calendar and
+    suggestions start afresh; entries added later are kept and counted.
+    """
+
+    with transaction.atomic():
+        visible = PendingDeletion.hide_from(
+            Transaction.objects.filter(user=user), user.pk
+        ).count()
+        # Ids only grow, so the newest id anywhere bounds this user's rows.
+        through_id = (
+            Transaction.objects.aggregate(last=Max('id'))['last'] or 0
+        )
+        pending = (
+            _open_purges(user.pk).select_for_update().first()
+        )
+        if pending is None:
+            pending = PendingDeletion.objects.create(
+                user=user,
+                kind=PendingDeletion.HISTORY,
+                through_id=through_id,
+                total=visible,
+            )
+        else:
+            pending.through_id = through_id
+            pending.total += visible
+            pending.save(update_fields=['through_id', 'total'])
+        with rollups.suspended():
+            rollups.reset_user_rollups(user.pk)
+        caching.bump_data_version(user.pk)
+        jobs.enqueue(PURGE_JOB, user, {'pending_id': pending.pk})
+    return pending
+
+
+def request_account_deletion(user) -> PendingDeletion:
+    """Deactivate the account now and queue its data for removal."""
+
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        pending = PendingDeletion.objects.create(
+            user=user,
+            kind=PendingDeletion.ACCOUNT,
+            total=Transaction.objects.filter(user=user).count(),
+        )
+        # The job outlives the user it deletes, so I leave it unowned.
+        jobs.enqueue(PURGE_JOB, payload={'pending_id': pending.pk})
+    return pending
+
+
+def purge_batch(pending: PendingDeletion, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Delete up to ``batch_size`` of a purge's transactions.
+
+    I return how many went. Once none are left I finish the purge: a
+    history purge is marked done and an account is deleted outright.
+    """
+
+    rows = Transaction.objects.filter(user_id=pending.user_id)
+    if pending.through_id is not None:
+        rows = rows.filter(id__lte=pending.through_id)
+    ids = list(rows.order_by().values_list('id', flat=True)[:batch_size])
+    if not ids:
+        _finish(pending)
+        return 0
+
+    progress = PendingDeletion.objects.filter(pk=pending.pk)
+    # I skip per-row rollup upkeep: the rollups were reset on request.
+    with rollups.suspended(), transaction.atomic():
+        # Writing first makes SQLite take its write lock up front, so a
+        # busy database makes this batch wait instead of failing when the
+        # delete's reads try to upgrade to a write.
+        progress.update(purged=F('purged'))
+        deleted = Transaction.objects.filter(id__in=ids).delete()[1].get(
+            Transaction._meta.label, 0
+        )
+        progress.update(purged=F('purged') + deleted)
+    pending.purged += deleted
+    return deleted
+
+
+def _finish(pending: PendingDeletion) -> None:
+    if pending.kind == PendingDeletion.ACCOUNT:
+        with rollups.suspended(), transaction.atomic():
+            rollups.reset_user_rollups(pending.user_id)
+            User.objects.filter(pk=pending.user_id).delete()
+        logger.info('Deleted account %s', pending.user_id)
+        return
+    # A second clear may have moved the cutoff since I loaded the purge;
+    # then I leave it open so the next batch picks up the newer rows.
+    finished = PendingDeletion.objects.filter(
+        pk=pending.pk,
+        through_id=pending.through_id,
+    ).update(finished_at=timezone.now())
+    if finished:
+        caching.bump_data_version(pending.user_id)
+
+
+def run_pending(
+    batch_size: int = BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Work through every unfinished purge, oldest first.
+
+    I stop after ``max_batches`` batches when given, so a caller can
+    share its time with other work, and return how many rows went.
+    """
+
+    purged = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        pending = (
+            PendingDeletion.objects
+            .filter(finished_at__isnull=True)
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if pending is None:
+            break
+        purged += purge_batch(pending, batch_size)
+        batches += 1
+    return purged
+
+
+@jobs.register(PURGE_JOB)
+def _run_purge_job(job) -> dict:
+    """Drain one purge batch by batch, keeping the job's lease fresh."""
+
+    purged = 0
+    while True:
+        pending = PendingDeletion.objects.filter(
+            pk=job.payload['pending_id'],
+            finished_at__isnull=True,
+        ).first()
+        # Finished, or gone with its deleted account.
+        if pending is None:
+            return {'purged': purged}
+        purged += purge_batch(pending)
+        jobs.heartbeat(job)
@@ -0,0 +1,598 @@
+"""I keep Ledgerly's pre-aggregated rollup tables in step with transactions."""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DateField,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+
+from .cycles import cycle_month_shift, cycle_start_for
+from .models import (
+    Category,
+    CycleSummary,
+    DailyRollup,
+    PendingDeletion,
+    Transaction,
+    TransactionName,
+    UserSettings,
+)
+
+_suspended: ContextVar[bool] = ContextVar(
+    'ledgerly_rollups_suspended',
+    default=False,
+)
+
+CycleKey = Tuple[int, date, str]
+DailyKey = Tuple[int, date, str, Optional[int]]
+NameKey = Tuple[int, str]
+
+
+class Contribution(NamedTuple):
+    """I describe what one transaction adds to the rollup tables."""
+
+    user_id: int
+    occurred_on: date
+    type: str
+    amount_in_cents: int
+    category_id: Optional[int]
+    name: str
+
+
+def contribution(txn: Transaction) -> Contribution:
+    """Return the contribution of a transaction as it is in memory."""
+
+    return Contribution(
+        txn.user_id,
+        txn.occurred_on,
+        txn.type,
+        txn.amount_in_cents,
+        txn.category_id,
+        txn.name,
+    )
+
+
+def stored_contribution(txn: Transaction) -> Optional[Contribution]:
+    """Return the contribution the transaction had when I loaded it."""
+
+    loaded = getattr(txn, '_loaded_values', None)
+    if not loaded:
+        return None
+    try:
+        return Contribution(
+            loaded['user_id'],
+            loaded['occurred_on'],
+            loaded['type'],
+            loaded['amount_in_cents'],
+            loaded['category_id'],
+            loaded['name'],
+        )
+    except KeyError:
+        return None
+
+
+@contextmanager
+def suspended():
+    """Skip incremental upkeep while a caller rebuilds or resets rollups."""
+
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def is_suspended() -> bool:
+    """Return ``True`` while incremental upkeep is switched off."""
+
+    return _suspended.get()
+
+
+def user_cycle_day(user_id: int) -> int:
+    """Return the cycle anchor day stored for a user (day 1 by default)."""
+
+    cycle_start = (
+        UserSettings.objects
+        .filter(user_id=user_id)
+        .values_list('cycle_start_date', flat=True)
+        .first()
+    )
+    return cycle_start.day if cycle_start else 1
+
+
+def record_change(
+    old: Optional[Contribution],
+    new: Optional[Contribution],
+) -> None:
+    """Apply the difference between two versions of one transaction."""
+
+    if old == new:
+        return
+    apply_contributions(
+        added=[new] if new else (),
+        removed=[old] if old else (),
+    )
+
+
+class _NameDelta:
+    """I collect what a batch of changes does to one user's name."""
+
+    def __init__(self):
+        self.count = 0
+        self.name: Optional[str] = None
+        self.added_on: Optional[date] = None
+        self.removed_name: Optional[str] = None
+        self.removed_on: Optional[date] = None
+
+    def add(self, sign: int, item: Contribution) -> None:
+        self.count += sign
+        day = item.occurred_on
+        if sign > 0 and (self.added_on is None or day >= self.added_on):
+            self.name = item.name.strip()
+            self.added_on = day
+        elif sign < 0 and (self.removed_on is None or day > self.removed_on):
+            self.removed_name = item.name.strip()
+            self.removed_on = day
+
+    @property
+    def is_noop(self) -> bool:
+        """Return ``True`` when an edit left the name and its date alone."""
+
+        return (
+            self.count == 0
+            and self.added_on == self.removed_on
+            and self.name == self.removed_name
+        )
+
+
+def apply_contributions(
+    added: Iterable[Contribution] = (),
+    removed: Iterable[Contribution] = (),
+) -> None:
+    """Fold many added or removed transactions into the rollup tables."""
+
+    if is_suspended():
+        return
+
+    cycle_days: Dict[int, int] = {}
+    cycle_deltas: Dict[CycleKey, list] = defaultdict(lambda: [0, 0])
+    daily_deltas: Dict[DailyKey, list] = defaultdict(lambda: [0, 0])
+    name_deltas: Dict[NameKey, _NameDelta] = defaultdict(_NameDelta)
+    for sign, items in ((1, added), (-1, removed)):
+        for item in items:
+            normalized = TransactionName.normalize(item.name)
+            if normalized:
+                name_deltas[(item.user_id, normalized)].add(sign, item)
+            if item.user_id not in cycle_days:
+                cycle_days[item.user_id] = user_cycle_day(item.user_id)
+            start = cycle_start_for(item.occurred_on, cycle_days[item.user_id])
+            category_id = (
+                None if item.type == Transaction.INCOME else item.category_id
+            )
+            for delta in (
+                cycle_deltas[(item.user_id, start, item.type)],
+                daily_deltas[
+                    (item.user_id, item.occurred_on, item.type, category_id)
+                ],
+            ):
+                delta[0] += sign * item.amount_in_cents
+                delta[1] += sign
+
+    for (user_id, start, txn_type), (cents, count) in cycle_deltas.items():
+        if cents or count:
+            _apply_cycle_delta(
+                user_id,
+                start,
+                cycle_days[user_id],
+                txn_type,
+                cents,
+                count,
+            )
+    for key, (cents, count) in daily_deltas.items():
+        if cents or count:
+            _apply_daily_delta(*key, cents=cents, count=count)
+    for (user_id, normalized), delta in name_deltas.items():
+        if not delta.is_noop:
+            _apply_name_delta(user_id, normalized, delta)
+
+
+def _apply_cycle_delta(
+    user_id: int,
+    cycle_start: date,
+    cycle_day: int,
+    txn_type: str,
+    cents: int,
+    count: int,
+) -> None:
+    """Add a delta to one cycle row, creating the row on first use."""
+
+    prefix = 'income' if txn_type == Transaction.INCOME else 'outgo'
+    cents_field = f'{prefix}_cents'
+    count_field = f'{prefix}_count'
+    updates = {
+        cents_field: F(cents_field) + cents,
+        count_field: F(count_field) + count,
+    }
+    rows = CycleSummary.objects.filter(
+        user_id=user_id,
+        cycle_start=cycle_start,
+    )
+    if rows.update(**updates) or count <= 0:
+        # I never create rows for removals: a missing row means the user
+        # (and their rollups) are being deleted, or a rebuild is due anyway.
+        return
+    try:
+        with transaction.atomic():
+            CycleSummary.objects.create(
+                user_id=user_id,
+                cycle_start=cycle_start,
+                cycle_end=cycle_month_shift(cycle_start, 1, cycle_day),
+                **{cents_field: cents, count_field: count},
+            )
+    except IntegrityError:
+        rows.update(**updates)
+
+
+def _apply_daily_delta(
+    user_id: int,
+    day: date,
+    txn_type: str,
+    category_id: Optional[int],
+    cents: int,
+    count: int,
+) -> None:
+    """Add a delta to one daily row and drop the row once it is empty."""
+
+    rows = DailyRollup.objects.filter(
+        user_id=user_id,
+        day=day,
+        type=txn_type,
+        category_id=category_id,
+    )
+    updates = {
+        'total_cents': F('total_cents') + cents,
+        'count': F('count') + count,
+    }
+    if rows.update(**updates):
+        if count < 0:
+            rows.filter(count__lte=0).delete()
+        return
+    if count <= 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(
+                user_id=user_id,
+                day=day,
+                type=txn_type,
+                category_id=category_id,
+                total_cents=cents,
+                count=count,
+            )
+    except IntegrityError:
+        rows.update(**updates)
+
+
+def _apply_name_delta(
+    user_id: int,
+    normalized: str,
+    delta: _NameDelta,
+) -> None:
+    """Adjust one name's use count and recency, dropping it once unused."""
+
+    rows = TransactionName.objects.filter(
+        user_id=user_id,
+        normalized=normalized,
+    )
+    updates = {'use_count': F('use_count') + delta.count}
+    if delta.added_on is not None:
+        added_on = Value(delta.added_on, output_field=DateField())
+        updates['name'] = Case(
+            When(last_used_on__lte=delta.added_on, then=Value(delta.name)),
+            default=F('name'),
+        )
+        updates['last_used_on'] = Greatest(F('last_used_on'), added_on)
+    if rows.update(**updates):
+        if delta.count < 0:
+            rows.filter(use_count__lte=0).delete()
+        if delta.removed_on is not None:
+            _refresh_last_used(rows, delta.removed_on)
+        return
+    if delta.count <= 0:
+        return
+    try:
+        with transaction.atomic():
+            TransactionName.objects.create(
+                user_id=user_id,
+                name=delta.name,
+                normalized=normalized,
+                use_count=delta.count,
+                last_used_on=delta.added_on,
+            )
+    except IntegrityError:
+        rows.update(**updates)
+
+
+def _refresh_last_used(rows, removed_on: date) -> None:
+    """Recompute recency and spelling when the latest use went away."""
+
+    entry = rows.filter(last_used_on__lte=removed_on).first()
+    if entry is None:
+        return
+    # I match spellings with ``normalize`` itself: SQL's LOWER and TRIM
+    # fold less than Python does (SQLite's LOWER only ASCII), so I group
+    # the user's names in the database and compare them here, newest first.
+    spellings = (
+        PendingDeletion.hide_from(
+            Transaction.objects.filter(user_id=entry.user_id),
+            entry.user_id,
+        )
+        .order_by()
+        .values_list('name')
+        .annotate(latest=Max('occurred_on'))
+        .order_by('-latest')
+    )
+    latest = next(
+        (
+            (name.strip(), day) for name, day in spellings.iterator()
+            if TransactionName.normalize(name) == entry.normalized
+        ),
+        None,
+    )
+    if latest is not None and latest != (entry.name, entry.last_used_on):
+        rows.update(name=latest[0], last_used_on=latest[1])
+
+
+def reset_user_rollups(user_id: int) -> None:
+    """Drop every rollup row for a user whose history was wiped."""
+
+    CycleSummary.objects.filter(user_id=user_id).delete()
+    DailyRollup.objects.filter(user_id=user_id).delete()
+    TransactionName.objects.filter(user_id=user_id).delete()
+
+
+def rebuild_cycle_summaries(user_id: int) -> int:
+    """Recompute a user's cycle rows from scratch and return the row count."""
+
+    cycle_day = user_cycle_day(user_id)
+    daily_totals = (
+        PendingDeletion.hide_from(
+            Transaction.objects.filter(user_id=user_id), user_id
+        )
+        .order_by()
+        .values('occurred_on', 'type')
+        .annotate(total=Sum('amount_in_cents'), count=Count('id'))
+    )
+
+    summaries: Dict[date, CycleSummary] = {}
+    for row in daily_totals:
+        start = cycle_start_for(row['occurred_on'], cycle_day)
+        summary = summaries.get(start)
+        if summary is None:
+            summary = summaries[start] = CycleSummary(
+                user_id=user_id,
+                cycle_start=start,
+                cycle_end=cycle_month_shift(start, 1, cycle_day),
+            )
+        if row['type'] == Transaction.INCOME:
+            summary.income_cents += row['total']
+            summary.income_count += row['count']
+        else:
+            summary.outgo_cents += row['total']
+            summary.outgo_count += row['count']
+
+    with transaction.atomic():
+        CycleSummary.objects.filter(user_id=user_id).delete()
+        CycleSummary.objects.bulk_create(summaries.values())
+    return len(summaries)
+
+
+def rebuild_daily_rollups(user_id: int) -> int:
+    """Recompute a user's daily rows from scratch and return the row count."""
+
+    grouped = (
+        PendingDeletion.hide_from(
+            Transaction.objects.filter(user_id=user_id), user_id
+        )
+        .order_by()
+        .values('occurred_on', 'type', 'category_id')
+        .annotate(total=Sum('amount_in_cents'), count=Count('id'))
+    )
+    merged: Dict[DailyKey, DailyRollup] = {}
+    for row in grouped:
+        category_id = (
+            None if row['type'] == Transaction.INCOME else row['category_id']
+        )
+        key = (user_id, row['occurred_on'], row['type'], category_id)
+        rollup = merged.get(key)
+        if rollup is None:
+            rollup = merged[key] = DailyRollup(
+                user_id=user_id,
+                day=row['occurred_on'],
+                type=row['type'],
+                category_id=category_id,
+            )
+        rollup.total_cents += row['total']
+        rollup.count += row['count']
+
+    with transaction.atomic():
+        DailyRollup.objects.filter(user_id=user_id).delete()
+        DailyRollup.objects.bulk_create(merged.values(), batch_size=1000)
+    return len(merged)
+
+
+def rebuild_transaction_names(user_id: int) -> int:
+    """Recompute a user's name counts from scratch and return the row count."""
+
+    grouped = (
+        PendingDeletion.hide_from(
+            Transaction.objects.filter(user_id=user_id), user_id
+        )
+        .order_by()
+        .values('name')
+        .annotate(count=Count('id'), latest=Max('occurred_on'))
+    )
+    merged: Dict[str, TransactionName] = {}
+    for row in grouped:
+        normalized = TransactionName.normalize(row['name'])
+        if not normalized:
+            continue
+        entry = merged.get(normalized)
+        if entry is None:
+            entry = merged[normalized] = TransactionName(
+                user_id=user_id,
+                normalized=normalized,
+                name=row['name'].strip(),
+                last_used_on=row['latest'],
+            )
+        elif row['latest'] > entry.last_used_on:
+            entry.name = row['name'].strip()
+            entry.last_used_on = row['latest']
+        entry.use_count += row['count']
+
+    with transaction.atomic():
+        TransactionName.objects.filter(user_id=user_id).delete()
+        TransactionName.objects.bulk_create(merged.values(), batch_size=1000)
+    return len(merged)
+
+
+def rebuild_user_rollups(user_id: int) -> None:
+    """Recompute every rollup table for one user."""
+
+    rebuild_cycle_summaries(user_id)
+    rebuild_daily_rollups(user_id)
+    rebuild_transaction_names(user_id)
+
+
+def _daily_rows(user, start: date, end: date):
+    """Return daily rollup rows with their category names in one query."""
+
+    return (
+        DailyRollup.objects
+        .filter(user=user, day__gte=start, day__lt=end)
+        .order_by('day')
+        .values_list('day', 'type', 'category_id', 'category__name',
+                     'total_cents', 'count')
+    )
+
+
+def summarize_range(user, start: date, end: date) -> dict:
+    """
+    Summarise ``[start, end)`` from the daily rollups without touching rows.
+
+    I return per-day totals (for calendars and heatmaps), per-category
+    outgo totals and overall totals, all from a single rollup query.
+    """
+
+    return _summarize_rows(_daily_rows(user, start, end))
+
+
+async def asummarize_months(
+    user,
+    first: date,
+    last: date,
+) -> Dict[date, dict]:
+    """
+    Summarise every month from ``first`` to ``last`` with one rollup query.
+
+    Both bounds are first-of-month dates. I return a summary per month,
+    keyed by its first day and in order, including months with no rows.
+    """
+
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = cycle_month_shift(month, 1, 1)
+    by_month: Dict[date, list] = defaultdict(list)
+    async for row in _daily_rows(user, first, month):
+        by_month[row[0].replace(day=1)].append(row)
+    return {month: _summarize_rows(by_month[month]) for month in months}
+
+
+def _summarize_rows(rows) -> dict:
+    """Fold daily rollup rows into day, category and overall totals."""
+
+    days: Dict[date, dict] = {}
+    categories: Dict[Optional[int], dict] = {}
+    totals = {'income_cents': 0, 'outgo_cents': 0, 'count': 0}
+    for day, txn_type, category_id, category_name, cents, count in rows:
+        entry = days.setdefault(day, {
+            'date': day,
+            'income_cents': 0,
+            'outgo_cents': 0,
+            'count': 0,
+        })
+        key = 'income_cents' if txn_type == Transaction.INCOME else (
+            'outgo_cents'
+        )
+        entry[key] += cents
+        entry['count'] += count
+        totals[key] += cents
+        totals['count'] += count
+        if txn_type == Transaction.OUTGO:
+            category = categories.setdefault(category_id, {
+                'category_id': category_id,
+                'name': category_name or 'Uncategorized',
+                'outgo_cents': 0,
+                'count': 0,
+            })
+            category['outgo_cents'] += cents
+            category['count'] += count
+
+    return {
+        'days': list(days.values()),
+        'categories': sorted(
+            categories.values(),
+            key=lambda item: (-item['outgo_cents'], item['name']),
+        ),
+        'totals': totals,
+    }
+
+
+def uncategorize(category: Category) -> int:
+    """
+    Move ``category``'s daily rows under "no category" before it goes.
+
+    Deleting a category leaves its transactions uncategorized, so I fold
+    its rollup rows into each day's uncategorized row with two grouped
+    UPDATEs and a DELETE, touching no transactions whatever their number.
+    I return how many rows I moved or merged.
+    """
+
+    same_slot = dict(
+        user_id=OuterRef('user_id'),
+        day=OuterRef('day'),
+        type=OuterRef('type'),
+    )
+    moving = DailyRollup.objects.filter(category=category, **same_slot)
+    with transaction.atomic():
+        DailyRollup.objects.filter(
+            Exists(moving), category__isnull=True
+        ).update(
+            total_cents=F('total_cents') + Subquery(
+                moving.values('total_cents')[:1]
+            ),
+            count=F('count') + Subquery(moving.values('count')[:1]),
+        )
+        uncategorized = DailyRollup.objects.filter(
+            category__isnull=True, **same_slot
+        )
+        rows = DailyRollup.objects.filter(category=category)
+        merged, _ = rows.filter(Exists(uncategorized)).delete()
+        return merged + rows.update(category=None)
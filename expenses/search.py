@@ -0,0 +1,227 @@
+"""I run full-text transaction searches through a database-specific index."""
+
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import PendingDeletion, Transaction
+
+logger = logging.getLogger(__name__)
+
+# I cap how many words a query may carry so one request stays cheap.
+MAX_TERMS = 8
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query: str) -> List[str]:
+    """Split raw input into the lower-cased words I match as prefixes."""
+
+    return _WORD_RE.findall(query.lower())[:MAX_TERMS]
+
+
+class SearchBackend(ABC):
+    """
+    I find the ids of a user's transactions that match a set of words.
+
+    Every word must match the start of a word in the name, category, note
+    or type. Backends return ids best match first, skip the rows a history
+    purge is about to delete before applying ``limit``, and must give up
+    once ``timeout_ms`` has passed instead of holding the request.
+    """
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+
+    @abstractmethod
+    def search_ids(self, user_id: int, terms: List[str], limit: int) -> list:
+        """Return up to ``limit`` of the user's matching ids, best first."""
+
+    @abstractmethod
+    def filter_matching(self, queryset, terms: List[str]):
+        """Narrow ``queryset`` to matches from every user, unranked."""
+
+
+class LikeSearchBackend(SearchBackend):
+    """I fall back to ``icontains`` filters where no full-text index exists."""
+
+    def search_ids(self, user_id, terms, limit):
+        queryset = self.filter_matching(
+            PendingDeletion.hide_from(
+                Transaction.objects.filter(user_id=user_id), user_id
+            ),
+            terms,
+        )
+        return list(
+            queryset
+            .order_by('-occurred_on', '-id')
+            .values_list('id', flat=True)[:limit]
+        )
+
+    def filter_matching(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term)
+                | Q(category__name__icontains=term)
+                | Q(note__icontains=term)
+                | Q(type__icontains=term)
+            )
+        return queryset
+
+
+class SqliteFtsSearchBackend(SearchBackend):
+    """I query the FTS5 table that triggers keep beside the transactions."""
+
+    # I weight the columns owner, name, category, note, type for bm25().
+    RANK = 'bm25(expenses_transaction_fts, 0.0, 10.0, 5.0, 2.0, 1.0)'
+    # I check the clock every this many SQLite virtual machine steps.
+    PROGRESS_STEPS = 1000
+
+    def columns_expression(self, terms: List[str]) -> str:
+        prefixes = ' '.join(f'"{term}"*' for term in terms)
+        return f'{{name category note type}}:({prefixes})'
+
+    def match_expression(self, user_id: int, terms: List[str]) -> str:
+        return f'owner:"u{user_id}" AND {self.columns_expression(terms)}'
+
+    def search_ids(self, user_id, terms, limit):
+        hidden_sql, hidden_params = PendingDeletion.hidden_through_sql(
+            user_id
+        )
+        sql = (
+            'SELECT rowid FROM expenses_transaction_fts '
+            'WHERE expenses_transaction_fts MATCH %s '
+            f'AND rowid > {hidden_sql} '
+            f'ORDER BY {self.RANK}, rowid DESC LIMIT %s'
+        )
+        params = [
+            self.match_expression(user_id, terms), *hidden_params, limit,
+        ]
+        connection.ensure_connection()
+        raw = connection.connection
+        deadline = time.monotonic() + self.timeout_ms / 1000
+        raw.set_progress_handler(
+            lambda: time.monotonic() > deadline,
+            self.PROGRESS_STEPS,
+        )
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return [row[0] for row in cursor.fetchall()]
+        finally:
+            raw.set_progress_handler(None, 0)
+
+    def filter_matching(self, queryset, terms):
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT rowid FROM expenses_transaction_fts '
+            'WHERE expenses_transaction_fts MATCH %s',
+            [self.columns_expression(terms)],
+        ))
+
+
+class PostgresSearchBackend(SearchBackend):
+    """I query the weighted ``search_document`` tsvector and its GIN index."""
+
+    def tsquery(self, terms: List[str]) -> str:
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search_ids(self, user_id, terms, limit):
+        hidden_sql, hidden_params = PendingDeletion.hidden_through_sql(
+            user_id
+        )
+        sql = (
+            'SELECT id FROM expenses_transaction, '
+            "to_tsquery('simple', %s) AS query "
+            'WHERE user_id = %s AND search_document @@ query '
+            f'AND id > {hidden_sql} '
+            'ORDER BY ts_rank(search_document, query) DESC, '
+            'occurred_on DESC, id DESC LIMIT %s'
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [str(int(self.timeout_ms))],
+            )
+            cursor.execute(sql, [
+                self.tsquery(terms), user_id, *hidden_params, limit,
+            ])
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter_matching(self, queryset, terms):
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT id FROM expenses_transaction '
+            "WHERE search_document @@ to_tsquery('simple', %s)",
+            [self.tsquery(terms)],
+        ))
+
+
+BACKENDS: Dict[str, Type[SearchBackend]] = {
+    'sqlite': SqliteFtsSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend() -> SearchBackend:
+    """Return the configured backend, or the one for the active database."""
+
+    timeout_ms = getattr(settings, 'LEDGERLY_SEARCH_TIMEOUT_MS', 250)
+    configured: Optional[str] = getattr(
+        settings, 'LEDGERLY_SEARCH_BACKEND', None
+    )
+    if configured:
+        backend_class = import_string(configured)
+    else:
+        backend_class = BACKENDS.get(connection.vendor, LikeSearchBackend)
+    return backend_class(timeout_ms)
+
+
+def search_transactions(user, query: str, limit: int = 10) -> List:
+    """
+    Return up to ``limit`` of the user's transactions matching ``query``.
+
+    I rank in the database, then load the rows with their categories in
+    one query and put them back in rank order. A search that runs out of
+    time is logged and comes back empty rather than failing the page.
+    """
+
+    terms = search_terms(query)
+    if not terms or limit <= 0:
+        return []
+    backend = get_backend()
+    try:
+        ids = backend.search_ids(user.pk, terms, limit)
+    except DatabaseError:
+        logger.warning(
+            'Transaction search for %r gave up after %sms',
+            query,
+            backend.timeout_ms,
+            exc_info=True,
+        )
+        return []
+    rows = (
+        Transaction.objects.filter(user=user)
+        .select_related('category')
+        .in_bulk(ids)
+    )
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+async def asearch_transactions(user, query: str, limit: int = 10) -> List:
+    """
+    Do what :func:`search_transactions` does from async code.
+
+    The backends drive raw cursors, statement timeouts and SQLite's
+    progress handler, none of which Django's async ORM exposes, so I run
+    the whole search in a worker thread and await it.
+    """
+
+    return await sync_to_async(search_transactions)(user, query, limit)
@@ -0,0 +1,161 @@
+"""I connect the model signals that keep Ledgerly's derived data current."""
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from . import caching, rollups
+from .models import Category, Transaction, UserSettings
+
+TRACKED_TRANSACTION_FIELDS = (
+    'user_id',
+    'occurred_on',
+    'type',
+    'amount_in_cents',
+    'category_id',
+    'name',
+)
+TRACKED_SETTINGS_FIELDS = ('user_id', 'cycle_start_date', 'currency_code')
+# Only these category fields show up in cached dashboards and responses.
+TRACKED_CATEGORY_FIELDS = ('name', 'is_active')
+
+
+def _deleted_with_user(origin) -> bool:
+    """Return ``True`` when a delete cascades from removing a user."""
+
+    if isinstance(origin, User):
+        return True
+    return isinstance(origin, QuerySet) and issubclass(origin.model, User)
+
+
+def _remember(instance, field_names) -> None:
+    """Store the just-saved values as the new baseline for future deltas."""
+
+    instance._loaded_values = {
+        name: getattr(instance, name) for name in field_names
+    }
+
+
+def _load_stored(instance, field_names) -> None:
+    """Fetch the stored row when an update arrives without a snapshot."""
+
+    if instance._state.adding or hasattr(instance, '_loaded_values'):
+        return
+    instance._loaded_values = (
+        type(instance)._default_manager
+        .filter(pk=instance.pk)
+        .values(*field_names)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Transaction)
+def load_stored_transaction(sender, instance, raw=False, **kwargs):
+    """I make sure edits know what the transaction looked like before."""
+
+    if not raw:
+        _load_stored(instance, TRACKED_TRANSACTION_FIELDS)
+
+
+@receiver(pre_save, sender=UserSettings)
+def load_stored_settings(sender, instance, raw=False, **kwargs):
+    """I make sure settings edits know the previous cycle anchor."""
+
+    if not raw:
+        _load_stored(instance, TRACKED_SETTINGS_FIELDS)
+
+
+@receiver(pre_save, sender=Category)
+def load_stored_category(sender, instance, raw=False, **kwargs):
+    """I make sure category edits know the previous name and status."""
+
+    if not raw:
+        _load_stored(instance, TRACKED_CATEGORY_FIELDS)
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, created, raw=False, **kwargs):
+    """I fold a created or edited transaction into the rollups."""
+
+    if raw:
+        return
+    old = None if created else rollups.stored_contribution(instance)
+    rollups.record_change(old, rollups.contribution(instance))
+    if not rollups.is_suspended():
+        caching.bump_data_version(
+            instance.user_id,
+            old.user_id if old else None,
+        )
+    _remember(instance, TRACKED_TRANSACTION_FIELDS)
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, origin=None, **kwargs):
+    """I take a deleted transaction back out of the rollups."""
+
+    if _deleted_with_user(origin):
+        return
+    old = (
+        rollups.stored_contribution(instance)
+        or rollups.contribution(instance)
+    )
+    rollups.record_change(old, None)
+    if not rollups.is_suspended():
+        caching.bump_data_version(old.user_id)
+
+
+@receiver(post_save, sender=UserSettings)
+def settings_saved(sender, instance, created, raw=False, **kwargs):
+    """I rebuild cycle rollups when the user's cycle anchor day moves."""
+
+    if raw:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or 'cycle_start_date' in update_fields:
+        loaded = getattr(instance, '_loaded_values', None) or {}
+        previous = loaded.get('cycle_start_date')
+        previous_day = previous.day if previous else 1
+        current_day = (
+            instance.cycle_start_date.day if instance.cycle_start_date else 1
+        )
+        if previous_day != current_day:
+            rollups.rebuild_cycle_summaries(instance.user_id)
+    _remember(instance, TRACKED_SETTINGS_FIELDS)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, raw=False, **kwargs):
+    """I drop every cached dashboard when a shown field really changed."""
+
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    changed = created or any(
+        loaded.get(name) != getattr(instance, name)
+        for name in TRACKED_CATEGORY_FIELDS
+    )
+    if changed:
+        caching.bump_all_data_versions()
+        caching.invalidate_categories()
+    _remember(instance, TRACKED_CATEGORY_FIELDS)
+
+
+@receiver(pre_delete, sender=Category)
+def uncategorize_rollups(sender, instance, **kwargs):
+    """I move the category's daily rollups to "no category" in bulk."""
+
+    rollups.uncategorize(instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    """I drop cached dashboards once the category is gone."""
+
+    caching.bump_all_data_versions()
+    caching.invalidate_categories()
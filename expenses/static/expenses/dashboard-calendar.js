@@ -42,6 +42,7 @@
     let currentMonth;
     let selectedDate = null;
     let calendarData = new Map();
+    let dayTransactions = new Map();
     let dayButtons = new Map();
     let todayIso = '';
     let isLoadingMonth = false;
@@ -53,6 +54,9 @@
     const emptyPromptMessage = (
         emptyStateEl.dataset.promptMessage || emptyDefaultMessage
     );
+    const emptyLoadingMessage = (
+        emptyStateEl.dataset.loadingMessage || 'Loading transactions…'
+    );
 
     const monthFormatter = new Intl.DateTimeFormat(undefined, {
         month: 'long',
@@ -69,6 +73,42 @@
 
     const buildDateKey = (year, month, day) => `${year}-${pad(month)}-${pad(day)}`;
 
+    // I format integer cents the way the server does ("£1,234.50").
+    const groupFormatter = new Intl.NumberFormat('en-US');
+    const formatCents = (cents, symbol) => {
+        const value = Math.abs(Number(cents) || 0);
+        const units = Math.floor(value / 100);
+        return `${symbol}${groupFormatter.format(units)}.${pad(value % 100)}`;
+    };
+
+    // I expand a compact day payload: rows are arrays in `fields` order and
+    // point at the type and category labels sent once alongside them.
+    const decodeDay = (data) => {
+        const fields = Array.isArray(data.fields) ? data.fields : [];
+        const rows = Array.isArray(data.transactions) ? data.transactions : [];
+        const types = data.types || {};
+        const categories = data.categories || {};
+        const urlTemplate = data.detail_url || '';
+        const symbol = data.currency_symbol || '';
+        return rows.map((values) => {
+            const row = {};
+            fields.forEach((field, index) => {
+                row[field] = values[index];
+            });
+            const sign = row.type === 'OUTGO' ? '-' : '+';
+            return {
+                id: row.id,
+                name: row.name,
+                type: row.type,
+                type_display: types[row.type] || row.type,
+                category: categories[row.category] || 'Uncategorized',
+                note: row.note || '',
+                amount_display: `${sign}${formatCents(row.amount, symbol)}`,
+                detail_url: urlTemplate ? urlTemplate.replace('{id}', row.id) : '',
+            };
+        });
+    };
+
     const setLoading = (loading) => {
         isLoadingMonth = loading;
         if (loadingEl) {
@@ -126,16 +166,30 @@
 
         transactionsListEl.innerHTML = '';
 
-        const transactions = calendarData.get(dateKey) || [];
+        const daySummary = calendarData.get(dateKey);
+        const transactions = dayTransactions.get(dateKey) || [];
+        const isPending = Boolean(
+            daySummary &&
+            daySummary.count > 0 &&
+            !dayTransactions.has(dateKey)
+        );
         const listContainer = transactionsListEl.parentElement;
         if (listContainer) {
             listContainer.scrollTop = 0;
         }
 
+        if (isPending) {
+            loadDay(dateKey);
+        }
+
         if (!transactions.length) {
-            emptyStateEl.textContent = dateKey
-                ? emptyDefaultMessage
-                : emptyPromptMessage;
+            if (isPending) {
+                emptyStateEl.textContent = emptyLoadingMessage;
+            } else {
+                emptyStateEl.textContent = dateKey
+                    ? emptyDefaultMessage
+                    : emptyPromptMessage;
+            }
             transactionsListEl.classList.add('d-none');
             emptyStateEl.classList.remove('d-none');
             return;
@@ -261,7 +315,7 @@
             const displayDate = new Date(currentYear, currentMonth - 1, day);
             button.setAttribute('aria-label', dateFormatter.format(displayDate));
 
-            const count = calendarData.has(dateKey) ? calendarData.get(dateKey).length : 0;
+            const count = calendarData.has(dateKey) ? calendarData.get(dateKey).count : 0;
             if (count > 0) {
                 button.classList.add('has-transactions');
             }
@@ -309,7 +363,8 @@
         todayIso = data.today || todayIso;
 
         const days = Array.isArray(data.days) ? data.days : [];
-        calendarData = new Map(days.map((day) => [day.date, Array.isArray(day.transactions) ? day.transactions : []]));
+        calendarData = new Map(days.map((day) => [day.date, day]));
+        dayTransactions = new Map();
 
         if (monthLabelEl) {
             const labelDate = new Date(currentYear, currentMonth - 1, 1);
@@ -332,16 +387,30 @@
         }
     };
 
-    const fetchMonth = async (year, month) => {
-        const url = new URL(calendarUrl, window.location.origin);
-        url.searchParams.set('year', year);
-        url.searchParams.set('month', month);
+    // I keep recent answers with their ETags so asking again costs the
+    // server a 304 instead of re-running the month's queries.
+    const MAX_VALIDATED = 24;
+    const validated = new Map();
 
-        const response = await fetch(url.toString(), {
-            headers: {
-                'X-Requested-With': 'XMLHttpRequest',
-            },
+    const fetchCalendarJson = async (params) => {
+        const url = new URL(calendarUrl, window.location.origin);
+        Object.entries(params).forEach(([key, value]) => {
+            url.searchParams.set(key, value);
         });
+        const key = url.toString();
+        const known = validated.get(key);
+
+        const headers = {
+            'X-Requested-With': 'XMLHttpRequest',
+        };
+        if (known) {
+            headers['If-None-Match'] = known.etag;
+        }
+        const response = await fetch(key, { headers });
+
+        if (response.status === 304 && known) {
+            return known.data;
+        }
 
         if (!response.ok) {
             throw new Error('Failed to fetch calendar data.');
@@ -352,15 +421,141 @@
             throw new Error('Unexpected response format.');
         }
 
-        return response.json();
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        validated.delete(key);
+        if (etag) {
+            validated.set(key, { etag, data });
+            if (validated.size > MAX_VALIDATED) {
+                validated.delete(validated.keys().next().value);
+            }
+        }
+        return data;
+    };
+
+    // I hold recently seen months so arrow navigation is instant, and
+    // fetch the neighbours of whatever is on screen in the background.
+    const MAX_CACHED_MONTHS = 24;
+    const PREFETCH_RADIUS = 2;
+    const monthCache = new Map();
+    let prefetching = null;
+
+    const monthKey = (year, month) => `${year}-${pad(month)}`;
+
+    const shiftMonth = (year, month, offset) => {
+        const shifted = new Date(year, month - 1 + offset, 1);
+        return [shifted.getFullYear(), shifted.getMonth() + 1];
+    };
+
+    const cachedMonth = (year, month) => {
+        const key = monthKey(year, month);
+        const data = monthCache.get(key);
+        if (data) {
+            monthCache.delete(key);
+            monthCache.set(key, data);
+        }
+        return data;
+    };
+
+    const rememberMonth = (data) => {
+        const key = monthKey(data.year, data.month);
+        monthCache.delete(key);
+        monthCache.set(key, data);
+        while (monthCache.size > MAX_CACHED_MONTHS) {
+            monthCache.delete(monthCache.keys().next().value);
+        }
+    };
+
+    // I ask for every uncached month around the given one in one request.
+    const fetchAround = async (year, month) => {
+        const missing = [];
+        for (let offset = -PREFETCH_RADIUS; offset <= PREFETCH_RADIUS; offset += 1) {
+            const [y, m] = shiftMonth(year, month, offset);
+            if (!monthCache.has(monthKey(y, m))) {
+                missing.push([y, m]);
+            }
+        }
+        if (!missing.length) {
+            return;
+        }
+        const [first, last] = [missing[0], missing[missing.length - 1]];
+        const data = await fetchCalendarJson({
+            from: monthKey(first[0], first[1]),
+            to: monthKey(last[0], last[1]),
+        });
+        const months = Array.isArray(data.months) ? data.months : [];
+        months.forEach((monthData) => {
+            rememberMonth({
+                ...monthData,
+                currency_symbol: data.currency_symbol,
+                today: data.today,
+            });
+        });
+    };
+
+    const prefetchAround = (year, month) => {
+        if (prefetching) {
+            return;
+        }
+        prefetching = fetchAround(year, month)
+            .catch((error) => console.debug('Calendar prefetch failed.', error))
+            .finally(() => {
+                prefetching = null;
+            });
+    };
+
+    const fetchMonth = async (year, month) => {
+        if (prefetching) {
+            await prefetching;
+        }
+        let data = cachedMonth(year, month);
+        if (!data) {
+            await fetchAround(year, month);
+            data = cachedMonth(year, month);
+        }
+        if (!data) {
+            throw new Error('Calendar month missing from the response.');
+        }
+        return data;
+    };
+
+    // I only pull a day's individual transactions once the user opens it.
+    const pendingDays = new Set();
+    const loadDay = async (dateKey) => {
+        if (pendingDays.has(dateKey)) {
+            return;
+        }
+        pendingDays.add(dateKey);
+        try {
+            const data = await fetchCalendarJson({ date: dateKey });
+            if (!calendarData.has(dateKey)) {
+                return;
+            }
+            dayTransactions.set(dateKey, decodeDay(data));
+            if (selectedDate === dateKey) {
+                renderTransactions(dateKey);
+            }
+        } catch (error) {
+            showError('Unable to load transactions for this day. Please try again shortly.');
+            console.error(error);
+        } finally {
+            pendingDays.delete(dateKey);
+        }
     };
 
     const loadMonth = async (year, month) => {
-        setLoading(true);
         clearError();
+        const cached = cachedMonth(year, month);
+        if (cached) {
+            populateCalendar(cached);
+            prefetchAround(year, month);
+            return;
+        }
+        setLoading(true);
         try {
             const data = await fetchMonth(year, month);
             populateCalendar(data);
+            prefetchAround(year, month);
         } catch (error) {
             showError('Unable to load calendar data right now. Please try again shortly.');
             console.error(error);
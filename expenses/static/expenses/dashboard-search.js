@@ -24,6 +24,10 @@
 
     let debounceHandle = null;
     let searchController = null;
+    // I keep recent answers with their ETags so retyping a query costs the
+    // server a 304 instead of another search.
+    const MAX_VALIDATED = 50;
+    const validated = new Map();
 
     const abortSearch = () => {
         if (searchController) {
@@ -76,17 +80,36 @@
         abortSearch();
         searchController = new AbortController();
 
+        const key = url.toString();
+        const known = validated.get(key);
+        const headers = {
+            'X-Requested-With': 'XMLHttpRequest',
+        };
+        if (known) {
+            headers['If-None-Match'] = known.etag;
+        }
+
         try {
-            const response = await fetch(url.toString(), {
-                headers: {
-                    'X-Requested-With': 'XMLHttpRequest',
-                },
+            const response = await fetch(key, {
+                headers,
                 signal: searchController.signal,
             });
-            if (!response.ok) {
+            let data;
+            if (response.status === 304 && known) {
+                data = known.data;
+            } else if (!response.ok) {
                 throw new Error('Failed to fetch search results');
+            } else {
+                data = await response.json();
+                const etag = response.headers.get('ETag');
+                validated.delete(key);
+                if (etag) {
+                    validated.set(key, { etag, data });
+                    if (validated.size > MAX_VALIDATED) {
+                        validated.delete(validated.keys().next().value);
+                    }
+                }
             }
-            const data = await response.json();
             renderResults(data.html || '');
             if (typeof data.count === 'number' && data.count > 0) {
                 updateMessage('results', term);
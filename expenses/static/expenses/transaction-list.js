@@ -0,0 +1,96 @@
+(function () {
+    'use strict';
+
+    const moreEl = document.getElementById('transaction-rows-more');
+    const rowsEl = document.getElementById('transaction-rows');
+    if (!moreEl || !rowsEl) {
+        return;
+    }
+
+    const pageUrl = moreEl.dataset.pageUrl;
+    if (!pageUrl) {
+        return;
+    }
+
+    const loadingMessage = moreEl.dataset.loadingMessage || 'Loading…';
+    const errorMessage = moreEl.dataset.errorMessage || 'Could not load more.';
+    const fallbackHTML = moreEl.innerHTML;
+
+    let cursor = moreEl.dataset.cursor || '';
+    let isLoading = false;
+    let observer = null;
+
+    const finish = () => {
+        if (observer) {
+            observer.disconnect();
+        }
+        moreEl.remove();
+    };
+
+    const showError = () => {
+        moreEl.innerHTML = fallbackHTML;
+        const link = moreEl.querySelector('a');
+        if (link) {
+            link.href = `?cursor=${encodeURIComponent(cursor)}`;
+        }
+        const message = document.createElement('p');
+        message.className = 'text-danger small mb-2';
+        message.textContent = errorMessage;
+        moreEl.prepend(message);
+    };
+
+    const loadNextPage = async () => {
+        if (isLoading || !cursor) {
+            return;
+        }
+        isLoading = true;
+        moreEl.textContent = loadingMessage;
+
+        const url = new URL(pageUrl, window.location.origin);
+        url.searchParams.set('cursor', cursor);
+
+        try {
+            const response = await fetch(url.toString(), {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                credentials: 'same-origin',
+            });
+            if (!response.ok) {
+                throw new Error(`Request failed with ${response.status}`);
+            }
+            const data = await response.json();
+            rowsEl.insertAdjacentHTML('beforeend', data.html || '');
+            cursor = data.next_cursor || '';
+            if (!cursor) {
+                finish();
+                return;
+            }
+            moreEl.textContent = '';
+            // I re-observe so a sentinel that is still on screen after a
+            // short page triggers the next load straight away.
+            observer.unobserve(moreEl);
+            observer.observe(moreEl);
+        } catch (error) {
+            console.error(error);
+            if (observer) {
+                observer.disconnect();
+            }
+            showError();
+        } finally {
+            isLoading = false;
+        }
+    };
+
+    if (!('IntersectionObserver' in window)) {
+        // I keep the plain "Older transactions" link for older browsers.
+        return;
+    }
+
+    moreEl.textContent = '';
+    // I start fetching a little before the reader reaches the last row.
+    observer = new IntersectionObserver((entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+            loadNextPage();
+        }
+    }, { rootMargin: '400px 0px' });
+    observer.observe(moreEl);
+})();
@@ -0,0 +1,78 @@
+"""I serve the type-ahead suggestions shown while a user enters a name."""
+
+from typing import List
+
+from django.db import connection
+
+from . import caching
+from .models import TransactionName
+
+# The highest code point; a prefix followed by it sorts after every string
+# that starts with the prefix.
+_PREFIX_CEILING = '\U0010ffff'
+
+
+def _prefix_lookup(prefix: str) -> dict:
+    """
+    Return filter arguments that match ``normalized`` values by prefix.
+
+    SQLite compares strings by code point but cannot serve ``LIKE`` from
+    an ordinary index, so I turn the prefix into a range there. Elsewhere
+    ``startswith`` is served by the pattern-ops unique index.
+    """
+
+    if connection.vendor == 'sqlite':
+        return {
+            'normalized__gte': prefix,
+            'normalized__lt': prefix + _PREFIX_CEILING,
+        }
+    return {'normalized__startswith': prefix}
+
+
+def suggest_names(user, query: str, limit: int = 10) -> List[str]:
+    """
+    Return the user's transaction names starting with ``query``.
+
+    I read the per-user name counts rather than the transactions, so the
+    cost follows how many distinct names match, not the size of the
+    history. The most used and then most recently used names come first.
+    """
+
+    prefix = TransactionName.normalize(query)
+    if not prefix:
+        return []
+    return list(_name_matches(user, prefix, limit))
+
+
+async def asuggest_names(user, query: str, limit: int = 10) -> List[str]:
+    """Do what :func:`suggest_names` does from async code."""
+
+    prefix = TransactionName.normalize(query)
+    if not prefix:
+        return []
+    return [name async for name in _name_matches(user, prefix, limit)]
+
+
+def _name_matches(user, prefix: str, limit: int):
+    """Return the ranked name query behind both suggestion helpers."""
+
+    return (
+        TransactionName.objects
+        .filter(user=user, **_prefix_lookup(prefix))
+        .order_by('-use_count', '-last_used_on', 'name')
+        .values_list('name', flat=True)[:limit]
+    )
+
+
+def suggest_categories(query: str, limit: int = 10) -> List[str]:
+    """Return active category names starting with ``query``."""
+
+    prefix = query.strip().lower()
+    if not prefix:
+        return []
+    names = sorted(
+        category.name
+        for category in caching.active_categories()
+        if category.name.lower().startswith(prefix)
+    )
+    return names[:limit]
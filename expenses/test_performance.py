@@ -0,0 +1,222 @@
+"""
+I pin how many queries each page and endpoint may issue.
+
+Every view is measured for a light user and for a heavy one (and the
+admin changelists before and after the data grows) against one budget,
+so a query that scales with rows, such as a per-row category load, fails
+here even when the behaviour tests in ``tests.py`` still pass.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import rollups
+from .models import Category, Transaction, UserSettings
+
+HEAVY_ROWS = 3000
+LIGHT_ROWS = 5
+OTHER_USERS = 10
+OTHER_ROWS = 50
+CATEGORIES = 40
+DAYS = 365
+NAMES = (
+    'Groceries', 'Coffee', 'Rent', 'Salary', 'Train', 'Dinner', 'Books',
+    'Electricity', 'Gym', 'Pharmacy', 'Taxi', 'Lunch',
+)
+
+# How many queries each view issues, whatever the size of the history.
+# Each count includes the session and user lookups; a cold cache adds the
+# settings and category reads. Lower a budget when a view gets cheaper.
+# Whether the cache is Redis or a database table depends on REDIS_URL, so
+# I keep the cache's own lookups out of the counts and measure only the
+# views' queries.
+BUDGETS = {
+    'dashboard': 8,
+    'transaction_list': 4,
+    'transaction_detail': 6,
+    'transaction_calendar_data': 4,
+    'transaction_search_results': 5,
+    'transaction_suggestions': 5,
+    'transaction_changelist': 4,
+    'category_changelist': 5,
+    'accountuser_changelist': 5,
+}
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+def seed_user(username, rows, categories, start=0):
+    """
+    Create a user with ``rows`` transactions over the year up to today.
+
+    The newest rows fall on today, so the current cycle, the dashboard
+    lists and this month's calendar all have something to show.
+    """
+
+    today = timezone.localdate()
+    user = User.objects.create_user(username=username, password='secret')
+    UserSettings.objects.create(
+        user=user,
+        currency_code='GBP',
+        cycle_start_date=today - timedelta(days=DAYS - 1),
+    )
+    with rollups.suspended():
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=user,
+                name=f'{NAMES[index % len(NAMES)]} {index % 7}',
+                type=(
+                    Transaction.INCOME if index % 9 == 0
+                    else Transaction.OUTGO
+                ),
+                category=categories[(start + index) % len(categories)],
+                amount_in_cents=100 + index * 13,
+                note='' if index % 4 else 'Shared',
+                occurred_on=today - timedelta(days=index % DAYS),
+            )
+            for index in range(rows)
+        ])
+    rollups.rebuild_user_rollups(user.pk)
+    return user
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class QueryBudgetTests(TestCase):
+    """I hold every view to a query budget that ignores history size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = [
+            Category.objects.create(name=f'Category {index:02}')
+            for index in range(CATEGORIES)
+        ]
+        cls.light = seed_user('light', LIGHT_ROWS, cls.categories)
+        cls.heavy = seed_user('heavy', HEAVY_ROWS, cls.categories)
+        for number in range(OTHER_USERS):
+            seed_user(
+                f'other{number}', OTHER_ROWS, cls.categories, start=number
+            )
+        cls.admin_user = User.objects.create_superuser(
+            username='admin',
+            password='secret',
+            email='admin@example.com',
+        )
+
+    def assertWithinBudget(self, name, url, params=None):
+        """Request ``url`` with a cold cache and hold it to its budget."""
+
+        cache.clear()
+        with self.assertNumQueries(BUDGETS[name]):
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def for_each_user(self, name, url, params=None):
+        """Hold both users to the budget; return their responses by name."""
+
+        responses = {}
+        for user in (self.light, self.heavy):
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                responses[user.username] = self.assertWithinBudget(
+                    name, url, params
+                )
+        return responses
+
+    def calendar_entries(self, response):
+        """Return a day's transactions or a month's days from the payload."""
+
+        body = response.json()
+        return body['transactions'] if 'transactions' in body else body['days']
+
+    def grow(self):
+        """Add another busy user and more categories to every table."""
+
+        extra = [
+            Category.objects.create(name=f'Extra {index:02}')
+            for index in range(CATEGORIES)
+        ]
+        seed_user('newcomer', HEAVY_ROWS // 3, extra)
+
+    def for_each_size(self, name, url, params=None):
+        self.client.force_login(self.admin_user)
+        with self.subTest(size='seeded'):
+            self.assertWithinBudget(name, url, params)
+        self.grow()
+        with self.subTest(size='grown'):
+            self.assertWithinBudget(name, url, params)
+
+    def test_dashboard(self):
+        responses = self.for_each_user('dashboard', reverse('dashboard'))
+        for username, response in responses.items():
+            with self.subTest(user=username):
+                self.assertTrue(response.context['transactions'])
+                self.assertTrue(response.context['top_expenses'])
+
+    def test_transaction_list(self):
+        self.for_each_user('transaction_list', reverse('transaction_list'))
+
+    def test_transaction_detail(self):
+        for user in (self.light, self.heavy):
+            newest = Transaction.objects.filter(user=user).latest('id')
+            with self.subTest(user=user.username):
+                self.client.force_login(user)
+                self.assertWithinBudget(
+                    'transaction_detail',
+                    reverse('transaction_detail', args=[newest.pk]),
+                )
+
+    def test_transaction_calendar_data(self):
+        url = reverse('transaction_calendar_data')
+        today = timezone.localdate()
+        for params in (
+            {'date': today.isoformat()},
+            {'year': str(today.year), 'month': str(today.month)},
+        ):
+            with self.subTest(**params):
+                responses = self.for_each_user(
+                    'transaction_calendar_data', url, params
+                )
+                for username, response in responses.items():
+                    with self.subTest(user=username):
+                        self.assertTrue(self.calendar_entries(response))
+
+    def test_transaction_search_results(self):
+        self.for_each_user(
+            'transaction_search_results',
+            reverse('transaction_search_results'),
+            {'q': 'groceries'},
+        )
+
+    def test_transaction_suggestions(self):
+        self.for_each_user(
+            'transaction_suggestions',
+            reverse('transaction_suggestions'),
+            {'q': 'Gro'},
+        )
+
+    def test_transaction_changelist(self):
+        self.for_each_size(
+            'transaction_changelist',
+            reverse('ledgerly_admin:expenses_transaction_changelist'),
+        )
+
+    def test_category_changelist(self):
+        self.for_each_size(
+            'category_changelist',
+            reverse('ledgerly_admin:expenses_category_changelist'),
+        )
+
+    def test_accountuser_changelist(self):
+        self.for_each_size(
+            'accountuser_changelist',
+            reverse('ledgerly_admin:expenses_accountuser_changelist'),
+        )
@@ -1,18 +1,66 @@
 """I cover regression tests for Ledgerly's transaction flows."""
 
-from datetime import date
+import gzip
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from html.parser import HTMLParser
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
-from .models import Category, Transaction, UserSettings
+from ledgerly import instrumentation
+
+from . import (
+    checks,
+    currencies,
+    duplicates,
+    jobs,
+    purges,
+    rollups,
+    search,
+)
+from .admin import AccountUserAdmin, CategoryAdmin
+from .caching import dashboard_cache_stats
+from .currencies import CURRENCY_CHOICES
+from .cycles import build_cycle_report, cycle_month_shift
+from .exports import export_blocks
+from .imports import ImportFileError, import_transactions
+from .models import (
+    Category,
+    CycleSummary,
+    DailyRollup,
+    Job,
+    Transaction,
+    TransactionName,
+    UserSettings,
+)
+from .pagination import PAGE_SIZE, keyset_page
+from .suggestions import suggest_names
+from .test_performance import LOCAL_CACHES
 
 
 class TransactionFlowTests(TestCase):
     """I exercise dashboard search, detail editing, and deletion flows."""
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser',
             password='super-secret',
@@ -166,7 +214,14 @@ class TransactionFlowTests(TestCase):
 
         days_by_date = {day['date']: day for day in data['days']}
         self.assertIn('2025-09-05', days_by_date)
-        self.assertEqual(len(days_by_date['2025-09-05']['transactions']), 2)
+        self.assertEqual(days_by_date['2025-09-05']['count'], 2)
+
+        day_response = self.client.get(
+            reverse('transaction_calendar_data'),
+            {'date': '2025-09-05'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(len(day_response.json()['transactions']), 2)
 
     def test_transaction_calendar_requires_login(self):
         """I expect anonymous users to be redirected to log in."""
@@ -208,6 +263,11 @@ class TransactionFlowTests(TestCase):
             response,
             'Transaction history cleared. Enjoy the fresh start!',
         )
+        # I hide the history at once and erase it in the background.
+        self.assertNotContains(
+            self.client.get(reverse('transaction_list')), 'Keep or not'
+        )
+        purges.run_pending()
         self.assertFalse(
             Transaction.objects.filter(user=self.user).exists()
         )
@@ -343,3 +403,2889 @@ class TransactionFlowTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertJSONEqual(response.content, {'html': '', 'count': 0})
+
+
+class CycleReportTests(TestCase):
+    """I check the grouped cycle report against the per-cycle loop."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cycler',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Bills')
+        start = date(2024, 1, 1)
+        for offset in range(0, 480, 3):
+            occurred_on = start + timedelta(days=offset)
+            Transaction.objects.create(
+                user=self.user,
+                name=f'Entry {offset}',
+                type=Transaction.OUTGO if offset % 2 else Transaction.INCOME,
+                amount_in_cents=1000 + offset * 7,
+                category=self.category if offset % 2 else None,
+                occurred_on=occurred_on,
+            )
+
+    def _legacy_series(self, today, cycle_day):
+        """Rebuild the series with the original one-query-per-cycle loop."""
+
+        transactions = Transaction.objects.filter(user=self.user)
+        candidate = cycle_month_shift(today, 0, cycle_day)
+        if candidate > today:
+            current_start = cycle_month_shift(today, -1, cycle_day)
+        else:
+            current_start = candidate
+        income_data = []
+        expense_data = []
+        for offset in range(11, -1, -1):
+            start = cycle_month_shift(current_start, -offset, cycle_day)
+            end = cycle_month_shift(start, 1, cycle_day)
+            totals = transactions.filter(
+                occurred_on__gte=start,
+                occurred_on__lt=end,
+            ).aggregate(
+                income_total=Sum('amount_in_cents', filter=Q(type='INCOME')),
+                expense_total=Sum('amount_in_cents', filter=Q(type='OUTGO')),
+            )
+            income_data.append(totals['income_total'] or 0)
+            expense_data.append(totals['expense_total'] or 0)
+        return current_start, income_data, expense_data
+
+    def test_report_matches_per_cycle_loop(self):
+        """I expect identical series for ordinary and month-end cycle days."""
+
+        transactions = Transaction.objects.filter(user=self.user)
+        for today, cycle_day in (
+            (date(2025, 3, 14), 1),
+            (date(2025, 3, 14), 15),
+            (date(2025, 3, 14), 31),
+            (date(2025, 2, 28), 30),
+        ):
+            with self.subTest(today=today, cycle_day=cycle_day):
+                current_start, income_data, expense_data = (
+                    self._legacy_series(today, cycle_day)
+                )
+                with self.assertNumQueries(2):
+                    report = build_cycle_report(
+                        transactions,
+                        today=today,
+                        cycle_day=cycle_day,
+                    )
+                self.assertEqual(report.current_start, current_start)
+                self.assertEqual(report.income_data, income_data)
+                self.assertEqual(report.expense_data, expense_data)
+                self.assertEqual(report.income, income_data[-1])
+                self.assertEqual(report.outgo, expense_data[-1])
+
+    def test_report_returns_largest_current_outgoings(self):
+        """I expect the top outgoings to come from the current cycle only."""
+
+        today = date(2025, 3, 14)
+        report = build_cycle_report(
+            Transaction.objects.filter(user=self.user),
+            today=today,
+            cycle_day=1,
+        )
+        expected = list(
+            Transaction.objects
+            .filter(
+                user=self.user,
+                type=Transaction.OUTGO,
+                occurred_on__gte=date(2025, 3, 1),
+                occurred_on__lt=date(2025, 4, 1),
+            )
+            .order_by('-amount_in_cents')
+            .values_list('pk', flat=True)[:3]
+        )
+        self.assertEqual([txn.pk for txn in report.top_expenses], expected)
+
+
+class CycleSummaryTests(TestCase):
+    """I make sure every write path keeps the cycle rollups accurate."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='roller',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Travel')
+        self.client.login(username='roller', password='super-secret')
+
+    def _summary_rows(self):
+        return list(
+            CycleSummary.objects
+            .filter(user=self.user)
+            .order_by('cycle_start')
+            .values_list(
+                'cycle_start', 'cycle_end', 'income_cents', 'outgo_cents',
+                'income_count', 'outgo_count',
+            )
+        )
+
+    def _daily_rows(self):
+        return list(
+            DailyRollup.objects
+            .filter(user=self.user)
+            .order_by('day', 'type', 'category_id')
+            .values_list('day', 'type', 'category_id', 'total_cents', 'count')
+        )
+
+    def _assert_matches_rebuild(self):
+        incremental = [
+            row for row in self._summary_rows() if row[4] or row[5]
+        ]
+        daily = self._daily_rows()
+        rollups.rebuild_user_rollups(self.user.pk)
+        self.assertEqual(incremental, self._summary_rows())
+        self.assertEqual(daily, self._daily_rows())
+
+    def test_dashboard_edit_and_delete_paths_keep_rollups_current(self):
+        """I expect create, edit and delete to adjust the rollups exactly."""
+
+        for day, amount in (('2025-09-03', '10.00'), ('2025-10-04', '7.25')):
+            self.client.post(reverse('dashboard'), {
+                'action': 'add_transaction',
+                'type': Transaction.OUTGO,
+                'category': self.category.pk,
+                'name': 'Train',
+                'amount_in_cents': amount,
+                'occurred_on': day,
+            })
+        self.client.post(reverse('dashboard'), {
+            'action': 'add_transaction',
+            'type': Transaction.INCOME,
+            'name': 'Salary',
+            'amount_in_cents': '2500.00',
+            'occurred_on': '2025-09-28',
+        })
+        self._assert_matches_rebuild()
+
+        moved = Transaction.objects.get(
+            user=self.user,
+            occurred_on='2025-09-03',
+        )
+        self.client.post(
+            reverse('transaction_detail', args=[moved.pk]),
+            {
+                'name': 'Train',
+                'type': Transaction.OUTGO,
+                'amount_in_cents': '12.00',
+                'category': self.category.pk,
+                'occurred_on': '2025-11-02',
+                'note': '',
+            },
+        )
+        self._assert_matches_rebuild()
+
+        self.client.post(reverse('transaction_delete', args=[moved.pk]))
+        self._assert_matches_rebuild()
+        summary = CycleSummary.objects.get(
+            user=self.user,
+            cycle_start=date(2025, 9, 1),
+        )
+        self.assertEqual(summary.income_cents, 250000)
+        self.assertEqual(summary.balance_cents, 250000)
+
+    def test_cycle_start_change_rebuilds_rollups(self):
+        """I expect a new cycle anchor day to re-bucket the history."""
+
+        Transaction.objects.create(
+            user=self.user,
+            name='Rent',
+            type=Transaction.OUTGO,
+            amount_in_cents=90000,
+            category=self.category,
+            occurred_on=date(2025, 9, 10),
+        )
+        self.client.post(reverse('dashboard'), {
+            'action': 'update_cycle_start',
+            'cycle_start_date': '2025-09-15',
+        })
+        self.assertEqual(
+            self._summary_rows(),
+            [(date(2025, 8, 15), date(2025, 9, 15), 0, 90000, 0, 1)],
+        )
+
+    def test_clear_history_drops_rollups(self):
+        """I expect clearing history to remove the user's rollups too."""
+
+        Transaction.objects.create(
+            user=self.user,
+            name='Snack',
+            type=Transaction.OUTGO,
+            amount_in_cents=300,
+            category=self.category,
+            occurred_on=date(2025, 9, 10),
+        )
+        self.client.post(reverse('account_clear_history'))
+        self.assertEqual(self._summary_rows(), [])
+
+    def test_admin_edits_keep_rollups_current(self):
+        """I expect admin saves to go through the same upkeep."""
+
+        User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        txn = Transaction.objects.create(
+            user=self.user,
+            name='Hotel',
+            type=Transaction.OUTGO,
+            amount_in_cents=40000,
+            category=self.category,
+            occurred_on=date(2025, 9, 10),
+        )
+        self.client.login(username='boss', password='super-secret')
+        response = self.client.post(
+            reverse('ledgerly_admin:expenses_transaction_change',
+                    args=[txn.pk]),
+            {
+                'user': self.user.pk,
+                'name': 'Hotel',
+                'type': Transaction.OUTGO,
+                'formatted_amount': '450.00',
+                'category': self.category.pk,
+                'occurred_on': '2025-09-11',
+                'note': '',
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self._assert_matches_rebuild()
+        self.assertEqual(self._summary_rows()[0][3], 45000)
+
+
+class DailyRollupTests(TestCase):
+    """I cover the daily rollups that back the calendar summaries."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='daily',
+            password='super-secret',
+        )
+        self.food = Category.objects.create(name='Food')
+        self.fuel = Category.objects.create(name='Fuel')
+        for day, name, amount, category in (
+            (5, 'Lunch', 1200, self.food),
+            (5, 'Dinner', 2400, self.food),
+            (5, 'Petrol', 5000, self.fuel),
+            (9, 'Breakfast', 800, self.food),
+        ):
+            Transaction.objects.create(
+                user=self.user,
+                name=name,
+                type=Transaction.OUTGO,
+                amount_in_cents=amount,
+                category=category,
+                occurred_on=date(2025, 9, day),
+            )
+        Transaction.objects.create(
+            user=self.user,
+            name='Salary',
+            type=Transaction.INCOME,
+            amount_in_cents=300000,
+            occurred_on=date(2025, 9, 1),
+        )
+        self.client.login(username='daily', password='super-secret')
+
+    def test_month_summary_comes_from_rollups(self):
+        """I expect month summaries without reading the transactions table."""
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('transaction_calendar_data'),
+                {'year': '2025', 'month': '9'},
+            )
+        self.assertFalse(any(
+            'FROM "expenses_transaction"' in query['sql']
+            for query in queries.captured_queries
+        ))
+        data = response.json()
+        days = {day['date']: day for day in data['days']}
+        self.assertEqual(days['2025-09-05']['count'], 3)
+        self.assertEqual(days['2025-09-05']['outgo_cents'], 8600)
+        self.assertEqual(days['2025-09-01']['income_cents'], 300000)
+        self.assertEqual(
+            [
+                (item['name'], item['outgo_cents'])
+                for item in data['categories']
+            ],
+            [('Fuel', 5000), ('Food', 4400)],
+        )
+        self.assertEqual(data['totals']['count'], 5)
+
+    def test_year_summary_reports_heatmap_and_months(self):
+        """I expect the year summary to roll days up into months."""
+
+        response = self.client.get(
+            reverse('transaction_year_summary'),
+            {'year': '2025'},
+        )
+        data = response.json()
+        self.assertEqual(len(data['days']), 3)
+        september = data['months'][8]
+        self.assertEqual(september['outgo_cents'], 9400)
+        self.assertEqual(september['count'], 5)
+
+    def test_deleting_a_category_rebuckets_rollups(self):
+        """I expect a removed category's spend to become uncategorised."""
+
+        self.fuel.delete()
+        self.assertEqual(
+            DailyRollup.objects.get(
+                user=self.user,
+                day=date(2025, 9, 5),
+                category__isnull=True,
+            ).total_cents,
+            5000,
+        )
+
+    def test_category_deletes_merge_rollups_without_reading_history(self):
+        """I expect a delete to fold rows into existing uncategorised days."""
+
+        Transaction.objects.create(
+            user=self.user,
+            name='Parking',
+            type=Transaction.OUTGO,
+            amount_in_cents=300,
+            occurred_on=date(2025, 9, 5),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.food.delete()
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT')
+            and 'FROM "expenses_transaction"' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+        def snapshot():
+            return list(
+                DailyRollup.objects.filter(user=self.user)
+                .order_by('day', 'type', 'category_id')
+                .values_list(
+                    'day', 'type', 'category_id', 'total_cents', 'count'
+                )
+            )
+
+        moved = snapshot()
+        rollups.rebuild_daily_rollups(self.user.pk)
+        self.assertEqual(moved, snapshot())
+        self.assertIn((date(2025, 9, 5), 'OUTGO', None, 3900, 3), moved)
+
+    def test_rebuild_command_restores_rollups(self):
+        """I expect the management command to rebuild wiped rollups."""
+
+        expected = sorted(
+            DailyRollup.objects.values_list('day', 'category_id', 'count')
+        )
+        DailyRollup.objects.all().delete()
+        call_command('rebuild_rollups', user='daily', stdout=StringIO())
+        self.assertEqual(
+            sorted(
+                DailyRollup.objects.values_list('day', 'category_id', 'count')
+            ),
+            expected,
+        )
+
+
+class DashboardCacheTests(TestCase):
+    """I cover the versioned per-user dashboard cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cached',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Books')
+        self.client.login(username='cached', password='super-secret')
+
+    def test_repeat_loads_skip_transaction_queries(self):
+        """I expect a warm dashboard to avoid every transaction query."""
+
+        self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('expenses_transaction', tables)
+        self.assertNotIn('expenses_cyclesummary', tables)
+        self.assertNotIn('expenses_category', tables)
+
+    @override_settings(CACHES=LOCAL_CACHES)
+    def test_atomic_caches_count_hits_and_misses(self):
+        """I expect a cache with atomic increments to keep the counters."""
+
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('dashboard'))
+        stats = dashboard_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_writes_invalidate_the_cached_dashboard(self):
+        """I expect new transactions to show up straight after saving."""
+
+        self.client.get(reverse('dashboard'))
+        self.client.post(reverse('dashboard'), {
+            'action': 'add_transaction',
+            'type': Transaction.OUTGO,
+            'category': self.category.pk,
+            'name': 'Novel',
+            'amount_in_cents': '9.99',
+            'occurred_on': timezone.localdate().isoformat(),
+        })
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Novel')
+
+    def test_settings_changes_invalidate_the_cached_dashboard(self):
+        """I expect a currency change to re-render amounts."""
+
+        Transaction.objects.create(
+            user=self.user,
+            name='Atlas',
+            type=Transaction.OUTGO,
+            amount_in_cents=1250,
+            category=self.category,
+            occurred_on=timezone.localdate(),
+        )
+        self.assertContains(self.client.get(reverse('dashboard')), '$12.50')
+        settings_obj = UserSettings.objects.get(user=self.user)
+        settings_obj.currency_code = 'GBP'
+        settings_obj.save()
+        self.assertContains(self.client.get(reverse('dashboard')), '£12.50')
+
+    def test_settings_save_keeps_the_latest_data_version(self):
+        """I expect a stale settings object not to roll the version back."""
+
+        settings_obj, _ = UserSettings.objects.get_or_create(user=self.user)
+        Transaction.objects.create(
+            user=self.user,
+            name='Atlas',
+            type=Transaction.INCOME,
+            amount_in_cents=1250,
+            occurred_on=date(2025, 9, 1),
+        )
+        settings_obj.currency_code = 'EUR'
+        settings_obj.save()
+        settings_obj.refresh_from_db()
+        self.assertEqual(settings_obj.data_version, 1)
+
+    def test_category_renames_invalidate_every_cached_dashboard(self):
+        """I expect a renamed category to show up for every user."""
+
+        self.assertContains(self.client.get(reverse('dashboard')), 'Books')
+        self.category.name = 'Reading'
+        self.category.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Reading')
+        self.assertNotContains(response, 'Books')
+
+    def test_unchanged_category_saves_keep_cached_dashboards(self):
+        """I expect only real name or status changes to bump versions."""
+
+        settings_obj, _ = UserSettings.objects.get_or_create(user=self.user)
+        category = Category.objects.get(pk=self.category.pk)
+        category.save()
+        settings_obj.refresh_from_db()
+        self.assertEqual(settings_obj.data_version, 0)
+
+        category.is_active = False
+        category.save()
+        settings_obj.refresh_from_db()
+        self.assertEqual(settings_obj.data_version, 1)
+
+    def test_database_cache_hits_cost_one_lookup(self):
+        """I expect no counter reads or writes on the database cache."""
+
+        self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('dashboard'))
+        cache_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'ledgerly_cache' in query['sql']
+        ]
+        self.assertEqual(len(cache_queries), 1)
+        stats = dashboard_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 0))
+
+    def test_per_process_caches_fail_the_system_check(self):
+        """I expect a local-memory cache to be reported at startup."""
+
+        with override_settings(CACHES=LOCAL_CACHES):
+            self.assertEqual(
+                [message.id for message in checks.check_shared_cache(None)],
+                ['expenses.W001'],
+            )
+        self.assertEqual(checks.check_shared_cache(None), [])
+
+
+class QueryPlanTests(TestCase):
+    """I EXPLAIN the queries hot views issue and reject scans and sorts."""
+
+    # I allow a sort only where the window is already bounded by the index:
+    # the top outgoings of one cycle, the entries of a single day, the
+    # names sharing a suggestion prefix and the full-text matches to rank.
+    BOUNDED_SORTS = (
+        re.compile(r'ORDER BY "expenses_transaction"\."amount_in_cents" DESC'),
+        re.compile(
+            r'"occurred_on" = .*ORDER BY "expenses_transaction"\."name"'
+        ),
+        re.compile(r'ORDER BY "expenses_transactionname"\."use_count" DESC'),
+        re.compile(r'ORDER BY bm25\(expenses_transaction_fts'),
+    )
+    SMALL_TABLES = ('expenses_category',)
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [
+            Category.objects.create(name=f'Plan {index}')
+            for index in range(8)
+        ]
+        cls.user = User.objects.create_user(
+            username='planner',
+            password='super-secret',
+        )
+        users = [cls.user] + [
+            User.objects.create_user(username=f'other{index}')
+            for index in range(5)
+        ]
+        rows = []
+        for user in users:
+            for index in range(400):
+                outgo = index % 3 != 0
+                rows.append(Transaction(
+                    user=user,
+                    name=f'Entry {index}',
+                    type=Transaction.OUTGO if outgo else Transaction.INCOME,
+                    amount_in_cents=100 + index * 37,
+                    category=categories[index % 8] if outgo else None,
+                    occurred_on=date(2024, 1, 1) + timedelta(days=index * 2),
+                ))
+        Transaction.objects.bulk_create(rows)
+        for user in users:
+            rollups.rebuild_user_rollups(user.pk)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='planner', password='super-secret')
+
+    def _plan(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0].strip() for row in cursor.fetchall()]
+
+    def _problems(self, sql, plan):
+        problems = []
+        for step in plan:
+            scanned = re.match(r'(?:SCAN|Seq Scan on) "?(\w+)"?', step)
+            # A full-text table answers MATCH from its own index.
+            if scanned and 'VIRTUAL TABLE INDEX' in step and ':M' in step:
+                scanned = None
+            if scanned and scanned.group(1) not in self.SMALL_TABLES:
+                problems.append(step)
+            sorted_step = 'TEMP B-TREE' in step or re.match(r'Sort\b', step)
+            if sorted_step and not any(
+                pattern.search(sql) for pattern in self.BOUNDED_SORTS
+            ):
+                problems.append(step)
+        return problems
+
+    def _assert_view_plans(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        checked = 0
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or '"expenses_' not in sql:
+                continue
+            checked += 1
+            plan = self._plan(sql)
+            self.assertEqual(self._problems(sql, plan), [], msg=sql)
+        self.assertGreater(checked, 0)
+
+    def test_dashboard_queries_use_indexes(self):
+        self._assert_view_plans(reverse('dashboard'))
+
+    def test_transaction_list_queries_use_indexes(self):
+        self._assert_view_plans(reverse('transaction_list'))
+        self._assert_view_plans(
+            reverse('transaction_list_page'),
+            {'cursor': f'2024-06-01.{Transaction.objects.latest("pk").pk}'},
+        )
+
+    def test_calendar_queries_use_indexes(self):
+        self._assert_view_plans(
+            reverse('transaction_calendar_data'),
+            {'year': '2024', 'month': '3'},
+        )
+        self._assert_view_plans(
+            reverse('transaction_calendar_data'),
+            {'date': '2024-03-02'},
+        )
+
+    def test_suggestion_queries_use_indexes(self):
+        self._assert_view_plans(
+            reverse('transaction_suggestions'),
+            {'q': 'entry 1'},
+        )
+
+    def test_search_queries_use_indexes(self):
+        self._assert_view_plans(
+            reverse('transaction_search_results'),
+            {'q': 'entry 1'},
+        )
+
+
+class TransactionSearchTests(TestCase):
+    """I check the full-text search index and how it ranks matches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher')
+        self.other = User.objects.create_user(username='bystander')
+        self.category = Category.objects.create(name='Electronics')
+
+    def _add(self, user=None, **fields):
+        values = {
+            'user': user or self.user,
+            'name': 'Entry',
+            'type': Transaction.OUTGO,
+            'amount_in_cents': 1000,
+            'occurred_on': date(2025, 9, 1),
+        }
+        values.update(fields)
+        return Transaction.objects.create(**values)
+
+    def _names(self, query, **kwargs):
+        return [
+            txn.name
+            for txn in search.search_transactions(self.user, query, **kwargs)
+        ]
+
+    def test_prefixes_of_every_word_must_match(self):
+        """I expect each word to match the start of some indexed word."""
+
+        self._add(name='Laptop Purchase', note='Work device')
+        self._add(name='Laptop Sleeve')
+
+        self.assertEqual(self._names('lap pur'), ['Laptop Purchase'])
+        self.assertEqual(len(self._names('LAPTOP')), 2)
+        self.assertEqual(self._names('work dev'), ['Laptop Purchase'])
+        self.assertEqual(self._names('!!!'), [])
+
+    def test_name_matches_rank_above_note_matches(self):
+        """I expect a hit in the name to outrank a hit in the note."""
+
+        self._add(name='Dinner', note='Paid for the coffee too')
+        self._add(name='Coffee beans', occurred_on=date(2024, 1, 1))
+
+        self.assertEqual(self._names('coffee'), ['Coffee beans', 'Dinner'])
+
+    def test_results_stay_scoped_and_limited(self):
+        """I expect other users' rows to stay hidden and the limit held."""
+
+        for index in range(5):
+            self._add(name=f'Groceries {index}')
+        self._add(user=self.other, name='Groceries elsewhere')
+
+        names = self._names('groceries', limit=3)
+
+        self.assertEqual(len(names), 3)
+        self.assertNotIn('Groceries elsewhere', names)
+
+    def test_index_follows_edits_deletes_and_category_renames(self):
+        """I expect the index to stay in step with every kind of write."""
+
+        txn = self._add(name='Monitor', category=self.category)
+        self.assertEqual(self._names('electro'), ['Monitor'])
+
+        self.category.name = 'Hardware'
+        self.category.save()
+        self.assertEqual(self._names('electro'), [])
+        self.assertEqual(self._names('hardw'), ['Monitor'])
+
+        txn.name = 'Keyboard'
+        txn.save()
+        self.assertEqual(self._names('monitor'), [])
+        self.assertEqual(self._names('keyb'), ['Keyboard'])
+
+        Transaction.objects.filter(pk=txn.pk).update(type=Transaction.INCOME)
+        self.assertEqual(self._names('income'), ['Keyboard'])
+
+        self.category.delete()
+        self.assertEqual(self._names('hardw'), [])
+
+        txn.delete()
+        self.assertEqual(self._names('keyb'), [])
+
+    def test_type_is_searchable(self):
+        """I expect the transaction type to stay searchable as before."""
+
+        self._add(name='Salary', type=Transaction.INCOME)
+        self._add(name='Rent')
+
+        self.assertEqual(self._names('inc'), ['Salary'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite progress handler')
+    def test_slow_search_gives_up_empty(self):
+        """I expect a search that runs out of time to come back empty."""
+
+        self._add(name='Laptop Purchase')
+
+        with override_settings(LEDGERLY_SEARCH_TIMEOUT_MS=0), patch.object(
+            search.SqliteFtsSearchBackend, 'PROGRESS_STEPS', 1
+        ), self.assertLogs('expenses.search', 'WARNING'):
+            self.assertEqual(self._names('laptop'), [])
+        self.assertEqual(self._names('laptop'), ['Laptop Purchase'])
+
+    @override_settings(
+        LEDGERLY_SEARCH_BACKEND='expenses.search.LikeSearchBackend'
+    )
+    def test_configured_backend_overrides_the_default(self):
+        """I expect the setting to swap in the plain ``icontains`` backend."""
+
+        self._add(name='Laptop Purchase', category=self.category)
+
+        self.assertIsInstance(search.get_backend(), search.LikeSearchBackend)
+        self.assertEqual(self._names('top ctro'), ['Laptop Purchase'])
+
+    def test_backends_must_implement_both_lookups(self):
+        """I expect a backend missing a lookup to fail when built."""
+
+        class RankOnly(search.SearchBackend):
+            def search_ids(self, user_id, terms, limit):
+                return []
+
+        with self.assertRaises(TypeError):
+            RankOnly(250)
+
+
+class TransactionNameTests(TestCase):
+    """I check the per-user name counts behind the suggestions."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='namer',
+            password='super-secret',
+        )
+        self.other = User.objects.create_user(username='stranger')
+
+    def _add(self, name, day=date(2025, 9, 1), user=None):
+        return Transaction.objects.create(
+            user=user or self.user,
+            name=name,
+            type=Transaction.OUTGO,
+            amount_in_cents=500,
+            occurred_on=day,
+        )
+
+    def _rows(self):
+        return list(
+            TransactionName.objects
+            .filter(user=self.user)
+            .order_by('normalized')
+            .values_list('name', 'normalized', 'use_count', 'last_used_on')
+        )
+
+    def _assert_matches_rebuild(self):
+        incremental = self._rows()
+        rollups.rebuild_transaction_names(self.user.pk)
+        self.assertEqual(incremental, self._rows())
+
+    def test_counts_follow_inserts_renames_and_deletes(self):
+        """I expect every write to keep the name counts exact."""
+
+        first = self._add('Coffee', date(2025, 9, 1))
+        self._add('coffee ', date(2025, 9, 3))
+        third = self._add('Tea', date(2025, 9, 2))
+        self.assertEqual(self._rows(), [
+            ('coffee', 'coffee', 2, date(2025, 9, 3)),
+            ('Tea', 'tea', 1, date(2025, 9, 2)),
+        ])
+
+        third.name = 'Coffee'
+        third.save()
+        first.delete()
+        self.assertEqual(self._rows(), [
+            ('coffee', 'coffee', 2, date(2025, 9, 3)),
+        ])
+        self._assert_matches_rebuild()
+
+    def test_recency_steps_back_when_the_latest_use_goes(self):
+        """I expect deleting the latest use to restore the previous date."""
+
+        self._add('Rent', date(2025, 8, 1))
+        latest = self._add('Rent', date(2025, 9, 1))
+
+        latest.occurred_on = date(2025, 7, 1)
+        latest.save()
+        self.assertEqual(self._rows()[0][3], date(2025, 8, 1))
+
+        latest.delete()
+        self.assertEqual(self._rows(), [('Rent', 'rent', 1, date(2025, 8, 1))])
+        self._assert_matches_rebuild()
+
+    def test_recency_matches_spellings_like_normalize(self):
+        """I expect padded and non-ASCII case variants to count as one."""
+
+        self._add(' Café ', date(2025, 8, 1))
+        latest = self._add('CAFÉ', date(2025, 9, 1))
+
+        latest.delete()
+        self.assertEqual(self._rows()[0][2:], (1, date(2025, 8, 1)))
+        self._assert_matches_rebuild()
+
+    def test_amount_edits_leave_names_alone(self):
+        """I expect an edit that keeps the name to skip the name table."""
+
+        txn = self._add('Lunch')
+        txn = Transaction.objects.get(pk=txn.pk)
+        txn.amount_in_cents = 900
+        with CaptureQueriesContext(connection) as queries:
+            txn.save()
+        self.assertFalse(any(
+            'expenses_transactionname' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_suggestions_rank_by_use_then_recency(self):
+        """I expect frequent names first and recent names breaking ties."""
+
+        self._add('Bakery', date(2025, 9, 1))
+        self._add('Bakery', date(2025, 9, 2))
+        self._add('Bank transfer', date(2025, 9, 5))
+        self._add('Bar tab', date(2025, 9, 4))
+        self._add('Barber', user=self.other)
+        self._add('Cinema')
+
+        self.assertEqual(
+            suggest_names(self.user, 'BA'),
+            ['Bakery', 'Bank transfer', 'Bar tab'],
+        )
+        self.assertEqual(suggest_names(self.user, 'bar'), ['Bar tab'])
+        self.assertEqual(suggest_names(self.user, '  '), [])
+
+    def test_suggestions_cost_one_query_regardless_of_history(self):
+        """I expect one indexed lookup however long the history is."""
+
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                name=f'Groceries {index % 20}',
+                type=Transaction.OUTGO,
+                amount_in_cents=100,
+                occurred_on=date(2025, 1, 1) + timedelta(days=index % 300),
+            )
+            for index in range(2000)
+        ])
+        rollups.rebuild_transaction_names(self.user.pk)
+
+        with self.assertNumQueries(1):
+            names = suggest_names(self.user, 'groc')
+        self.assertEqual(len(names), 10)
+
+    def test_endpoint_merges_names_and_categories(self):
+        """I expect name suggestions followed by matching categories."""
+
+        Category.objects.create(name='Garden')
+        self._add('Garage rent')
+        self.client.login(username='namer', password='super-secret')
+
+        response = self.client.get(
+            reverse('transaction_suggestions'),
+            {'q': 'gar'},
+        )
+
+        self.assertEqual(
+            response.json(),
+            {'suggestions': ['Garage rent', 'Garden']},
+        )
+
+
+class TransactionHistoryPaginationTests(TestCase):
+    """I check the keyset-paged history and its scroll endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='scroller',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Travel')
+        other = User.objects.create_user(username='elsewhere')
+        rows = []
+        for index in range(120):
+            rows.append(Transaction(
+                user=self.user,
+                name=f'Ticket {index}',
+                type=Transaction.OUTGO,
+                amount_in_cents=100 + index,
+                category=self.category,
+                # I put several rows on each day to exercise id tie-breaks.
+                occurred_on=date(2025, 1, 1) + timedelta(days=index // 7),
+            ))
+        rows.append(Transaction(
+            user=other,
+            name='Not mine',
+            type=Transaction.INCOME,
+            amount_in_cents=1,
+            occurred_on=date(2025, 3, 1),
+        ))
+        Transaction.objects.bulk_create(rows)
+        self.client.login(username='scroller', password='super-secret')
+
+    def _expected_ids(self):
+        return list(
+            Transaction.objects
+            .filter(user=self.user)
+            .order_by('-occurred_on', '-id')
+            .values_list('id', flat=True)
+        )
+
+    def test_pages_cover_history_once_in_order(self):
+        """I expect the cursors to walk every row with no gaps or repeats."""
+
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_page(
+                Transaction.objects.filter(user=self.user),
+                cursor,
+                size=25,
+            )
+            seen.extend(txn.pk for txn in page.transactions)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, self._expected_ids())
+
+    def test_every_page_costs_the_same_queries(self):
+        """I expect one query per page however deep the cursor goes."""
+
+        queryset = Transaction.objects.filter(user=self.user)
+        page = keyset_page(queryset, size=10)
+        for _ in range(5):
+            with self.assertNumQueries(1):
+                page = keyset_page(queryset, page.next_cursor, size=10)
+                for txn in page.transactions:
+                    str(txn.category)
+
+    def test_list_renders_first_page_and_next_cursor(self):
+        """I expect the page to show the newest rows and a way onwards."""
+
+        response = self.client.get(reverse('transaction_list'))
+
+        self.assertEqual(len(response.context['transactions']), PAGE_SIZE)
+        self.assertEqual(
+            [txn.pk for txn in response.context['transactions']],
+            self._expected_ids()[:PAGE_SIZE],
+        )
+        self.assertContains(response, 'data-cursor="')
+        self.assertNotContains(response, 'Not mine')
+
+    def test_page_endpoint_returns_following_rows(self):
+        """I expect the fragment endpoint to continue from the cursor."""
+
+        first = self.client.get(reverse('transaction_list'))
+        cursor = first.context['next_cursor']
+
+        second = self.client.get(
+            reverse('transaction_list_page'),
+            {'cursor': cursor},
+        ).json()
+        third = self.client.get(
+            reverse('transaction_list_page'),
+            {'cursor': second['next_cursor']},
+        ).json()
+
+        self.assertEqual(second['count'], PAGE_SIZE)
+        self.assertIn('Ticket', second['html'])
+        self.assertEqual(third['count'], 120 - 2 * PAGE_SIZE)
+        self.assertIsNone(third['next_cursor'])
+
+    def test_bad_cursor_is_rejected(self):
+        """I expect a malformed cursor to answer 400 rather than crash."""
+
+        for url in ('transaction_list', 'transaction_list_page'):
+            response = self.client.get(reverse(url), {'cursor': 'nonsense'})
+            self.assertEqual(response.status_code, 400)
+
+
+class TransactionExportTests(TestCase):
+    """I check the streaming CSV and NDJSON exports."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='exporter',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        self.category = Category.objects.create(name='Books')
+        Transaction.objects.create(
+            user=self.user,
+            name='Novel, "signed"',
+            type=Transaction.OUTGO,
+            amount_in_cents=1205,
+            category=self.category,
+            occurred_on=date(2025, 9, 2),
+            note='Café',
+        )
+        Transaction.objects.create(
+            user=self.user,
+            name='Wages',
+            type=Transaction.INCOME,
+            amount_in_cents=250000,
+            category=self.category,
+            occurred_on=date(2025, 9, 1),
+        )
+        Transaction.objects.create(
+            user=User.objects.create_user(username='someone'),
+            name='Hidden',
+            type=Transaction.INCOME,
+            amount_in_cents=1,
+            occurred_on=date(2025, 9, 1),
+        )
+        self.client.login(username='exporter', password='super-secret')
+
+    def _download(self, params=None, **headers):
+        response = self.client.get(
+            reverse('transaction_export'),
+            params or {},
+            **headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_streams_quoted_rows_oldest_first(self):
+        """I expect a header and one properly quoted line per row."""
+
+        response, body = self._download()
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        self.assertEqual(body.decode('utf-8').splitlines(), [
+            'date,name,type,amount,currency,category,note',
+            '2025-09-01,Wages,INCOME,2500.00,GBP,,',
+            '2025-09-02,"Novel, ""signed""",OUTGO,12.05,GBP,Books,Café',
+        ])
+
+    def test_ndjson_export_applies_filters(self):
+        """I expect one JSON object per line restricted by the filters."""
+
+        _, body = self._download({
+            'format': 'ndjson',
+            'start': '2025-09-02',
+            'type': Transaction.OUTGO,
+            'category': self.category.pk,
+        })
+
+        lines = body.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['amount'], '12.05')
+
+    def test_export_is_gzipped_when_the_client_accepts_it(self):
+        """I expect on-the-fly gzip for clients that ask for it."""
+
+        response, body = self._download(HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'Wages', gzip.decompress(body))
+
+    def test_invalid_filters_are_rejected(self):
+        """I expect bad filters to return the form errors."""
+
+        response = self.client.get(reverse('transaction_export'), {
+            'start': '2025-09-05',
+            'end': '2025-09-01',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end', response.json()['errors'])
+
+    def test_export_blocks_batch_many_rows(self):
+        """I expect large exports to arrive in a few sizeable blocks."""
+
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                name=f'Bulk {index}',
+                type=Transaction.OUTGO,
+                amount_in_cents=index,
+                category=self.category,
+                occurred_on=date(2025, 1, 1),
+            )
+            for index in range(5000)
+        ])
+
+        blocks = list(export_blocks(self.user, 'GBP', {'format': 'csv'}))
+
+        self.assertLess(len(blocks), 10)
+        self.assertEqual(b''.join(blocks).count(b'\n'), 5003)
+
+    def test_command_writes_csv_and_gzip(self):
+        """I expect the command to export to stdout or a gzipped file."""
+
+        out = StringIO()
+        call_command('export_transactions', 'exporter', stdout=out)
+        self.assertIn('Wages,INCOME,2500.00', out.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson.gz')
+            call_command(
+                'export_transactions',
+                'exporter',
+                format='ndjson',
+                output=path,
+                stderr=StringIO(),
+            )
+            with gzip.open(path, 'rt', encoding='utf-8') as handle:
+                self.assertEqual(len(handle.readlines()), 2)
+
+
+class TransactionImportTests(TestCase):
+    """I check the batched CSV import and its row-level error reports."""
+
+    HEADER = 'date,name,type,amount,currency,category,note\n'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='importer',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Groceries')
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+
+    def _import(self, body, **kwargs):
+        return import_transactions(
+            self.user,
+            StringIO(self.HEADER + body),
+            **kwargs,
+        )
+
+    def test_valid_rows_are_inserted_in_batches(self):
+        """I expect every valid row saved with the dashboard's cleaning."""
+
+        body = ''.join(
+            f'2025-09-{day:02d},weekly shop,OUTGO,{day}.50,GBP,'
+            f'groceries,Note {day}\n'
+            for day in range(1, 8)
+        ) + '2025-09-30,salary,INCOME,2000,,Groceries,\n'
+
+        result = self._import(body, batch_size=3)
+
+        self.assertEqual((result.created, result.failed), (8, 0))
+        shop = Transaction.objects.filter(user=self.user).first()
+        self.assertEqual(shop.name, 'Weekly Shop')
+        self.assertEqual(shop.category, self.category)
+        salary = Transaction.objects.get(user=self.user, type='INCOME')
+        self.assertIsNone(salary.category_id)
+        self.assertEqual(salary.amount_in_cents, 200000)
+
+    def test_batches_insert_through_bulk_create(self):
+        """I expect one INSERT per batch with the model defaults filled."""
+
+        body = ''.join(
+            f'2025-09-{day:02d},Bakery,OUTGO,1.{day:02d},,Groceries,\n'
+            for day in range(1, 6)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self._import(body, batch_size=2)
+        inserts = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('INSERT INTO "expenses_transaction"')
+        ]
+        self.assertEqual(len(inserts), 3)
+        rows = Transaction.objects.filter(user=self.user)
+        self.assertEqual(rows.filter(created_at__isnull=True).count(), 0)
+        self.assertEqual(rows.filter(fingerprint='').count(), 0)
+
+    def test_rollups_names_and_search_follow_an_import(self):
+        """I expect derived data to match a rebuild once the import ends."""
+
+        settings_obj = UserSettings.objects.get(user=self.user)
+        self._import(
+            '2025-09-01,Bakery,OUTGO,3.20,,Groceries,\n'
+            '2025-09-02,Bakery,OUTGO,2.80,,Groceries,\n'
+        )
+
+        cycles = list(CycleSummary.objects.filter(user=self.user).values_list(
+            'cycle_start', 'outgo_cents', 'outgo_count'
+        ))
+        self.assertEqual(cycles, [(date(2025, 9, 1), 600, 2)])
+        self.assertEqual(suggest_names(self.user, 'bak'), ['Bakery'])
+        self.assertEqual(
+            len(search.search_transactions(self.user, 'bakery')), 2
+        )
+        settings_obj.refresh_from_db()
+        self.assertEqual(settings_obj.data_version, 1)
+
+    def test_bad_rows_are_reported_by_line(self):
+        """I expect invalid rows skipped and reported with their line."""
+
+        result = self._import(
+            '2025-09-01,Good,OUTGO,1.00,GBP,Groceries,\n'
+            '2025-09-01,No category,OUTGO,1.00,GBP,,\n'
+            '2025-09-01,Unknown,OUTGO,1.00,GBP,Toys,\n'
+            '2025-13-01,Bad date,INCOME,1.00,GBP,,\n'
+            '2025-09-01,Bad amount,INCOME,abc,GBP,,\n'
+            '2025-09-01,Zero,INCOME,0,GBP,,\n'
+            '2025-09-01,Huge,INCOME,99999999999999999,GBP,,\n'
+            '2025-09-01,Dollars,INCOME,5.00,USD,,\n'
+            '2025-09-01,,INCOME,5.00,GBP,,\n'
+        )
+
+        self.assertEqual((result.created, result.failed), (1, 8))
+        self.assertEqual(
+            [error.line for error in result.errors],
+            [3, 4, 5, 6, 7, 8, 9, 10],
+        )
+        self.assertIn('require a category', result.errors[0].message)
+        self.assertIn('Unknown category', result.errors[1].message)
+        self.assertIn('too large', result.errors[5].message)
+        self.assertIn('USD', result.errors[6].message)
+
+    def test_missing_columns_and_dry_runs(self):
+        """I expect bad headers refused and dry runs to save nothing."""
+
+        with self.assertRaises(ImportFileError):
+            import_transactions(self.user, StringIO('when,what\n1,2\n'))
+
+        result = self._import(
+            '2025-09-01,Good,OUTGO,1.00,GBP,Groceries,\n',
+            dry_run=True,
+        )
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_exports_import_back_unchanged(self):
+        """I expect a Ledgerly export to import into another account."""
+
+        self._import(
+            '2025-09-01,"Tea, ""green""",OUTGO,4.10,GBP,Groceries,Café\n'
+            '2025-09-03,Wages,INCOME,1500.00,GBP,,\n'
+        )
+        exported = b''.join(
+            export_blocks(self.user, 'GBP', {'format': 'csv'})
+        ).decode('utf-8')
+        twin = User.objects.create_user(username='twin')
+        UserSettings.objects.create(user=twin, currency_code='GBP')
+
+        result = import_transactions(twin, StringIO(exported))
+
+        columns = ('occurred_on', 'name', 'type', 'amount_in_cents',
+                   'category_id', 'note')
+        self.assertEqual(result.failed, 0)
+        self.assertEqual(
+            list(twin.transactions.order_by('pk').values_list(*columns)),
+            list(self.user.transactions.order_by('pk').values_list(*columns)),
+        )
+
+    def test_upload_view_and_command(self):
+        """I expect both entry points to import and report errors."""
+
+        self.client.login(username='importer', password='super-secret')
+        upload = SimpleUploadedFile(
+            'history.csv',
+            (self.HEADER + '2025-09-01,Milk,OUTGO,1.10,GBP,Groceries,\n'
+             '2025-09-01,Broken,OUTGO,x,GBP,Groceries,\n').encode('utf-8'),
+            content_type='text/csv',
+        )
+        response = self.client.post(
+            reverse('transaction_import'),
+            {'file': upload},
+        )
+        self.assertContains(response, 'Imported 1 transaction(s).')
+        self.assertContains(response, 'Amount must be a number')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'history.csv.gz')
+            with gzip.open(path, 'wt', encoding='utf-8') as handle:
+                handle.write(self.HEADER + '2025-09-02,Eggs,OUTGO,2,,'
+                             'Groceries,\n')
+            out = StringIO()
+            call_command(
+                'import_transactions', 'importer', path,
+                batch_size=10, stdout=out, stderr=StringIO(),
+            )
+        self.assertIn('Imported 1 transaction(s); 0 row(s) failed.',
+                      out.getvalue())
+        self.assertEqual(self.user.transactions.count(), 2)
+
+
+class DuplicateDetectionTests(TestCase):
+    """I check fingerprint-based duplicate handling on every entry path."""
+
+    HEADER = 'date,name,type,amount,currency,category,note\n'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='twice',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        self.category = Category.objects.create(name='Groceries')
+        self.client.login(username='twice', password='super-secret')
+
+    def _quick_add(self, **overrides):
+        data = {
+            'type': 'OUTGO',
+            'category': str(self.category.pk),
+            'name': 'corner shop',
+            'occurred_on': '2025-09-01',
+            'amount_in_cents': '4.20',
+            'note': '',
+            **overrides,
+        }
+        return self.client.post(reverse('dashboard'), data, follow=True)
+
+    def test_fingerprint_ignores_case_and_tracks_edits(self):
+        """I expect the same entry to hash alike however it is typed."""
+
+        first = Transaction.objects.create(
+            user=self.user, name='Corner Shop', type='OUTGO',
+            category=self.category, amount_in_cents=420,
+            occurred_on=date(2025, 9, 1),
+        )
+        self.assertEqual(
+            first.fingerprint,
+            Transaction.fingerprint_for(
+                self.user.pk, date(2025, 9, 1), 420, 'OUTGO', ' corner SHOP '
+            ),
+        )
+        first.amount_in_cents = 421
+        first.save(update_fields=['amount_in_cents'])
+        first.refresh_from_db()
+        self.assertEqual(first.fingerprint, first.compute_fingerprint())
+        other = User.objects.create_user(username='someone-else')
+        self.assertNotEqual(
+            first.fingerprint,
+            Transaction.fingerprint_for(
+                other.pk, date(2025, 9, 1), 421, 'OUTGO', 'Corner Shop'
+            ),
+        )
+
+    def test_quick_add_policies(self):
+        """I expect flag, skip and merge to follow the setting."""
+
+        self._quick_add()
+        response = self._quick_add(note='receipt in drawer')
+        self.assertContains(response, 'possible duplicate')
+        original, repeat = self.user.transactions.order_by('pk')
+        self.assertEqual(repeat.duplicate_of, original)
+        self.assertIsNone(original.duplicate_of_id)
+
+        repeat.delete()
+        with override_settings(LEDGERLY_DUPLICATE_POLICY='skip'):
+            response = self._quick_add()
+        self.assertContains(response, 'was not saved again')
+        self.assertEqual(self.user.transactions.count(), 1)
+
+        with override_settings(LEDGERLY_DUPLICATE_POLICY='merge'):
+            self._quick_add(note='split with Sam')
+        original.refresh_from_db()
+        self.assertEqual(self.user.transactions.count(), 1)
+        self.assertEqual(original.note, 'split with Sam')
+        cycle = CycleSummary.objects.get(user=self.user)
+        self.assertEqual(cycle.outgo_cents, 420)
+
+    def test_edit_that_creates_a_repeat(self):
+        """I expect edits flagged, or refused under the skip policy."""
+
+        self._quick_add()
+        self._quick_add(amount_in_cents='5.00')
+        original, edited = self.user.transactions.order_by('pk')
+        url = reverse('transaction_detail', args=[edited.pk])
+        data = {
+            'name': 'Corner Shop',
+            'type': 'OUTGO',
+            'amount_in_cents': '4.20',
+            'category': str(self.category.pk),
+            'occurred_on': '2025-09-01',
+            'note': '',
+        }
+
+        with override_settings(LEDGERLY_DUPLICATE_POLICY='skip'):
+            response = self.client.post(url, data)
+        self.assertContains(response, 'You already have this transaction')
+        edited.refresh_from_db()
+        self.assertEqual(edited.amount_in_cents, 500)
+
+        self.client.post(url, data)
+        edited.refresh_from_db()
+        self.assertEqual(edited.duplicate_of, original)
+        response = self.client.get(reverse('transaction_list'))
+        self.assertContains(response, 'Possible duplicate', count=1)
+
+        self.client.post(url, {**data, 'amount_in_cents': '6.00'})
+        edited.refresh_from_db()
+        self.assertIsNone(edited.duplicate_of_id)
+
+    def test_reimporting_a_statement_adds_only_new_rows(self):
+        """I expect repeats counted so identical rows are not collapsed."""
+
+        statement = (
+            '2025-09-01,Coffee,OUTGO,3.00,GBP,Groceries,\n'
+            '2025-09-01,Coffee,OUTGO,3.00,GBP,Groceries,\n'
+            '2025-09-02,Bread,OUTGO,1.50,GBP,Groceries,\n'
+        )
+        first = import_transactions(
+            self.user, StringIO(self.HEADER + statement)
+        )
+        self.assertEqual((first.created, first.duplicates), (3, 0))
+
+        longer = statement + '2025-09-01,coffee,OUTGO,3.00,GBP,Groceries,\n'
+        again = import_transactions(
+            self.user, StringIO(self.HEADER + longer), batch_size=2
+        )
+        self.assertEqual((again.created, again.duplicates), (1, 3))
+        self.assertEqual(self.user.transactions.count(), 4)
+
+        flagged = import_transactions(
+            self.user,
+            StringIO(self.HEADER + statement),
+            duplicate_policy='flag',
+        )
+        self.assertEqual((flagged.created, flagged.duplicates), (3, 3))
+        self.assertEqual(
+            self.user.transactions.filter(
+                duplicate_of__isnull=False
+            ).count(),
+            3,
+        )
+
+        merged = import_transactions(
+            self.user,
+            StringIO(
+                self.HEADER + '2025-09-02,Bread,OUTGO,1.50,,Groceries,rye\n'
+            ),
+            duplicate_policy='merge',
+        )
+        self.assertEqual((merged.created, merged.duplicates), (0, 1))
+        bread = self.user.transactions.filter(name='Bread').first()
+        self.assertEqual(bread.note, 'rye')
+
+    def test_batch_lookup_is_one_indexed_query(self):
+        """I expect each import batch to check its repeats in one query."""
+
+        body = ''.join(
+            f'2025-09-{day:02d},Lunch,OUTGO,{day},GBP,Groceries,\n'
+            for day in range(1, 21)
+        )
+        import_transactions(self.user, StringIO(self.HEADER + body))
+
+        with CaptureQueriesContext(connection) as captured:
+            result = import_transactions(
+                self.user, StringIO(self.HEADER + body), dry_run=True
+            )
+        self.assertEqual(result.duplicates, 20)
+        lookups = [
+            query['sql'] for query in captured.captured_queries
+            if '"fingerprint" IN' in query['sql']
+        ]
+        self.assertEqual(len(lookups), 1)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + lookups[0])
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn('txn_user_fingerprint_idx', plan)
+
+    def test_backfill_command_fills_missing_fingerprints(self):
+        """I expect rows saved without a fingerprint to gain one."""
+
+        txn = Transaction.objects.create(
+            user=self.user, name='Old', type='INCOME',
+            amount_in_cents=100, occurred_on=date(2025, 1, 1),
+        )
+        Transaction.objects.filter(pk=txn.pk).update(fingerprint=None)
+
+        out = StringIO()
+        call_command('backfill_fingerprints', batch_size=1, stdout=out)
+
+        txn.refresh_from_db()
+        self.assertEqual(txn.fingerprint, txn.compute_fingerprint())
+        self.assertIn('Fingerprinted 1 transaction(s).', out.getvalue())
+
+
+class AsyncEndpointTests(TestCase):
+    """I drive the async JSON endpoints through Django's async client."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='eventloop',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        category = Category.objects.create(name='Travel')
+        Transaction.objects.create(
+            user=self.user, name='Train Ticket', type='OUTGO',
+            category=category, amount_in_cents=2350,
+            occurred_on=date(2025, 9, 12),
+        )
+        self.async_client.force_login(self.user)
+
+    async def test_anonymous_requests_are_sent_to_login(self):
+        """I expect the async guard to redirect like login_required."""
+
+        anonymous = type(self.async_client)()
+        response = await anonymous.get(
+            reverse('transaction_suggestions'), {'q': 'tra'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/accounts/login/?next='))
+
+    async def test_search_suggestions_and_calendar(self):
+        """I expect the async views to answer as the sync ones did."""
+
+        response = await self.async_client.get(
+            reverse('transaction_search_results'), {'q': 'train'}
+        )
+        self.assertEqual(response.json()['count'], 1)
+        self.assertIn('Train Ticket', response.json()['html'])
+
+        response = await self.async_client.get(
+            reverse('transaction_suggestions'), {'q': 'tr'}
+        )
+        suggestions = response.json()['suggestions']
+        self.assertEqual(suggestions[0], 'Train Ticket')
+        self.assertIn('Travel', suggestions)
+
+        response = await self.async_client.get(
+            reverse('transaction_calendar_data'),
+            {'year': '2025', 'month': '9'},
+        )
+        self.assertEqual(response.json()['totals']['outgo_cents'], 2350)
+        response = await self.async_client.get(
+            reverse('transaction_calendar_data'), {'date': '2025-09-12'}
+        )
+        day = response.json()
+        name_at = day['fields'].index('name')
+        self.assertEqual(
+            [row[name_at] for row in day['transactions']],
+            ['Train Ticket'],
+        )
+
+    async def test_exports_stream_without_buffering(self):
+        """I expect ASGI exports to hand Django an async iterator."""
+
+        response = await self.async_client.get(
+            reverse('transaction_export'), {'format': 'csv'}
+        )
+        self.assertTrue(response.is_async)
+        body = b''.join([
+            block async for block in response.streaming_content
+        ]).decode()
+        self.assertIn('Train Ticket', body)
+
+
+class ConditionalRequestTests(TestCase):
+    """I check that repeat JSON requests are answered with 304s."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='revalidator',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        self.category = Category.objects.create(name='Hobbies')
+        Transaction.objects.create(
+            user=self.user, name='Paint Set', type='OUTGO',
+            category=self.category, amount_in_cents=1800,
+            occurred_on=date(2025, 9, 5),
+        )
+        self.client.login(username='revalidator', password='super-secret')
+
+    def _revalidate(self, name, params):
+        first = self.client.get(reverse(name), params)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        with CaptureQueriesContext(connection) as captured:
+            again = self.client.get(
+                reverse(name), params, HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+        return first['ETag'], captured
+
+    def test_calendar_month_and_day_revalidate_without_queries(self):
+        """I expect a 304 to skip the rollup and transaction reads."""
+
+        for params in ({'year': 2025, 'month': 9}, {'date': '2025-09-05'}):
+            _, captured = self._revalidate('transaction_calendar_data', params)
+            tables = ' '.join(query['sql'] for query in captured)
+            self.assertNotIn('expenses_dailyrollup', tables)
+            self.assertNotIn('"expenses_transaction"', tables)
+
+    def test_writes_and_category_edits_change_the_tag(self):
+        """I expect stale validators to get a full answer again."""
+
+        params = {'q': 'pa'}
+        etag, _ = self._revalidate('transaction_suggestions', params)
+
+        Transaction.objects.create(
+            user=self.user, name='Paper', type='OUTGO',
+            category=self.category, amount_in_cents=300,
+            occurred_on=date(2025, 9, 6),
+        )
+        response = self.client.get(
+            reverse('transaction_suggestions'), params,
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Paper', response.json()['suggestions'])
+
+        etag = response['ETag']
+        self.category.name = 'Pastimes'
+        self.category.save()
+        response = self.client.get(
+            reverse('transaction_suggestions'), params,
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Pastimes', response.json()['suggestions'])
+
+    def test_tags_come_from_the_database_not_the_cache(self):
+        """I expect every worker, whatever its cache holds, to agree."""
+
+        params = {'q': 'pa'}
+        etag, _ = self._revalidate('transaction_suggestions', params)
+        cache.clear()
+        response = self.client.get(
+            reverse('transaction_suggestions'), params,
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_search_revalidates_but_never_pins_empty_results(self):
+        """I expect empty answers, which may be timeouts, to go untagged."""
+
+        self._revalidate('transaction_search_results', {'q': 'paint'})
+
+        response = self.client.get(
+            reverse('transaction_search_results'), {'q': 'nothing'}
+        )
+        self.assertEqual(response.json()['count'], 0)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class CalendarRangeTests(TestCase):
+    """I check the multi-month calendar endpoint the modal prefetches."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pager',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        category = Category.objects.create(name='Bills')
+        for occurred_on, cents in (
+            (date(2024, 12, 31), 100),
+            (date(2025, 1, 15), 200),
+            (date(2025, 3, 1), 300),
+            (date(2025, 3, 20), 400),
+        ):
+            Transaction.objects.create(
+                user=self.user, name='Bill', type='OUTGO',
+                category=category, amount_in_cents=cents,
+                occurred_on=occurred_on,
+            )
+        self.client.login(username='pager', password='super-secret')
+
+    def test_range_returns_each_month_from_one_rollup_query(self):
+        """I expect every month, empty ones too, from a single read."""
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(
+                reverse('transaction_calendar_data'),
+                {'from': '2024-12', 'to': '2025-03'},
+            )
+        months = response.json()['months']
+        self.assertEqual(
+            [(month['year'], month['month']) for month in months],
+            [(2024, 12), (2025, 1), (2025, 2), (2025, 3)],
+        )
+        self.assertEqual(
+            [month['totals']['outgo_cents'] for month in months],
+            [100, 200, 0, 700],
+        )
+        self.assertEqual(months[3]['initial_date'], '2025-03-01')
+        self.assertEqual(response.json()['currency_symbol'], '£')
+        rollup_reads = [
+            query for query in captured
+            if 'expenses_dailyrollup' in query['sql']
+        ]
+        self.assertEqual(len(rollup_reads), 1)
+
+    def test_single_month_matches_its_range_entry(self):
+        """I expect ?year&month to keep answering with one month."""
+
+        single = self.client.get(
+            reverse('transaction_calendar_data'),
+            {'year': '2025', 'month': '3'},
+        ).json()
+        ranged = self.client.get(
+            reverse('transaction_calendar_data'),
+            {'from': '2025-03', 'to': '2025-03'},
+        ).json()
+        self.assertEqual(single['days'], ranged['months'][0]['days'])
+        self.assertEqual(single['month_label'], 'March 2025')
+
+    def test_bad_ranges_are_rejected(self):
+        """I expect malformed, reversed and oversized ranges refused."""
+
+        for params in (
+            {'from': '2025-03'},
+            {'from': '2025-13', 'to': '2026-01'},
+            {'from': '2025-03', 'to': '2025-01'},
+            {'from': '2020-01', 'to': '2025-01'},
+        ):
+            response = self.client.get(
+                reverse('transaction_calendar_data'), params
+            )
+            self.assertEqual(response.status_code, 400, params)
+
+
+class CompactCalendarDayTests(TestCase):
+    """I check the compact day payload the calendar modal expands."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='compact',
+            password='super-secret',
+        )
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        self.category = Category.objects.create(name='Snacks')
+        self.client.login(username='compact', password='super-secret')
+
+    def test_rows_reference_labels_sent_once(self):
+        """I expect arrays of ids and cents plus shared lookup tables."""
+
+        crisps = Transaction.objects.create(
+            user=self.user, name='Crisps', type='OUTGO',
+            category=self.category, amount_in_cents=125050,
+            occurred_on=date(2025, 9, 3),
+        )
+        refund = Transaction.objects.create(
+            user=self.user, name='Refund', type='INCOME',
+            amount_in_cents=300, note='Returned',
+            occurred_on=date(2025, 9, 3),
+        )
+
+        data = self.client.get(
+            reverse('transaction_calendar_data'), {'date': '2025-09-03'}
+        ).json()
+
+        rows = [dict(zip(data['fields'], row)) for row in data['transactions']]
+        self.assertEqual(rows, [
+            {'id': crisps.pk, 'name': 'Crisps', 'type': 'OUTGO',
+             'category': self.category.pk, 'note': '', 'amount': 125050},
+            {'id': refund.pk, 'name': 'Refund', 'type': 'INCOME',
+             'category': None, 'note': 'Returned', 'amount': 300},
+        ])
+        self.assertEqual(data['categories'], {str(self.category.pk): 'Snacks'})
+        self.assertEqual(data['types']['OUTGO'], 'Outgoing')
+        self.assertEqual(data['currency_symbol'], '£')
+        self.assertEqual(
+            data['detail_url'].replace('{id}', str(crisps.pk)),
+            reverse('transaction_detail', args=[crisps.pk]),
+        )
+
+
+class MoneyCodecTests(TestCase):
+    """I check the integer money codec against the Decimal arithmetic."""
+
+    @staticmethod
+    def decimal_display(cents, currency_code):
+        units = (Decimal(cents) / Decimal(100)).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP
+        )
+        return (
+            f'{currencies.get_currency_symbol(currency_code)}{units:,.2f}'
+        )
+
+    @staticmethod
+    def decimal_parse(text):
+        try:
+            quantized = Decimal(text).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            )
+            return int((quantized * 100).to_integral_value(
+                rounding=ROUND_HALF_UP
+            ))
+        except (InvalidOperation, ValueError) as error:
+            return type(error)
+
+    def parse(self, text):
+        try:
+            return currencies.parse_display_amount_to_cents(text)
+        except (InvalidOperation, ValueError) as error:
+            return type(error)
+
+    def test_formatting_matches_decimal_up_to_max_cents(self):
+        rng = random.Random(16)
+        amounts = [0, 1, -1, 5, -5, 100, -100, 123456, currencies.MAX_CENTS]
+        amounts += [
+            rng.randint(-currencies.MAX_CENTS, currencies.MAX_CENTS)
+            for _ in range(2000)
+        ]
+        amounts += [rng.randint(-10 ** 6, 10 ** 6) for _ in range(2000)]
+        for code in ('USD', 'GBP', 'EUR', 'XYZ'):
+            expected = [self.decimal_display(cents, code) for cents in amounts]
+            self.assertEqual(currencies.format_many(amounts, code), expected)
+            self.assertEqual(
+                [
+                    currencies.cents_to_display(cents, code)
+                    for cents in amounts
+                ],
+                expected,
+            )
+
+    def test_formatting_keeps_the_fallbacks(self):
+        self.assertEqual(currencies.cents_to_display(-5, 'USD'), '$-0.05')
+        self.assertEqual(
+            currencies.format_many([None, 'abc', '250', 12.9], 'GBP'),
+            ['£0.00', '£0.00', '£2.50', '£0.12'],
+        )
+        self.assertEqual(currencies.format_many(iter([]), 'EUR'), [])
+
+    def test_parsing_matches_decimal_rounding_and_errors(self):
+        rng = random.Random(61)
+        texts = [
+            '0', '19.99', '.5', '5.', '-0.005', '+1.005', '1.0049', '-2.675',
+            ' 7 ', '1e3', '1E-3', 'NaN', 'Infinity', '', '.', '-', '1..2',
+            '1_000', '12a', '١٢', '9' * 27, '9' * 30 + '.5',
+        ]
+        for _ in range(3000):
+            cents = rng.randint(0, currencies.MAX_CENTS)
+            units, remainder = divmod(cents, 100)
+            extra = str(rng.randint(0, 9999))
+            fraction = (f'{remainder:02d}' + extra)[:rng.randint(0, 6)]
+            sign = rng.choice(('', '-', '+'))
+            texts.append(f'{sign}{units}.{fraction}')
+            texts.append(f'{sign}{units}')
+        for text in texts:
+            self.assertEqual(self.parse(text), self.decimal_parse(text), text)
+
+
+class AccountUserAdminTests(TestCase):
+    """I cover the annotated metrics on the admin's user changelist."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        self.client.login(username='boss', password='super-secret')
+        self.today = timezone.localdate()
+        self.url = reverse('ledgerly_admin:expenses_accountuser_changelist')
+
+    def add_user(self, username, amounts, currency='USD'):
+        user = User.objects.create_user(username=username)
+        UserSettings.objects.create(
+            user=user,
+            currency_code=currency,
+            cycle_start_date=self.today.replace(day=1),
+        )
+        for txn_type, cents, occurred_on in amounts:
+            Transaction.objects.create(
+                user=user,
+                name='Entry',
+                type=txn_type,
+                amount_in_cents=cents,
+                occurred_on=occurred_on,
+            )
+        return user
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl'].result_list
+
+    def test_metrics_come_from_annotations(self):
+        old = self.today - timedelta(days=70)
+        self.add_user('saver', [
+            (Transaction.INCOME, 100000, self.today),
+            (Transaction.OUTGO, 2550, self.today),
+            (Transaction.OUTGO, 999, old),
+        ], currency='GBP')
+        self.add_user('idle', [])
+
+        rows = {user.username: user for user in self.changelist()}
+        saver, idle = rows['saver'], rows['idle']
+        self.assertEqual(saver.txn_count, 3)
+        self.assertEqual(saver.last_txn_on, self.today)
+        self.assertEqual(saver.cycle_balance_cents, 97450)
+        self.assertEqual((idle.txn_count, idle.cycle_balance_cents), (0, 0))
+        self.assertIsNone(idle.last_txn_on)
+
+        content = self.client.get(self.url).content.decode()
+        self.assertIn('£974.50', content)
+        self.assertIn('3 transactions', content)
+        self.assertIn('Never', content)
+
+    def test_query_count_does_not_grow_with_users(self):
+        for index in range(3):
+            self.add_user(f'user{index}', [
+                (Transaction.OUTGO, 100, self.today),
+            ])
+        with CaptureQueriesContext(connection) as few:
+            self.changelist()
+        for index in range(3, 12):
+            self.add_user(f'user{index}', [
+                (Transaction.OUTGO, 100, self.today),
+                (Transaction.INCOME, 500, self.today - timedelta(days=40)),
+            ])
+        with CaptureQueriesContext(connection) as many:
+            self.changelist()
+        self.assertEqual(len(many), len(few))
+
+    def test_metric_columns_sort(self):
+        self.add_user('busy', [
+            (Transaction.OUTGO, 100, self.today - timedelta(days=3)),
+            (Transaction.OUTGO, 100, self.today - timedelta(days=2)),
+        ])
+        self.add_user('rich', [(Transaction.INCOME, 90000, self.today)])
+        columns = list(AccountUserAdmin.list_display)
+
+        def order(field, descending=True):
+            index = columns.index(field) + 1
+            return [
+                user.username
+                for user in self.changelist(o=f'-{index}' if descending
+                                            else str(index))
+                if user.username != 'boss'
+            ]
+
+        self.assertEqual(order('transaction_count'), ['busy', 'rich'])
+        self.assertEqual(order('last_transaction_on'), ['rich', 'busy'])
+        self.assertEqual(order('cycle_balance'), ['rich', 'busy'])
+        self.assertEqual(
+            order('cycle_balance', descending=False), ['busy', 'rich']
+        )
+
+
+class TransactionAdminCurrencyTests(TestCase):
+    """I cover how the transaction admin formats amounts."""
+
+    def setUp(self):
+        User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        self.client.login(username='boss', password='super-secret')
+        self.url = reverse('ledgerly_admin:expenses_transaction_changelist')
+
+    def add_rows(self, username, currency, count):
+        user = User.objects.create_user(username=username)
+        if currency:
+            UserSettings.objects.create(user=user, currency_code=currency)
+        for index in range(count):
+            Transaction.objects.create(
+                user=user,
+                name=f'{username} {index}',
+                type=Transaction.OUTGO,
+                amount_in_cents=123456 + index,
+                occurred_on=date(2025, 9, 1),
+            )
+        return user
+
+    def test_changelist_formats_every_currency_without_writes(self):
+        for code, _ in CURRENCY_CHOICES:
+            self.add_rows(code.lower(), code, 1)
+        self.add_rows('plain', None, 1)
+
+        content = self.client.get(self.url).content.decode()
+        for symbol in ('$', '£', '€'):
+            self.assertIn(f'{symbol}1,234.56', content)
+        self.assertFalse(
+            UserSettings.objects.filter(user__username='plain').exists()
+        )
+
+    def test_changelist_query_count_is_fixed(self):
+        self.add_rows('first', 'EUR', 2)
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+        self.add_rows('second', 'GBP', 20)
+        self.add_rows('third', None, 20)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['cl'].result_list), 42)
+
+
+class ChangeFormCollector(HTMLParser):
+    """I collect what a browser would post for the admin change form."""
+
+    def __init__(self, form_id):
+        super().__init__()
+        self.form_id = form_id
+        self.inside = False
+        self.select = None
+        self.textarea = None
+        self.data = {}
+
+    def add(self, name, value):
+        self.data.setdefault(name, []).append(value)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self.inside = attrs.get('id') == self.form_id
+        if not self.inside or 'name' not in attrs and tag != 'option':
+            return
+        if tag == 'input':
+            if attrs.get('type') in ('checkbox', 'radio'):
+                if 'checked' in attrs:
+                    self.add(attrs['name'], attrs.get('value', 'on'))
+            elif attrs.get('type') not in ('submit', 'button'):
+                self.add(attrs['name'], attrs.get('value', ''))
+        elif tag == 'select':
+            self.select = attrs['name']
+        elif tag == 'option' and self.select and 'selected' in attrs:
+            self.add(self.select, attrs.get('value', ''))
+        elif tag == 'textarea':
+            self.textarea = attrs['name']
+            self.add(self.textarea, '')
+
+    def handle_data(self, data):
+        if self.textarea:
+            self.data[self.textarea][-1] += data
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.inside = False
+        elif tag == 'select':
+            self.select = None
+        elif tag == 'textarea':
+            self.textarea = None
+
+
+class TransactionInlinePagingTests(TestCase):
+    """I cover the paged transaction inline on the admin user page."""
+
+    def setUp(self):
+        User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        self.client.login(username='boss', password='super-secret')
+        self.user = User.objects.create_user(
+            username='heavy', email='heavy@example.com'
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user,
+                name=f'Coffee {index}' if index % 2 else f'Salary {index}',
+                type=Transaction.OUTGO if index % 2 else Transaction.INCOME,
+                amount_in_cents=100 + index,
+                occurred_on=date(2025, 1, 1) + timedelta(days=index),
+            )
+            for index in range(45)
+        ])
+        self.url = reverse(
+            'ledgerly_admin:expenses_accountuser_change', args=[self.user.pk]
+        )
+
+    def inline(self, response):
+        for formset in response.context['inline_admin_formsets']:
+            if formset.formset.model is Transaction:
+                return formset.formset
+        self.fail('The transaction inline is missing.')
+
+    def page_names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [form.instance.name for form in self.inline(response).forms]
+
+    def posted_form(self, **params):
+        response = self.client.get(self.url, params)
+        collector = ChangeFormCollector('accountuser_form')
+        collector.feed(response.content.decode())
+        return collector.data
+
+    def test_pages_show_newest_first(self):
+        first = self.page_names()
+        self.assertEqual(len(first), 20)
+        self.assertEqual(first[:2], ['Salary 44', 'Coffee 43'])
+        self.assertEqual(len(self.page_names(txn_page=3)), 5)
+        self.assertNotIn(first[-1], self.page_names(txn_page=2))
+
+        content = self.client.get(self.url).content.decode()
+        self.assertIn('Page 1 of 3', content)
+        self.assertIn('href="?txn_page=2"', content)
+
+    def test_filters_run_on_the_server(self):
+        names = self.page_names(txn_q='coffee', txn_type='OUTGO')
+        self.assertEqual(len(names), 20)
+        self.assertTrue(all(name.startswith('Coffee') for name in names))
+        self.assertEqual(len(self.page_names(txn_type='INCOME', txn_page=2)),
+                         3)
+        content = self.client.get(
+            self.url, {'txn_q': 'coffee', 'txn_page': 1}
+        ).content.decode()
+        self.assertIn('href="?txn_page=2&amp;txn_q=coffee"', content)
+
+    def test_post_saves_changed_rows_of_the_page(self):
+        data = self.posted_form(txn_page=2)
+        prefix = 'transactions'
+        rows = int(data[f'{prefix}-INITIAL_FORMS'][0])
+        self.assertEqual(rows, 20)
+        changed_pk = int(data[f'{prefix}-3-id'][0])
+        data[f'{prefix}-3-formatted_amount'] = ['99.50']
+
+        response = self.client.post(f'{self.url}?txn_page=2', data)
+        self.assertEqual(response.status_code, 302)
+        changed = Transaction.objects.get(pk=changed_pk)
+        self.assertEqual(changed.amount_in_cents, 9950)
+        self.assertEqual(
+            Transaction.objects.filter(
+                user=self.user, amount_in_cents=9950
+            ).count(),
+            1,
+        )
+
+    def test_post_edits_the_posted_rows_after_the_page_shifts(self):
+        data = self.posted_form(txn_page=2)
+        changed_pk = int(data['transactions-19-id'][0])
+        data['transactions-19-formatted_amount'] = ['99.50']
+        # A newer entry pushes the page's last row onto the next page.
+        Transaction.objects.create(
+            user=self.user,
+            name='Coffee 45',
+            type=Transaction.OUTGO,
+            amount_in_cents=145,
+            occurred_on=date(2025, 3, 1),
+        )
+
+        response = self.client.post(f'{self.url}?txn_page=2', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Transaction.objects.filter(
+                user=self.user, amount_in_cents=9950
+            ).values_list('pk', flat=True)),
+            [changed_pk],
+        )
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(),
+                         46)
+
+    def test_post_only_validates_changed_rows(self):
+        # I store a row the inline form would reject if it were checked.
+        Transaction.objects.filter(name='Coffee 43').update(name='')
+        data = self.posted_form()
+        self.assertIn('', data['transactions-1-name'])
+        data['transactions-0-name'] = ['Salary (bonus)']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            Transaction.objects.filter(name='Salary (bonus)').exists()
+        )
+        self.assertTrue(Transaction.objects.filter(name='').exists())
+        lookups = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and '"expenses_transaction"."id" =' in query['sql']
+        ]
+        self.assertLessEqual(len(lookups), 2)
+
+
+class CategoryAdminUsageTests(TestCase):
+    """I cover the spending columns on the admin's category changelist."""
+
+    def setUp(self):
+        User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        self.client.login(username='boss', password='super-secret')
+        self.url = reverse('ledgerly_admin:expenses_category_changelist')
+        self.users = [
+            User.objects.create_user(username=f'user{index}')
+            for index in range(2)
+        ]
+
+    def spend(self, category, *days):
+        for index, day in enumerate(days):
+            Transaction.objects.create(
+                user=self.users[index % 2],
+                name='Entry',
+                type=Transaction.OUTGO,
+                amount_in_cents=500,
+                category=category,
+                occurred_on=day,
+            )
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {
+            category.name: category
+            for category in response.context['cl'].result_list
+        }
+
+    def test_usage_comes_from_the_rollups(self):
+        books = Category.objects.create(name='Books')
+        Category.objects.create(name='Unused')
+        self.spend(
+            books, date(2025, 3, 9), date(2025, 1, 2), date(2025, 1, 2)
+        )
+
+        # Income is filed under no category, so it never counts here.
+        Transaction.objects.create(
+            user=self.users[0],
+            name='Refund',
+            type=Transaction.INCOME,
+            amount_in_cents=500,
+            category=books,
+            occurred_on=date(2024, 6, 1),
+        )
+
+        rows = self.changelist()
+        self.assertEqual(rows['Books'].spending_count, 3)
+        self.assertEqual(rows['Books'].first_spent_on, date(2025, 1, 2))
+        self.assertEqual(rows['Books'].last_spent_on, date(2025, 3, 9))
+        self.assertEqual(rows['Unused'].spending_count, 0)
+        self.assertIsNone(rows['Unused'].first_spent_on)
+
+        content = self.client.get(self.url).content.decode()
+        self.assertIn('3 entries', content)
+        self.assertIn('2025-01-02', content)
+        self.assertIn('2025-03-09', content)
+        self.assertIn('Never spent', content)
+
+    def test_query_count_does_not_grow_with_categories(self):
+        self.spend(Category.objects.create(name='First'), date(2025, 1, 1))
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        for index in range(10):
+            self.spend(
+                Category.objects.create(name=f'Extra {index}'),
+                date(2025, 2, 1),
+                date(2025, 2, index + 2),
+            )
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+
+    def test_usage_columns_sort(self):
+        often = Category.objects.create(name='Often')
+        rarely = Category.objects.create(name='Rarely')
+        self.spend(often, date(2025, 5, 1), date(2025, 5, 2))
+        self.spend(rarely, date(2024, 12, 31))
+        columns = list(CategoryAdmin.list_display)
+
+        def order(field):
+            index = columns.index(field) + 1
+            names = list(self.changelist(o=f'-{index}'))
+            return [name for name in names if name in ('Often', 'Rarely')]
+
+        self.assertEqual(order('spending_entries'), ['Often', 'Rarely'])
+        self.assertEqual(order('first_spent_info'), ['Often', 'Rarely'])
+        self.assertEqual(order('last_spent_info'), ['Often', 'Rarely'])
+
+
+class TransactionAdminScalingTests(TestCase):
+    """I cover the bounded filters, search and counts of the admin list."""
+
+    def setUp(self):
+        User.objects.create_superuser(
+            username='boss',
+            password='super-secret',
+            email='boss@example.com',
+        )
+        self.client.login(username='boss', password='super-secret')
+        self.url = reverse('ledgerly_admin:expenses_transaction_changelist')
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@example.com'
+        )
+        self.bob = User.objects.create_user(
+            username='bob', email='bob@example.com'
+        )
+        self.travel = Category.objects.create(name='Travel')
+        rows = [
+            (self.alice, 'Train to Leeds', self.travel, 'work trip'),
+            (self.alice, 'Groceries', None, ''),
+            (self.bob, 'Trainers', None, 'running shoes'),
+            (self.bob, 'Coffee beans', self.travel, ''),
+        ]
+        for index, (user, name, category, note) in enumerate(rows):
+            Transaction.objects.create(
+                user=user,
+                name=name,
+                type=Transaction.OUTGO,
+                amount_in_cents=1000 + index,
+                category=category,
+                note=note,
+                occurred_on=date(2025, 6, index + 1),
+            )
+
+    def names(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(txn.name for txn in response.context['cl'].result_list)
+
+    def test_changelist_lists_no_users_or_categories(self):
+        content = self.client.get(self.url).content.decode()
+        self.assertIn('data-lookup-url="', content)
+        self.assertNotIn('?user__id__exact=', content)
+        self.assertNotIn('?category__id__exact=', content)
+
+    def test_autocomplete_filters_match_exact_values(self):
+        self.assertEqual(
+            self.names(username='alice'), ['Groceries', 'Train to Leeds']
+        )
+        self.assertEqual(
+            self.names(category_name='Travel'),
+            ['Coffee beans', 'Train to Leeds'],
+        )
+        self.assertEqual(self.names(username='ali'), [])
+
+    def test_lookup_view_suggests_prefixes(self):
+        lookup = reverse(
+            'ledgerly_admin:expenses_transaction_lookup', args=['user']
+        )
+        response = self.client.get(lookup, {'term': 'al'})
+        self.assertEqual(response.json(), {'results': ['alice']})
+        response = self.client.get(
+            reverse('ledgerly_admin:expenses_transaction_lookup',
+                    args=['category']),
+            {'term': 'Tra'},
+        )
+        self.assertEqual(response.json()['results'], ['Transportation',
+                                                      'Travel'])
+        self.assertEqual(self.client.get(lookup).json(), {'results': []})
+        self.client.logout()
+        self.assertEqual(self.client.get(lookup, {'term': 'a'}).status_code,
+                         302)
+
+    def test_search_modes(self):
+        self.assertEqual(self.names(q='trai'), ['Train to Leeds', 'Trainers'])
+        self.assertEqual(self.names(q='trip'), ['Train to Leeds'])
+        self.assertEqual(self.names(q='travel coff'), ['Coffee beans'])
+        self.assertEqual(self.names(q='rain'), [])
+        self.assertEqual(self.names(q='user:bob'),
+                         ['Coffee beans', 'Trainers'])
+        self.assertEqual(self.names(q='email:alice@example.com'),
+                         ['Groceries', 'Train to Leeds'])
+        self.assertEqual(self.names(q='!!'), [])
+
+    def test_count_is_exact_below_the_limit(self):
+        response = self.client.get(self.url, {'username': 'bob'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+    def test_count_is_capped_above_the_limit(self):
+        with patch('expenses.admin.EXACT_COUNT_LIMIT', 3):
+            filtered = self.client.get(self.url, {'type__exact': 'OUTGO'})
+            unfiltered = self.client.get(self.url)
+        self.assertEqual(filtered.context['cl'].result_count, 3)
+        self.assertGreaterEqual(unfiltered.context['cl'].result_count, 4)
+
+
+class BackgroundPurgeTests(TestCase):
+    """I cover clearing histories and deleting accounts in batches."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='heavy',
+            password='super-secret',
+        )
+        self.category = Category.objects.create(name='Groceries')
+        for index in range(5):
+            Transaction.objects.create(
+                user=self.user,
+                name=f'Old entry {index}',
+                type=Transaction.OUTGO,
+                amount_in_cents=1000,
+                category=self.category,
+                occurred_on=date(2025, 9, 1 + index),
+            )
+        self.client.login(username='heavy', password='super-secret')
+
+    def test_cleared_history_is_hidden_before_it_is_purged(self):
+        old = Transaction.objects.filter(user=self.user).first()
+        self.client.post(reverse('account_clear_history'))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(),
+                         5)
+
+        self.assertNotContains(
+            self.client.get(reverse('transaction_list')), 'Old entry'
+        )
+        self.assertNotContains(
+            self.client.get(reverse('dashboard')), 'Old entry'
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse('transaction_detail', args=[old.pk])
+            ).status_code,
+            404,
+        )
+        calendar = self.client.get(
+            reverse('transaction_calendar_data'), {'date': '2025-09-01'}
+        ).json()
+        self.assertEqual(calendar['transactions'], [])
+        self.assertEqual(
+            rollups.rebuild_daily_rollups(self.user.pk), 0
+        )
+
+    def test_search_skips_hidden_rows_before_its_limit(self):
+        self.client.post(reverse('account_clear_history'))
+        # I rank the new row below the hidden ones on every backend.
+        Transaction.objects.create(
+            user=self.user,
+            name='Restock',
+            type=Transaction.OUTGO,
+            amount_in_cents=700,
+            category=self.category,
+            note='New entry',
+            occurred_on=date(2025, 8, 1),
+        )
+        # More hidden matches than the limit must not crowd the new row out.
+        for backend in (None, 'expenses.search.LikeSearchBackend'):
+            with self.subTest(backend=backend), override_settings(
+                LEDGERLY_SEARCH_BACKEND=backend
+            ):
+                found = search.search_transactions(self.user, 'entry', 3)
+                self.assertEqual([row.name for row in found], ['Restock'])
+
+    def test_new_entries_survive_the_purge(self):
+        self.client.post(reverse('account_clear_history'))
+        Transaction.objects.create(
+            user=self.user,
+            name='Fresh start',
+            type=Transaction.INCOME,
+            amount_in_cents=500,
+            occurred_on=date(2025, 9, 2),
+        )
+        self.assertContains(
+            self.client.get(reverse('transaction_list')), 'Fresh start'
+        )
+
+        purges.run_pending()
+        names = list(
+            Transaction.objects.filter(user=self.user)
+            .values_list('name', flat=True)
+        )
+        self.assertEqual(names, ['Fresh start'])
+        self.assertIsNone(purges.open_purge(self.user.pk))
+
+    def test_purge_runs_in_batches_and_reports_progress(self):
+        self.client.post(reverse('account_clear_history'))
+        pending = purges.open_purge(self.user.pk)
+        self.assertEqual((pending.total, pending.purged), (5, 0))
+
+        self.assertEqual(purges.run_pending(batch_size=2, max_batches=1), 2)
+        pending.refresh_from_db()
+        self.assertEqual((pending.purged, pending.percent_done), (2, 40))
+        response = self.client.get(reverse('account_clear_history'))
+        self.assertContains(response, '2 of 5')
+        self.assertContains(response, 'http-equiv="refresh"')
+
+        with CaptureQueriesContext(connection) as queries:
+            purges.purge_batch(pending, batch_size=2)
+        deletes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "expenses_transaction"')
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertRegex(deletes[0], r'IN \(\d+, \d+\)$')
+
+        purges.run_pending(batch_size=2)
+        pending.refresh_from_db()
+        self.assertIsNotNone(pending.finished_at)
+        self.assertEqual(pending.purged, 5)
+
+    def test_reimporting_after_a_clear_is_not_a_duplicate(self):
+        self.client.post(reverse('account_clear_history'))
+        result = import_transactions(
+            self.user,
+            StringIO(
+                'date,name,type,amount,currency,category,note\n'
+                '2025-09-01,Old entry 0,OUTGO,10.00,USD,Groceries,\n'
+            ),
+        )
+        self.assertEqual((result.created, result.duplicates), (1, 0))
+
+    def test_account_is_deactivated_then_purged(self):
+        response = self.client.post(reverse('account_delete'))
+        self.assertContains(response, '5 transactions')
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(
+            self.client.login(username='heavy', password='super-secret')
+        )
+        self.assertTrue(Transaction.objects.filter(user=self.user).exists())
+
+        purges.run_pending(batch_size=2)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_a_second_clear_keeps_a_stale_purge_open(self):
+        purges.request_history_purge(self.user)
+        stale = purges.open_purge(self.user.pk)
+        Transaction.objects.create(
+            user=self.user,
+            name='After',
+            type=Transaction.OUTGO,
+            amount_in_cents=100,
+            occurred_on=date(2025, 9, 2),
+        )
+        purges.request_history_purge(self.user)
+
+        self.assertEqual(purges.purge_batch(stale, batch_size=10), 5)
+        self.assertEqual(purges.purge_batch(stale), 0)
+        self.assertIsNotNone(purges.open_purge(self.user.pk))
+        purges.run_pending()
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertIsNone(purges.open_purge(self.user.pk))
+
+    def test_purge_command_drains_the_queue(self):
+        self.client.post(reverse('account_clear_history'))
+        out = StringIO()
+        call_command('purge_deletions', '--batch-size', '2', stdout=out)
+        self.assertIn('Purged 5 transaction(s).', out.getvalue())
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+
+class BackgroundJobTests(TestCase):
+    """I cover queueing, claiming, retrying and polling background jobs."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='queued',
+            password='super-secret',
+        )
+        self.calls = []
+        handlers = patch.dict(jobs._HANDLERS, {
+            'echo': self._echo,
+            'flaky': self._flaky,
+        })
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def _echo(self, job):
+        self.calls.append(job.pk)
+        return {'echo': job.payload['value']}
+
+    def _flaky(self, job):
+        raise RuntimeError('Storage is offline')
+
+    def test_enqueue_rejects_unknown_kinds(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue('missing')
+
+    def test_worker_runs_due_jobs_and_stores_results(self):
+        first = jobs.enqueue('echo', self.user, {'value': 1})
+        later = jobs.enqueue('echo', self.user, {'value': 2}, delay=60)
+
+        self.assertEqual(jobs.work('test-worker', poll=None), 1)
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.SUCCEEDED)
+        self.assertEqual(first.result, {'echo': 1})
+        self.assertEqual((first.attempts, first.locked_by), (1, 'test-worker'))
+        self.assertIsNotNone(first.finished_at)
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+        self.assertEqual(self.calls, [first.pk])
+
+    def test_only_one_worker_claims_a_job(self):
+        job = jobs.enqueue('echo', self.user, {'value': 1})
+        self.assertEqual(jobs.claim('first').pk, job.pk)
+        self.assertIsNone(jobs.claim('second'))
+
+    def test_failures_back_off_then_give_up(self):
+        job = jobs.enqueue('flaky', self.user, max_attempts=2)
+        before = timezone.now()
+        with self.assertLogs('expenses.jobs', 'ERROR') as logs:
+            jobs.work(poll=None)
+        self.assertIn('failed on attempt 1 of 2', logs.output[0])
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertEqual(job.last_error, 'RuntimeError: Storage is offline')
+        self.assertGreaterEqual(
+            job.run_after, before + timedelta(seconds=jobs.RETRY_BASE_SECONDS)
+        )
+        self.assertEqual(jobs.work(poll=None), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('expenses.jobs', 'ERROR'):
+            jobs.work(poll=None)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(
+            [jobs.retry_delay(n).total_seconds() for n in (1, 2, 3, 20)],
+            [10, 20, 40, jobs.RETRY_MAX_SECONDS],
+        )
+
+    def test_jobs_of_a_dead_worker_are_handed_out_again(self):
+        job = jobs.enqueue('echo', self.user, {'value': 3})
+        jobs.claim('gone')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(
+                seconds=jobs.LEASE_SECONDS + 1
+            )
+        )
+
+        self.assertEqual(jobs.work('replacement', poll=None), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual((job.attempts, job.locked_by), (2, 'replacement'))
+
+    def test_clearing_history_queues_a_purge_job(self):
+        for index in range(3):
+            Transaction.objects.create(
+                user=self.user,
+                name=f'Entry {index}',
+                type=Transaction.OUTGO,
+                amount_in_cents=100,
+                occurred_on=date(2025, 9, 1),
+            )
+        self.client.login(username='queued', password='super-secret')
+        self.client.post(reverse('account_clear_history'))
+        job = Job.objects.get(user=self.user)
+        self.assertEqual(job.kind, purges.PURGE_JOB)
+
+        jobs.work(poll=None)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {'purged': 3})
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertIsNone(purges.open_purge(self.user.pk))
+
+    def test_account_purge_job_outlives_the_account(self):
+        self.client.login(username='queued', password='super-secret')
+        self.client.post(reverse('account_delete'))
+
+        jobs.work(poll=None)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        job = Job.objects.get(kind=purges.PURGE_JOB)
+        self.assertEqual((job.status, job.user_id), (Job.SUCCEEDED, None))
+
+    def test_purge_jobs_follow_a_moved_cutoff(self):
+        for name in ('Before', 'After'):
+            Transaction.objects.create(
+                user=self.user,
+                name=name,
+                type=Transaction.OUTGO,
+                amount_in_cents=100,
+                occurred_on=date(2025, 9, 1),
+            )
+            purges.request_history_purge(self.user)
+
+        self.assertEqual(jobs.work(poll=None), 2)
+        self.assertEqual(
+            set(Job.objects.values_list('status', flat=True)),
+            {Job.SUCCEEDED},
+        )
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertIsNone(purges.open_purge(self.user.pk))
+
+    def test_status_endpoints_only_show_the_users_jobs(self):
+        job = jobs.enqueue('echo', self.user, {'value': 4})
+        stranger = User.objects.create_user(username='other')
+        hidden = jobs.enqueue('echo', stranger, {'value': 5})
+        self.client.login(username='queued', password='super-secret')
+
+        payload = self.client.get(reverse('job_status', args=[job.pk])).json()
+        self.assertEqual(
+            (payload['status'], payload['finished'], payload['result']),
+            (Job.QUEUED, False, None),
+        )
+        jobs.work(poll=None)
+        payload = self.client.get(payload['status_url']).json()
+        self.assertEqual(
+            (payload['status'], payload['finished'], payload['result']),
+            (Job.SUCCEEDED, True, {'echo': 4}),
+        )
+
+        self.assertEqual(
+            self.client.get(
+                reverse('job_status', args=[hidden.pk])
+            ).status_code,
+            404,
+        )
+        listed = self.client.get(reverse('job_list')).json()['jobs']
+        self.assertEqual([entry['id'] for entry in listed], [job.pk])
+
+    def test_run_workers_command_drains_the_queue(self):
+        jobs.enqueue('echo', self.user, {'value': 6})
+        out = StringIO()
+        call_command('run_workers', '--burst', stdout=out)
+        self.assertIn('Ran 1 job(s).', out.getvalue())
+        self.assertEqual(len(self.calls), 1)
+
+
+class RequestInstrumentationTests(TestCase):
+    """I cover the opt-in query and timing report on each request."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='measured',
+            password='super-secret',
+        )
+        Transaction.objects.create(
+            user=self.user,
+            name='Train Ticket',
+            type=Transaction.OUTGO,
+            amount_in_cents=2350,
+            occurred_on=date(2025, 9, 12),
+        )
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def _timing(self, response):
+        return dict(
+            re.match(r'(\w+);dur=([\d.]+)', part.strip()).groups()
+            for part in response['Server-Timing'].split(',')
+        )
+
+    def test_instrumentation_is_off_by_default(self):
+        response = self.client.get(reverse('transaction_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    # The database cache repeats its own lookups; I count the view's.
+    @override_settings(
+        LEDGERLY_INSTRUMENTATION=True,
+        CACHES=LOCAL_CACHES,
+    )
+    def test_requests_report_queries_and_template_time(self):
+        with self.assertLogs('ledgerly.instrumentation', 'INFO') as logs:
+            response = self.client.get(reverse('dashboard'))
+
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries \(0 duplicate\)", '
+            r'tpl;dur=[\d.]+;desc="Templates", total;dur=[\d.]+$',
+        )
+        timing = self._timing(response)
+        self.assertGreater(float(timing['tpl']), 0)
+        self.assertGreaterEqual(float(timing['total']), float(timing['tpl']))
+        [line] = logs.records
+        self.assertEqual(line.view, 'dashboard')
+        self.assertGreater(line.metrics['queries'], 0)
+        self.assertIn('view=dashboard method=GET path=/ status=200',
+                      line.getMessage())
+
+    @override_settings(LEDGERLY_INSTRUMENTATION=True)
+    async def test_async_views_count_queries_run_on_threads(self):
+        with self.assertLogs('ledgerly.instrumentation', 'INFO') as logs:
+            response = await self.async_client.get(
+                reverse('transaction_suggestions'), {'q': 'Tra'}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(logs.records[0].metrics['queries'], 0)
+        self.assertIn('Server-Timing', response)
+
+    @override_settings(
+        LEDGERLY_INSTRUMENTATION=True,
+        LEDGERLY_VIEW_BUDGETS={
+            'transaction_list': {'queries': 1},
+            '*': {'queries': 1000},
+        },
+    )
+    def test_views_over_budget_log_a_warning(self):
+        with self.assertLogs('ledgerly.instrumentation', 'INFO') as logs:
+            self.client.get(reverse('transaction_list'))
+            self.client.get(reverse('job_list'))
+
+        warnings = [
+            record.getMessage() for record in logs.records
+            if record.levelname == 'WARNING'
+        ]
+        self.assertEqual(len(warnings), 1)
+        self.assertRegex(
+            warnings[0],
+            r'^over budget view=transaction_list queries=\d+>1 ',
+        )
+
+    def test_repeated_queries_are_counted_as_duplicates(self):
+        with instrumentation.measure() as metrics:
+            for _ in range(3):
+                list(Category.objects.filter(name='Travel'))
+            list(Category.objects.filter(name='Food'))
+
+        self.assertEqual((metrics.queries, metrics.duplicates), (4, 2))
+        self.assertIn('"expenses_category"', metrics.most_repeated())
+        self.assertIsNone(instrumentation.current())
+
+
+class ConcurrentDuplicateTests(TransactionTestCase):
+    """I race two submits of the same entry on separate connections."""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Shared-cache memory databases fail a blocked writer at once
+            # instead of letting it wait, unlike a real database file.
+            self.skipTest('needs a database file or server to wait on')
+        self.user = User.objects.create_user(username='doubleclick')
+        UserSettings.objects.create(user=self.user, currency_code='GBP')
+        self.fields = {
+            'type': Transaction.OUTGO,
+            'category_id': None,
+            'name': 'Corner Shop',
+            'occurred_on': date(2025, 9, 1),
+            'amount_in_cents': 420,
+            'note': '',
+        }
+
+    def test_a_double_submit_saves_one_entry(self):
+        lookup = duplicates.find_duplicate
+        both_checked = threading.Barrier(2, timeout=1)
+
+        def find_then_wait(*args, **kwargs):
+            found = lookup(*args, **kwargs)
+            # Unlocked, both submits would pass their checks together here.
+            try:
+                both_checked.wait()
+            except threading.BrokenBarrierError:
+                pass
+            return found
+
+        outcomes = []
+        errors = []
+
+        def submit():
+            try:
+                outcomes.append(duplicates.add_transaction(
+                    self.user, dict(self.fields), duplicates.SKIP
+                )[1])
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        with patch.object(duplicates, 'find_duplicate', find_then_wait):
+            threads = [threading.Thread(target=submit) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sorted(outcomes), [duplicates.CREATED, duplicates.SKIPPED]
+        )
+        self.assertEqual(
+            Transaction.objects.filter(user=self.user).count(), 1
+        )
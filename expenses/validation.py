@@ -0,0 +1,84 @@
+"""I hold the rules every new transaction must pass, wherever it comes from."""
+
+from datetime import date
+from decimal import InvalidOperation
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+
+from .currencies import MAX_CENTS, parse_display_amount_to_cents
+from .models import Transaction
+
+
+def clean_new_transaction(
+    *,
+    transaction_type: Optional[str],
+    category_id,
+    name: Optional[str],
+    occurred_on: Optional[str],
+    amount: Optional[str],
+    note: Optional[str] = '',
+) -> dict:
+    """
+    Validate raw submitted values and return model-ready fields.
+
+    The dashboard's quick-add modals and the CSV importer both go through
+    me, so they accept and reject exactly the same input. I raise
+    :class:`ValidationError` with a user-facing message for the first
+    problem I find.
+    """
+
+    transaction_type = (transaction_type or '').strip().upper()
+    if transaction_type not in {Transaction.INCOME, Transaction.OUTGO}:
+        raise ValidationError(
+            'Please choose whether this entry is income or an expense.'
+        )
+
+    category_id = category_id or None
+    if transaction_type == Transaction.INCOME:
+        category_id = None
+    elif category_id is None:
+        raise ValidationError(
+            'Outgoing transactions require a category. '
+            'Please choose one before saving.'
+        )
+
+    name = (name or '').strip()
+    if not name:
+        raise ValidationError('Please enter a name for the transaction.')
+
+    try:
+        occurred = date.fromisoformat((occurred_on or '').strip())
+    except ValueError:
+        raise ValidationError(
+            'Please select a valid date before saving the transaction.'
+        )
+
+    amount = (amount or '').strip()
+    if not amount:
+        raise ValidationError(
+            'Please enter an amount before saving the transaction.'
+        )
+    try:
+        amount_cents = parse_display_amount_to_cents(amount)
+    except (InvalidOperation, ValueError):
+        raise ValidationError(
+            'Amount must be a number using up to two decimal places '
+            'for cents or pence (e.g., 12.50).'
+        )
+    if amount_cents <= 0:
+        raise ValidationError('Amount must be greater than zero.')
+    if amount_cents > MAX_CENTS:
+        raise ValidationError(
+            'That amount is too large for Ledgerly to store. '
+            'Please enter a smaller value.'
+        )
+
+    return {
+        'type': transaction_type,
+        'category_id': category_id,
+        'name': name.title(),
+        'occurred_on': occurred,
+        'amount_in_cents': amount_cents,
+        'note': note or '',
+    }
@@ -1,30 +1,65 @@
 """All of my Ledgerly expense views live together in this module."""
 
-from calendar import monthrange
-from datetime import date, timedelta
-from decimal import Decimal, InvalidOperation
+import io
+import re
+from datetime import date
+from decimal import Decimal
+from functools import wraps
 from typing import Tuple
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import models
-from django.db.models import Q, Sum
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.text import compress_sequence
 
 from .currencies import (
     DEFAULT_CURRENCY,
     MAX_CENTS,
-    cents_to_display,
+    format_many,
     get_currency_symbol,
-    parse_display_amount_to_cents,
 )
-from .forms import CurrencySettingsForm, TransactionForm
-from .models import Category, Transaction, UserSettings
+from . import caching, duplicates, purges, rollups, search
+from .cycles import build_cycle_report_from_summaries, cycle_day_for
+from .exports import CONTENT_TYPES, export_blocks, export_filename
+from .forms import (
+    CurrencySettingsForm,
+    TransactionExportForm,
+    TransactionForm,
+    TransactionImportForm,
+)
+from .imports import ImportFileError, import_transactions
+from .models import (
+    Category,
+    Job,
+    PendingDeletion,
+    Transaction,
+    UserSettings,
+)
+from .pagination import keyset_page
+from .suggestions import asuggest_names, suggest_categories
+from .validation import clean_new_transaction
+
+
+_GZIP_RE = re.compile(r'\bgzip\b')
+# I cap calendar range requests so one call stays a bounded rollup read.
+MAX_CALENDAR_MONTHS = 24
+# The columns of each transaction row in a calendar day payload.
+CALENDAR_DAY_FIELDS = ('id', 'name', 'type', 'category', 'note', 'amount')
 
 
 def _is_ajax(request) -> bool:
@@ -33,49 +68,81 @@ def _is_ajax(request) -> bool:
     return request.headers.get('x-requested-with') == 'XMLHttpRequest'
 
 
-def _filter_transactions(queryset, search_query):
+def _user_transactions(user) -> models.QuerySet:
+    """Return the transaction queryset I scope to the incoming user."""
+
+    return PendingDeletion.hide_from(
+        Transaction.objects.filter(user=user), user.pk
+    )
+
+
+def _get_user_settings_details(user) -> Tuple[UserSettings, str, str]:
+    """Fetch my user settings record plus the resolved currency details."""
+
+    settings_obj, _ = UserSettings.objects.get_or_create(user=user)
+    currency_code = settings_obj.currency_code or DEFAULT_CURRENCY
+    currency_symbol = get_currency_symbol(currency_code)
+    return settings_obj, currency_code, currency_symbol
+
+
+async def _aget_user_settings_details(
+    user,
+) -> Tuple[UserSettings, str, str]:
+    """Do what :func:`_get_user_settings_details` does from async views."""
+
+    settings_obj, _ = await UserSettings.objects.aget_or_create(user=user)
+    currency_code = settings_obj.currency_code or DEFAULT_CURRENCY
+    currency_symbol = get_currency_symbol(currency_code)
+    return settings_obj, currency_code, currency_symbol
+
+
+def _check_not_modified(request, settings_obj, *parts):
     """
-    Filter transactions by search term across:
-    - Transaction name/description
-    - Category name
-    - Transaction type
-    - Note field content
-    Returns filtered queryset with case-insensitive matching
+    Return the ETag for a user-data response and, if it matches, a 304.
+
+    The tag only costs the settings row the caller already loaded, so a
+    client re-asking for data it holds skips the real work entirely.
     """
 
-    if not search_query:
-        return queryset
+    etag = caching.response_etag(settings_obj, *parts)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        _add_validator(not_modified, etag)
+    return etag, not_modified
 
-    return queryset.filter(
-        Q(note__icontains=search_query)
-        | Q(category__name__icontains=search_query)
-        | Q(type__icontains=search_query)
-        | Q(name__icontains=search_query)
-    )
 
+def _add_validator(response, etag: str):
+    """Tag ``response`` and have clients revalidate before reusing it."""
 
-def _cycle_month_shift(reference: date, months: int, cycle_day: int) -> date:
-    """Shift a reference date by whole months while keeping my cycle day."""
+    if response.status_code in (200, 304):
+        response.headers['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
 
-    year = reference.year + (reference.month - 1 + months) // 12
-    month = (reference.month - 1 + months) % 12 + 1
-    day = min(cycle_day, monthrange(year, month)[1])
-    return date(year, month, day)
 
+def _is_authenticated(request) -> bool:
+    """Resolve the lazy ``request.user``; this reads the session."""
 
-def _user_transactions(user) -> models.QuerySet:
-    """Return the transaction queryset I scope to the incoming user."""
+    return request.user.is_authenticated
 
-    return Transaction.objects.filter(user=user)
 
+def _async_login_required(view):
+    """
+    Guard an ``async def`` view the way ``login_required`` guards the rest.
 
-def _get_user_settings_details(user) -> Tuple[UserSettings, str, str]:
-    """Fetch my user settings record plus the resolved currency details."""
+    Django 4.2's decorator cannot wrap coroutines, and the first touch of
+    ``request.user`` loads the session and user synchronously, so I do
+    that once in a worker thread. Afterwards ``request.user`` is cached
+    and safe to read from the event loop.
+    """
 
-    settings_obj, _ = UserSettings.objects.get_or_create(user=user)
-    currency_code = settings_obj.currency_code or DEFAULT_CURRENCY
-    currency_symbol = get_currency_symbol(currency_code)
-    return settings_obj, currency_code, currency_symbol
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
 
 
 def _max_transaction_amount_display() -> str:
@@ -84,6 +151,67 @@ def _max_transaction_amount_display() -> str:
     return str((Decimal(MAX_CENTS) / Decimal(100)).quantize(Decimal('0.00')))
 
 
+def _build_dashboard_context(user, settings_obj, today) -> dict:
+    """
+    Compute the request-independent part of the dashboard context.
+
+    Everything in here is safe to cache per user: it only depends on the
+    user's transactions, their settings and today's date.
+    """
+
+    # I always scope transactions to the signed-in user.
+    transactions = _user_transactions(user).order_by('-occurred_on')
+
+    # I read the past 12 cycles (oldest -> newest) from the cycle rollups
+    # kept in step with every write; the newest bucket is the current cycle.
+    report = build_cycle_report_from_summaries(
+        user,
+        transactions,
+        today=today,
+        cycle_day=cycle_day_for(settings_obj),
+    )
+    income = report.income
+    outgo = report.outgo
+    total_flow = income + outgo
+    if total_flow > 0:
+        income_percent = round((income / total_flow) * 100, 2)
+        expense_percent = round((outgo / total_flow) * 100, 2)
+    else:
+        income_percent = 0
+        expense_percent = 0
+
+    cycle_transactions = transactions.filter(
+        occurred_on__gte=report.current_start,
+        occurred_on__lte=report.current_end,
+    ).select_related('category')
+    top_expenses = report.top_expenses
+
+    return {
+        # I show the 10 most recent transactions on the dashboard.
+        'transactions': list(cycle_transactions[:10]),
+        'income': income,
+        'outgo': outgo,
+        'balance': income - outgo,
+        'top_spend': top_expenses[0] if top_expenses else None,
+        'months': [
+            start.strftime('%Y-%m-%d')
+            for start in report.cycle_starts
+        ],
+        'income_data': report.income_data,
+        'expense_data': report.expense_data,
+        'initial_search_results': list(
+            transactions.select_related('category')[:10]
+        ),
+        'top_expenses': top_expenses,
+        'cycle_display_start': report.current_start,
+        'cycle_display_end': report.current_end,
+        'cycle_setting_start': settings_obj.cycle_start_date,
+        'max_transaction_amount': _max_transaction_amount_display(),
+        'income_percent': income_percent,
+        'expense_percent': expense_percent,
+    }
+
+
 @login_required
 def dashboard(request):
     """
@@ -95,101 +223,11 @@ def dashboard(request):
     - Search functionality
     """
 
-    # I only surface active categories so I can tag transactions cleanly.
-    categories = Category.objects.filter(is_active=True)
-
     # I pull the user's configuration, including their cycle anchor day.
     settings_obj, currency_code, currency_symbol = _get_user_settings_details(
         request.user
     )
 
-    # I always scope transactions to the signed-in user.
-    transactions = _user_transactions(request.user).order_by('-occurred_on')
-
-    # I calculate cycle-aware stats using the user's configured start day.
-    today = timezone.localdate()
-    cycle_day = (
-        settings_obj.cycle_start_date.day
-        if settings_obj.cycle_start_date
-        else 1
-    )
-    cycle_candidate = _cycle_month_shift(today, 0, cycle_day)
-    if cycle_candidate > today:
-        current_cycle_start = _cycle_month_shift(today, -1, cycle_day)
-    else:
-        current_cycle_start = cycle_candidate
-    next_cycle_start = _cycle_month_shift(current_cycle_start, 1, cycle_day)
-    current_cycle_end = next_cycle_start - timedelta(days=1)
-
-    cycle_transactions = transactions.filter(
-        occurred_on__gte=current_cycle_start,
-        occurred_on__lt=next_cycle_start,
-    )
-    income = (
-        cycle_transactions
-        .filter(type='INCOME')
-        .aggregate(total=models.Sum('amount_in_cents'))['total']
-        or 0
-    )
-
-    # I let the dashboard search box filter transactions on the fly.
-    search_query = request.GET.get('q', '').strip()
-    filtered_transactions = _filter_transactions(transactions, search_query)
-
-    spend_history = cycle_transactions[:10]
-    search_results = list(filtered_transactions[:15]) if search_query else []
-    top_expenses = (
-        cycle_transactions
-        .filter(type='OUTGO')
-        .order_by('-amount_in_cents')[:3]
-    )
-    outgo = (
-        cycle_transactions
-        .filter(type='OUTGO')
-        .aggregate(total=models.Sum('amount_in_cents'))['total']
-        or 0
-    )
-    balance = income - outgo
-    total_flow = income + outgo
-    if total_flow > 0:
-        income_percent = round((income / total_flow) * 100, 2)
-        expense_percent = round((outgo / total_flow) * 100, 2)
-    else:
-        income_percent = 0
-        expense_percent = 0
-
-    top_spend = (
-        cycle_transactions
-        .filter(type='OUTGO')
-        .order_by('-amount_in_cents')
-        .first()
-    )
-
-    # I build cycle labels and totals for the past 12 cycles
-    # (oldest -> newest).
-    cycle_starts = [
-        _cycle_month_shift(current_cycle_start, -offset, cycle_day)
-        for offset in range(11, -1, -1)
-    ]
-    months = [
-        start.strftime('%Y-%m-%d')
-        for start in cycle_starts
-    ]
-    income_data = []
-    expense_data = []
-    for start in cycle_starts:
-        end = _cycle_month_shift(start, 1, cycle_day)
-        cycle_window = transactions.filter(
-            occurred_on__gte=start,
-            occurred_on__lt=end,
-        )
-        window_totals = cycle_window.aggregate(
-            income_total=Sum('amount_in_cents', filter=Q(type='INCOME')),
-            expense_total=Sum('amount_in_cents', filter=Q(type='OUTGO')),
-        )
-        income_data.append(window_totals['income_total'] or 0)
-        expense_data.append(window_totals['expense_total'] or 0)
-
     if request.method == 'POST':
         # I figure out which inline modal kicked off the submission.
         action = request.POST.get('action', 'add_transaction')
@@ -219,137 +257,231 @@ def dashboard(request):
         # Otherwise I persist the new transaction from the submitted form.
         # I still allow missing categories and store them as NULL for
         # flexibility.
-        transaction_type = (request.POST.get('type') or '').upper()
-        if transaction_type not in {'INCOME', 'OUTGO'}:
-            messages.error(
-                request,
-                'Please choose whether this entry is income or an expense.',
-            )
-            return redirect('dashboard')
-
-        category_id = request.POST.get('category') or None
-        if transaction_type == 'INCOME':
-            category_id = None
-        elif category_id is None:
-            messages.error(
-                request,
-                'Outgoing transactions require a category. '
-                'Please choose one before saving.',
-            )
-            return redirect('dashboard')
-
-        name = (request.POST.get('name') or '').strip()
-        if not name:
-            messages.error(request, 'Please enter a name for the transaction.')
-            return redirect('dashboard')
-        name = name.title()
-
-        occurred_on_raw = request.POST.get('occurred_on')
-        try:
-            occurred_on = date.fromisoformat(occurred_on_raw)
-        except (TypeError, ValueError):
-            messages.error(
-                request,
-                'Please select a valid date before saving the transaction.',
-            )
-            return redirect('dashboard')
-
-        amount_raw = (request.POST.get('amount_in_cents') or '').strip()
-        if not amount_raw:
-            messages.error(
-                request,
-                'Please enter an amount before saving the transaction.',
-            )
-            return redirect('dashboard')
         try:
-            amount_cents = parse_display_amount_to_cents(amount_raw)
-        except (InvalidOperation, ValueError):
-            messages.error(
-                request,
-                'Amount must be a number using up to two decimal places '
-                'for cents or pence (e.g., 12.50).',
+            fields = clean_new_transaction(
+                transaction_type=request.POST.get('type'),
+                category_id=request.POST.get('category'),
+                name=request.POST.get('name'),
+                occurred_on=request.POST.get('occurred_on'),
+                amount=request.POST.get('amount_in_cents'),
+                note=request.POST.get('note', ''),
             )
+        except ValidationError as error:
+            messages.error(request, error.message)
             return redirect('dashboard')
 
-        if amount_cents <= 0:
-            messages.error(
+        existing, outcome = duplicates.add_transaction(request.user, fields)
+        if outcome == duplicates.SKIPPED:
+            messages.info(
                 request,
-                'Amount must be greater than zero.',
+                'You already recorded this on '
+                f'{existing.occurred_on:%d %b %Y}, so it was not saved '
+                'again.',
             )
             return redirect('dashboard')
-        if amount_cents > MAX_CENTS:
-            messages.error(
+        if outcome == duplicates.MERGED:
+            messages.info(
                 request,
-                'That amount is too large for Ledgerly to store. '
-                'Please enter a smaller value.',
+                'This matched an entry you already had, so its details '
+                'were added to that one instead.',
             )
             return redirect('dashboard')
-
-        Transaction.objects.create(
-            user=request.user,
-            name=name,
-            type=transaction_type,
-            amount_in_cents=amount_cents,
-            category_id=category_id,
-            occurred_on=occurred_on,
-            note=request.POST.get('note', ''),
-        )
         success_messages = {
             'INCOME': 'Income saved successfully.',
             'OUTGO': 'Expense saved successfully.',
         }
-        messages.success(request, success_messages[transaction_type])
+        messages.success(request, success_messages[fields['type']])
+        if outcome == duplicates.FLAGGED:
+            messages.warning(
+                request,
+                'It looks like a repeat of an entry on '
+                f'{existing.duplicate_of.occurred_on:%d %b %Y}; it is '
+                'marked as a possible duplicate in your history.',
+            )
         return redirect('dashboard')
 
+    today = timezone.localdate()
+    cached_context, categories = caching.load_dashboard(settings_obj, today)
+    if cached_context is None or categories is None:
+        if cached_context is None:
+            cached_context = _build_dashboard_context(
+                request.user, settings_obj, today
+            )
+        if categories is None:
+            # I only surface active categories so I can tag transactions
+            # cleanly.
+            categories = list(Category.objects.filter(is_active=True))
+        caching.store_dashboard(
+            settings_obj, today, cached_context, categories
+        )
+
+    # I let the dashboard search box filter transactions on the fly.
+    search_query = request.GET.get('q', '').strip()
+    search_results = []
+    if search_query:
+        search_results = search.search_transactions(
+            request.user, search_query, limit=15
+        )
+
     context = {
+        **cached_context,
         # I pass the full category list to the form.
         'categories': categories,
-        # I show the 10 most recent transactions on the dashboard.
-        'transactions': spend_history,
-        'income': income,
-        'outgo': outgo,
-        'balance': balance,
-        'top_spend': top_spend,
-        'months': months,
-        'income_data': income_data,
-        'expense_data': expense_data,
         'search_query': search_query,
         'search_results': search_results,
-        'initial_search_results': list(transactions[:10]),
-        'top_expenses': top_expenses,
-        'cycle_display_start': current_cycle_start,
-        'cycle_display_end': current_cycle_end,
-        'cycle_setting_start': settings_obj.cycle_start_date,
         'currency_code': currency_code,
         'currency_symbol': currency_symbol,
-        'max_transaction_amount': _max_transaction_amount_display(),
-        'income_percent': income_percent,
-        'expense_percent': expense_percent,
     }
     return render(request, 'expenses/dashboard.html', context)
 
 
+def _history_page(request):
+    """Return the requested history page, or ``None`` for a bad cursor."""
+
+    try:
+        return keyset_page(
+            _user_transactions(request.user),
+            request.GET.get('cursor') or None,
+        )
+    except ValueError:
+        return None
+
+
 @login_required
 def transaction_list(request):
-    """I show the full history of the signed-in user's transactions."""
+    """I show the signed-in user's history one keyset page at a time."""
 
-    transactions = _user_transactions(request.user).order_by('-occurred_on')
+    page = _history_page(request)
+    if page is None:
+        return HttpResponse('Invalid cursor.', status=400)
     _, currency_code, currency_symbol = _get_user_settings_details(
         request.user
     )
     return render(request, 'expenses/transaction_list.html', {
-        'transactions': transactions,
+        'transactions': page.transactions,
+        'next_cursor': page.next_cursor,
         'currency_code': currency_code,
         'currency_symbol': currency_symbol,
     })
 
 
+@login_required
+def transaction_list_page(request):
+    """I return the next history rows as HTML for infinite scrolling."""
+
+    page = _history_page(request)
+    if page is None:
+        return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+    _, currency_code, _ = _get_user_settings_details(request.user)
+    html = render_to_string(
+        'expenses/transaction_rows.html',
+        {
+            'transactions': page.transactions,
+            'currency_code': currency_code,
+        },
+        request=request,
+    )
+    return JsonResponse({
+        'html': html,
+        'count': len(page.transactions),
+        'next_cursor': page.next_cursor,
+    })
+
+
+async def _aiterate(blocks):
+    """
+    Yield a sync iterable's items from async code, one at a time.
+
+    Under ASGI, Django buffers a sync streaming body into a list before
+    sending it, so I hand it an async iterator that pulls each block on
+    the request's worker thread, where its database cursor lives.
+    """
+
+    iterator = iter(blocks)
+    step = sync_to_async(next)
+    done = object()
+    while True:
+        block = await step(iterator, done)
+        if block is done:
+            return
+        yield block
+
+
+@login_required
+def transaction_export(request):
+    """I stream the user's transactions as a CSV or NDJSON download."""
+
+    form = TransactionExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    options = form.cleaned_data
+    _, currency_code, _ = _get_user_settings_details(request.user)
+    blocks = export_blocks(request.user, currency_code, options)
+    response = StreamingHttpResponse(
+        content_type=CONTENT_TYPES[options['format']],
+    )
+    if _GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        # I compress as I go rather than buffering the whole export.
+        blocks = compress_sequence(blocks)
+        response['Content-Encoding'] = 'gzip'
+    if isinstance(request, ASGIRequest):
+        blocks = _aiterate(blocks)
+    response.streaming_content = blocks
+    patch_vary_headers(response, ('Accept-Encoding',))
+    filename = export_filename(options['format'], timezone.localdate())
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def transaction_import(request):
+    """I load an uploaded CSV into the user's history in batches."""
+
+    result = None
+    if request.method == 'POST':
+        form = TransactionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            stream = io.TextIOWrapper(
+                upload.file, encoding='utf-8-sig', newline=''
+            )
+            try:
+                result = import_transactions(
+                    request.user,
+                    stream,
+                    duplicate_policy=(
+                        form.cleaned_data['duplicate_policy']
+                        or duplicates.SKIP
+                    ),
+                )
+            except ImportFileError as error:
+                form.add_error('file', str(error))
+            except UnicodeDecodeError:
+                form.add_error('file', 'The file must be UTF-8 encoded CSV.')
+            else:
+                summary = f'Imported {result.created} transaction(s).'
+                if result.duplicates:
+                    summary += (
+                        f' {result.duplicates} row(s) were already in '
+                        'your history.'
+                    )
+                messages.success(request, summary)
+    else:
+        form = TransactionImportForm()
+
+    return render(request, 'expenses/transaction_import.html', {
+        'form': form,
+        'result': result,
+    })
+
+
 @login_required
 def transaction_detail(request, pk):
     """I display and let the user edit a single transaction."""
 
     transaction = get_object_or_404(
-        Transaction, pk=pk, user=request.user
+        _user_transactions(request.user), pk=pk
     )
 
     ajax = _is_ajax(request)
@@ -417,7 +549,7 @@ def transaction_delete(request, pk):
     """I ask for confirmation before removing a transaction."""
 
     transaction = get_object_or_404(
-        Transaction, pk=pk, user=request.user
+        _user_transactions(request.user), pk=pk
     )
     _, currency_code, currency_symbol = _get_user_settings_details(
         request.user
@@ -439,11 +571,119 @@ def transaction_delete(request, pk):
     )
 
 
-@login_required
-def transaction_calendar_data(request):
-    """I return month-level transaction details for the calendar modal."""
+def _detail_url_template() -> str:
+    """Return the transaction detail URL with ``{id}`` where the pk goes."""
+
+    sentinel = 987654321
+    return reverse('transaction_detail', args=[sentinel]).replace(
+        str(sentinel), '{id}'
+    )
+
+
+async def _calendar_day_data(request, day_param, currency_code):
+    """
+    Return every transaction for the single day the user opened.
+
+    A busy day can hold thousands of rows, so I read a ``values_list``
+    projection rather than models and send each row as a short list in
+    ``CALENDAR_DAY_FIELDS`` order. Type and category labels go out once
+    for rows to point at, and the client builds the amount text and
+    detail link from the integers.
+    """
+
+    try:
+        day = date.fromisoformat(day_param)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date.'}, status=400)
+
+    day_rows = (
+        _user_transactions(request.user)
+        .filter(occurred_on=day)
+        .order_by('name', 'pk')
+        .values_list(
+            'pk', 'name', 'type', 'category_id', 'category__name', 'note',
+            'amount_in_cents',
+        )
+    )
+    rows = []
+    categories = {}
+    async for pk, name, txn_type, category_id, category_name, note, cents in (
+        day_rows
+    ):
+        if category_id is not None:
+            categories[category_id] = category_name
+        rows.append([pk, name, txn_type, category_id, note, cents])
+
+    return JsonResponse(
+        {
+            'date': day.isoformat(),
+            'fields': CALENDAR_DAY_FIELDS,
+            'transactions': rows,
+            'types': dict(Transaction.TYPE_CHOICES),
+            'categories': categories,
+            'detail_url': _detail_url_template(),
+            'currency_symbol': get_currency_symbol(currency_code),
+        },
+        json_dumps_params={'separators': (',', ':')},
+    )
+
+
+def _summary_payload(summary, currency_code) -> dict:
+    """Add display strings to a rollup summary so the JS stays simple."""
+
+    days = summary['days']
+    categories = summary['categories']
+    totals = summary['totals']
+    # I format every amount of the month in one pass.
+    displays = iter(format_many(
+        [
+            cents
+            for day in days
+            for cents in (day['income_cents'], day['outgo_cents'])
+        ]
+        + [category['outgo_cents'] for category in categories]
+        + [totals['income_cents'], totals['outgo_cents']],
+        currency_code,
+    ))
+    return {
+        'days': [
+            {
+                'date': day['date'].isoformat(),
+                'count': day['count'],
+                'income_cents': day['income_cents'],
+                'outgo_cents': day['outgo_cents'],
+                'income_display': next(displays),
+                'outgo_display': next(displays),
+            }
+            for day in days
+        ],
+        'categories': [
+            {
+                'name': category['name'],
+                'count': category['count'],
+                'outgo_cents': category['outgo_cents'],
+                'outgo_display': next(displays),
+            }
+            for category in categories
+        ],
+        'totals': {
+            **totals,
+            'income_display': next(displays),
+            'outgo_display': next(displays),
+        },
+    }
+
+
+def _parse_month(value: str) -> date:
+    """Turn ``YYYY-MM`` into the first day of that month."""
+
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+
+def _requested_month(request, today) -> date:
+    """Return the month asked for by ``?year=&month=``, else this one."""
 
-    today = timezone.localdate()
     year_param = request.GET.get('year')
     month_param = request.GET.get('month')
 
@@ -463,57 +703,16 @@ def transaction_calendar_data(request):
     if year < 1900 or year > today.year + 5:
         year = today.year
 
-    try:
-        start_date = date(year, month, 1)
-    except ValueError:
-        start_date = date(today.year, today.month, 1)
-        year = start_date.year
-        month = start_date.month
-
-    days_in_month = monthrange(year, month)[1]
-    end_date = date(year, month, days_in_month)
-    next_month = end_date + timedelta(days=1)
+    return date(year, month, 1)
 
-    _, currency_code, currency_symbol = _get_user_settings_details(
-        request.user
-    )
 
-    month_transactions = (
-        _user_transactions(request.user)
-        .filter(
-            occurred_on__gte=start_date,
-            occurred_on__lt=next_month,
-        )
-        .select_related('category')
-        .order_by('occurred_on', 'name', 'pk')
-    )
+def _calendar_month(start_date, summary, currency_code, today) -> dict:
+    """Build one month of the calendar payload from its rollup summary."""
 
-    type_labels = dict(Transaction.TYPE_CHOICES)
-    day_map = {}
-    for txn in month_transactions:
-        day_key = txn.occurred_on.isoformat()
-        day_map.setdefault(day_key, []).append({
-            'id': txn.pk,
-            'name': txn.name,
-            'type': txn.type,
-            'type_display': type_labels.get(txn.type, txn.type.title()),
-            'category': txn.category.name if txn.category else 'Uncategorized',
-            'note': txn.note or '',
-            'amount_display': (
-                f"-{cents_to_display(txn.amount_in_cents, currency_code)}"
-                if txn.type == Transaction.OUTGO
-                else f"+{cents_to_display(txn.amount_in_cents, currency_code)}"
-            ),
-            'detail_url': reverse('transaction_detail', args=[txn.pk]),
-            'occurred_on': txn.occurred_on.isoformat(),
-        })
-
-    days = [
-        {'date': day, 'transactions': entries}
-        for day, entries in sorted(day_map.items())
-    ]
+    payload = _summary_payload(summary, currency_code)
+    days = payload['days']
 
-    month_prefix = f"{year:04d}-{month:02d}"
+    month_prefix = f"{start_date.year:04d}-{start_date.month:02d}"
     today_iso = today.isoformat()
 
     if today_iso.startswith(month_prefix):
@@ -523,14 +722,130 @@ def transaction_calendar_data(request):
     else:
         initial_date = start_date.isoformat()
 
+    return {
+        'year': start_date.year,
+        'month': start_date.month,
+        'month_label': start_date.strftime('%B %Y'),
+        **payload,
+        'initial_date': initial_date,
+    }
+
+
+@_async_login_required
+async def transaction_calendar_data(request):
+    """
+    I feed the calendar modal.
+
+    A month request returns per-day and per-category totals straight from
+    the daily rollups; the individual transactions for a day are only
+    loaded when the user opens it (``?date=YYYY-MM-DD``). A range request
+    (``?from=YYYY-MM&to=YYYY-MM``) returns up to
+    ``MAX_CALENDAR_MONTHS`` months from the same single query, so the
+    modal can page through them without asking again.
+    """
+
+    settings_obj, currency_code, currency_symbol = (
+        await _aget_user_settings_details(request.user)
+    )
+
+    today = timezone.localdate()
+    day_param = request.GET.get('date')
+    range_params = (request.GET.get('from'), request.GET.get('to'))
+    # A month's answer also depends on today, which picks its initial day.
+    etag, not_modified = _check_not_modified(
+        request,
+        settings_obj,
+        'calendar',
+        day_param or (
+            request.GET.get('year'),
+            request.GET.get('month'),
+            *range_params,
+            today,
+        ),
+    )
+    if not_modified is not None:
+        return not_modified
+
+    if day_param:
+        return _add_validator(
+            await _calendar_day_data(request, day_param, currency_code),
+            etag,
+        )
+
+    is_range = any(range_params)
+    if is_range:
+        try:
+            first, last = (_parse_month(value) for value in range_params)
+        except (AttributeError, ValueError):
+            return JsonResponse(
+                {'error': 'Use from=YYYY-MM and to=YYYY-MM.'}, status=400
+            )
+        span = (last.year - first.year) * 12 + last.month - first.month + 1
+        if span < 1 or span > MAX_CALENDAR_MONTHS:
+            return JsonResponse(
+                {
+                    'error': (
+                        'A range must cover 1 to '
+                        f'{MAX_CALENDAR_MONTHS} months.'
+                    ),
+                },
+                status=400,
+            )
+    else:
+        first = last = _requested_month(request, today)
+
+    summaries = await rollups.asummarize_months(request.user, first, last)
+    months = [
+        _calendar_month(start_date, summary, currency_code, today)
+        for start_date, summary in summaries.items()
+    ]
+    context = {
+        'currency_symbol': currency_symbol,
+        'today': today.isoformat(),
+    }
+    body = {**context, 'months': months} if is_range else {
+        **months[0],
+        **context,
+    }
+    return _add_validator(JsonResponse(body), etag)
+
+
+@login_required
+def transaction_year_summary(request):
+    """I return a year's daily heatmap and category breakdown from rollups."""
+
+    today = timezone.localdate()
+    try:
+        year = int(request.GET.get('year') or today.year)
+    except (TypeError, ValueError):
+        year = today.year
+    if year < 1900 or year > today.year + 5:
+        year = today.year
+
+    _, currency_code, currency_symbol = _get_user_settings_details(
+        request.user
+    )
+    summary = rollups.summarize_range(
+        request.user,
+        date(year, 1, 1),
+        date(year + 1, 1, 1),
+    )
+
+    month_totals = [
+        {'month': month, 'income_cents': 0, 'outgo_cents': 0, 'count': 0}
+        for month in range(1, 13)
+    ]
+    for day in summary['days']:
+        bucket = month_totals[day['date'].month - 1]
+        bucket['income_cents'] += day['income_cents']
+        bucket['outgo_cents'] += day['outgo_cents']
+        bucket['count'] += day['count']
+
     return JsonResponse({
         'year': year,
-        'month': month,
-        'month_label': start_date.strftime('%B %Y'),
-        'days': days,
+        **_summary_payload(summary, currency_code),
+        'months': month_totals,
         'currency_symbol': currency_symbol,
-        'today': today_iso,
-        'initial_date': initial_date,
     })
 
 
@@ -544,18 +859,19 @@ def custom_logout(request):
 
 @login_required
 def delete_account(request):
-    """I ask for confirmation and then delete the user's account."""
+    """I ask for confirmation and then queue the account for deletion."""
 
     if request.method == 'POST':
         user = request.user
         username = user.username
-    # I log the session out first so the auth data clears cleanly.
+        # I deactivate the account now and purge its data in batches, so
+        # a long history never holds up the request.
+        pending = purges.request_account_deletion(user)
         logout(request)
-        user.delete()
         return render(
             request,
             'account/delete_success.html',
-            {'username': username},
+            {'username': username, 'pending': pending},
         )
 
     return render(request, 'account/delete_account.html')
@@ -565,11 +881,9 @@ def delete_account(request):
 def clear_history(request):
     """I provide a confirmation screen before wiping transaction history."""
 
-    user_transactions = _user_transactions(request.user)
-    transaction_count = user_transactions.count()
-
     if request.method == 'POST':
-        user_transactions.delete()
+        # I hide the history at once and purge it in the background.
+        purges.request_history_purge(request.user)
         messages.success(
             request,
             'Transaction history cleared. Enjoy the fresh start!'
@@ -579,24 +893,80 @@ def clear_history(request):
     return render(
         request,
         'expenses/clear_history_confirm.html',
-        {'transaction_count': transaction_count},
+        {
+            'transaction_count': _user_transactions(request.user).count(),
+            'pending': purges.open_purge(request.user.pk),
+        },
     )
 
 
+# I list at most this many of a user's jobs on the polling endpoint.
+JOB_LIST_LIMIT = 20
+
+
+def _job_payload(job: Job) -> dict:
+    """Describe a background job for clients polling its progress."""
+
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'finished': job.is_finished,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'result': job.result,
+        # A queued job with an error is waiting for its retry.
+        'error': job.last_error or None,
+        'retry_at': (
+            job.run_after.isoformat()
+            if job.status == Job.QUEUED and job.attempts else None
+        ),
+        'created_at': job.created_at.isoformat(),
+        'finished_at': (
+            job.finished_at.isoformat() if job.finished_at else None
+        ),
+        'status_url': reverse('job_status', args=[job.pk]),
+    }
+
+
+@login_required
+def job_list(request):
+    """I return the user's newest background jobs for status polling."""
+
+    recent = Job.objects.filter(user=request.user).order_by('-pk')
+    return JsonResponse({
+        'jobs': [_job_payload(job) for job in recent[:JOB_LIST_LIMIT]],
+    })
+
+
 @login_required
-def transaction_search_results(request):
+def job_status(request, pk):
+    """I return one of the user's background jobs for status polling."""
+
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return JsonResponse(_job_payload(job))
+
+
+@_async_login_required
+async def transaction_search_results(request):
     """I return rendered search results for the dashboard search column."""
 
     query = request.GET.get('q', '').strip()
     if not query:
         return JsonResponse({'html': '', 'count': 0})
 
-    _, currency_code, _ = _get_user_settings_details(request.user)
-    transactions = _user_transactions(request.user).order_by('-occurred_on')
-    filtered = _filter_transactions(transactions, query)
-    search_results = list(filtered[:10])
+    settings_obj, currency_code, _ = await _aget_user_settings_details(
+        request.user
+    )
+    etag, not_modified = _check_not_modified(
+        request, settings_obj, 'search', query
+    )
+    if not_modified is not None:
+        return not_modified
+    search_results = await search.asearch_transactions(request.user, query)
 
-    html = render_to_string(
+    # Templates may touch the database, which is off limits on the loop.
+    html = await sync_to_async(render_to_string)(
         'expenses/search_results_list.html',
         {
             'search_results': search_results,
@@ -606,39 +976,39 @@ def transaction_search_results(request):
         request=request,
     )
 
-    return JsonResponse({
+    response = JsonResponse({
         'html': html,
         'count': len(search_results),
     })
+    # A search that ran out of time also comes back empty, so I never let
+    # a client keep an empty answer.
+    if search_results:
+        _add_validator(response, etag)
+    return response
 
 
-@login_required
-def transaction_suggestions(request):
+@_async_login_required
+async def transaction_suggestions(request):
     """I return transaction or category suggestions that match the query."""
 
     query = request.GET.get('q', '').strip()
     if not query:
         return JsonResponse({'suggestions': []})
 
-    name_matches = (
-        _user_transactions(request.user)
-        .filter(name__icontains=query)
-        .exclude(name='')
-        .values_list('name', flat=True)
-        .distinct()
-        .order_by('name')[:10]
-    )
-    category_matches = (
-        Category.objects
-        .filter(is_active=True, name__icontains=query)
-        .values_list('name', flat=True)
-        .distinct()
-        .order_by('name')[:10]
+    settings_obj, _, _ = await _aget_user_settings_details(request.user)
+    etag, not_modified = _check_not_modified(
+        request, settings_obj, 'suggestions', query
     )
+    if not_modified is not None:
+        return not_modified
+
+    name_matches = await asuggest_names(request.user, query)
+    # A cold category cache is filled from the database.
+    category_matches = await sync_to_async(suggest_categories)(query)
 
     suggestions = list(dict.fromkeys([*name_matches, *category_matches]))
 
-    return JsonResponse({'suggestions': suggestions})
+    return _add_validator(JsonResponse({'suggestions': suggestions}), etag)
 
 
 @login_required
@@ -0,0 +1,178 @@
+"""
+I measure what each request costs in queries, database time and templates.
+
+:class:`ledgerly.middleware.RequestInstrumentationMiddleware` wraps each
+request in :func:`measure` (or :func:`ameasure`), which installs a
+:class:`RequestMetrics` as an ``execute_wrapper`` on every database
+connection. The template backend
+below adds the time spent rendering top-level templates, so the numbers
+cover the whole request with no changes to the views.
+"""
+
+import time
+from collections import Counter
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar(
+    'ledgerly_request_metrics',
+    default=None,
+)
+
+
+class RequestMetrics:
+    """I add up the database and template work of a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.statements = Counter()
+        self._rendering = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Time a query; I am installed with ``execute_wrapper``."""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            # The same statement with the same parameters is a duplicate;
+            # I leave bulk parameter lists out of the key.
+            self.statements[sql if many else (sql, repr(params))] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """Return how many queries repeated an earlier one exactly."""
+
+        return sum(count - 1 for count in self.statements.values())
+
+    def most_repeated(self) -> Optional[str]:
+        """Return the SQL of the most repeated query, if any repeated."""
+
+        if not self.statements:
+            return None
+        key, count = self.statements.most_common(1)[0]
+        if count < 2:
+            return None
+        return key if isinstance(key, str) else key[0]
+
+    def summary(self) -> Dict[str, float]:
+        """Return the request's totals, with times in milliseconds."""
+
+        return {
+            'queries': self.queries,
+            'duplicates': self.duplicates,
+            'db_ms': round(self.db_seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+        }
+
+
+def _wrap_connections(metrics: RequestMetrics) -> ExitStack:
+    wrappers = ExitStack()
+    for connection in connections.all():
+        wrappers.enter_context(connection.execute_wrapper(metrics))
+    return wrappers
+
+
+@contextmanager
+def measure() -> Iterator[RequestMetrics]:
+    """Measure everything run inside the block, queries and templates."""
+
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with _wrap_connections(metrics):
+            yield metrics
+    finally:
+        _current.reset(token)
+
+
+@asynccontextmanager
+async def ameasure() -> AsyncIterator[RequestMetrics]:
+    """
+    Measure an async block, including the queries it hands to threads.
+
+    Connections belong to a thread, and an ASGI request runs all of its
+    ``sync_to_async`` work on one thread of its own, so I wrap that
+    thread's connections rather than the event loop's.
+    """
+
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        wrappers = await sync_to_async(_wrap_connections)(metrics)
+        try:
+            yield metrics
+        finally:
+            await sync_to_async(wrappers.close)()
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[RequestMetrics]:
+    """Return the tally of the request being measured, if there is one."""
+
+    return _current.get()
+
+
+def server_timing(summary: Dict[str, float]) -> str:
+    """Format a request's totals as a ``Server-Timing`` header value."""
+
+    return ', '.join((
+        f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries '
+        f'({summary["duplicates"]} duplicate)"',
+        f'tpl;dur={summary["template_ms"]};desc="Templates"',
+        f'total;dur={summary["total_ms"]}',
+    ))
+
+
+def over_budget(
+    summary: Dict[str, float],
+    budget: Dict[str, float],
+) -> List[str]:
+    """List each budgeted figure the request went over, as ``name=x>limit``."""
+
+    return [
+        f'{name}={summary[name]}>{limit}'
+        for name, limit in budget.items()
+        if name in summary and summary[name] > limit
+    ]
+
+
+class TimedTemplate(Template):
+    """I add my render time to the request being measured."""
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        # A template rendered while rendering another is already counted.
+        metrics._rendering += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._rendering -= 1
+            if not metrics._rendering:
+                metrics.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """I am Django's template backend with render timing added."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
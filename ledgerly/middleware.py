@@ -0,0 +1,113 @@
+"""I hold Ledgerly's project-wide middleware, all usable under ASGI."""
+
+import logging
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import instrumentation
+
+logger = logging.getLogger('ledgerly.instrumentation')
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    I serve static files like WhiteNoise under both WSGI and ASGI.
+
+    WhiteNoise 6 only has a synchronous ``__call__``, and one sync-only
+    middleware makes Django run every ASGI request, static or not, through
+    a thread and back, which would cancel out the async views. Under ASGI
+    I look the file up myself and await the rest of the chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Autorefresh searches the static finders on disk.
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Serving opens and stats the file.
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    I report each request's queries, database time and template time.
+
+    I am opt-in: unless ``LEDGERLY_INSTRUMENTATION`` is on, Django drops
+    me from the chain at startup. When on, I add a ``Server-Timing`` header
+    (visible in the browser's network panel), log one ``key=value`` line
+    per request and warn when a view goes over its entry in
+    ``LEDGERLY_VIEW_BUDGETS``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'LEDGERLY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'LEDGERLY_VIEW_BUDGETS', {})
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with instrumentation.measure() as metrics:
+            response = self.get_response(request)
+        return self._report(request, response, metrics)
+
+    async def __acall__(self, request):
+        async with instrumentation.ameasure() as metrics:
+            response = await self.get_response(request)
+        return self._report(request, response, metrics)
+
+    def _report(self, request, response, metrics):
+        summary = metrics.summary()
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '-'
+        response['Server-Timing'] = instrumentation.server_timing(summary)
+        logger.info(
+            'request view=%s method=%s path=%s status=%s queries=%s '
+            'duplicates=%s db_ms=%s template_ms=%s total_ms=%s',
+            view, request.method, request.path, response.status_code,
+            summary['queries'], summary['duplicates'], summary['db_ms'],
+            summary['template_ms'], summary['total_ms'],
+            extra={'view': view, 'metrics': summary},
+        )
+        budget = self.budgets.get(view) or self.budgets.get('*')
+        exceeded = instrumentation.over_budget(summary, budget or {})
+        if exceeded:
+            logger.warning(
+                'over budget view=%s %s most_repeated=%r',
+                view, ' '.join(exceeded), metrics.most_repeated(),
+                extra={'view': view, 'metrics': summary},
+            )
+        return response
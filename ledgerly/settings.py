@@ -79,9 +79,13 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    # Opt-in per-request query and timing report (LEDGERLY_INSTRUMENTATION);
+    # outermost so it sees every other middleware's queries too.
+    'ledgerly.middleware.RequestInstrumentationMiddleware',
     # Adds security-related HTTP headers.
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, made async-capable so ASGI requests avoid a thread hop.
+    'ledgerly.middleware.AsyncWhiteNoiseMiddleware',
     # Manages session data stored in cookies or the DB.
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -97,7 +101,8 @@ ROOT_URLCONF = 'ledgerly.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's backend, plus render timing for the instrumentation.
+        'BACKEND': 'ledgerly.instrumentation.TimedDjangoTemplates',
         # Point Django to your custom templates (e.g. overridden
         # django-allauth forms).
         'DIRS': [BASE_DIR / 'expenses' / 'templates'],
@@ -130,6 +135,87 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Per-user dashboard contexts and the category list are cached here, and
+# every worker and management command must see the same cache. Point
+# REDIS_URL at a Redis instance (needs the `redis` package); otherwise the
+# cache is a table in the database, created once with
+# `python manage.py createcachetable`. Dashboard hit/miss counters are only
+# kept on Redis, whose increments are atomic. A per-process cache such as
+# LocMemCache fails the expenses.W001 check.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'ledgerly_cache',
+        }
+    }
+
+# How long (seconds) a computed dashboard stays cached. Entries are keyed by
+# each user's data version, so writes never serve stale numbers.
+LEDGERLY_DASHBOARD_CACHE_TIMEOUT = int(
+    os.environ.get("LEDGERLY_DASHBOARD_CACHE_TIMEOUT", 300)
+)
+
+# Transaction search picks a full-text backend for the active database
+# (Postgres tsvector, SQLite FTS5) unless a dotted path overrides it, and
+# gives up on any single search after this many milliseconds.
+LEDGERLY_SEARCH_BACKEND = os.environ.get("LEDGERLY_SEARCH_BACKEND") or None
+LEDGERLY_SEARCH_TIMEOUT_MS = int(
+    os.environ.get("LEDGERLY_SEARCH_TIMEOUT_MS", 250)
+)
+
+# What the dashboard and transaction edits do with an entry whose date,
+# amount, type and name repeat one already recorded: "flag", "skip" or
+# "merge". CSV imports choose their own policy per upload.
+LEDGERLY_DUPLICATE_POLICY = os.environ.get(
+    "LEDGERLY_DUPLICATE_POLICY", "flag"
+)
+
+
+# Set LEDGERLY_INSTRUMENTATION=1 to time every request: queries, duplicate
+# queries, database and template time go out as a Server-Timing header and
+# one "ledgerly.instrumentation" log line each. A view (by URL name, "*" for
+# the rest) that goes over a figure in its budget logs a warning.
+LEDGERLY_INSTRUMENTATION = (
+    os.environ.get("LEDGERLY_INSTRUMENTATION", "") == "1"
+)
+LEDGERLY_VIEW_BUDGETS = {
+    'dashboard': {'queries': 12, 'duplicates': 0, 'total_ms': 300},
+    'transaction_list': {'queries': 6, 'duplicates': 0, 'total_ms': 200},
+    'transaction_detail': {'queries': 8, 'duplicates': 0, 'total_ms': 200},
+    'transaction_calendar_data': {'queries': 6, 'total_ms': 150},
+    'transaction_search_results': {'queries': 6, 'total_ms': 400},
+    'transaction_suggestions': {'queries': 6, 'total_ms': 150},
+    '*': {'queries': 30, 'duplicates': 5, 'total_ms': 1000},
+}
+
+# Send the instrumentation lines to the console (Heroku's log stream).
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'ledgerly.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
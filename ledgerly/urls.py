@@ -11,6 +11,21 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     # Full transaction history plus detail/edit/delete flows.
     path('transactions/', views.transaction_list, name='transaction_list'),
+    path(
+        'transactions/page/',
+        views.transaction_list_page,
+        name='transaction_list_page',
+    ),
+    path(
+        'transactions/export/',
+        views.transaction_export,
+        name='transaction_export',
+    ),
+    path(
+        'transactions/import/',
+        views.transaction_import,
+        name='transaction_import',
+    ),
     path(
         'transactions/<int:pk>/',
         views.transaction_detail,
@@ -26,6 +41,11 @@ urlpatterns = [
         views.transaction_calendar_data,
         name='transaction_calendar_data',
     ),
+    path(
+        'transactions/year-summary/',
+        views.transaction_year_summary,
+        name='transaction_year_summary',
+    ),
     path(
         'transactions/search-results/',
         views.transaction_search_results,
@@ -48,6 +68,9 @@ urlpatterns = [
         views.currency_settings,
         name='account_currency_settings',
     ),
+    # Status polling for background jobs such as history purges.
+    path('jobs/', views.job_list, name='job_list'),
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
     # Bypass allauth's intermediate logout page and immediately redirect
     # users back to the login form.
     path('accounts/logout/', views.custom_logout, name='account_logout'),